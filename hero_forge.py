@@ -5,17 +5,35 @@ Transforms 1500 licensed heroes into original Sci-Fi IP characters.
 """
 
 import asyncio
+import cProfile
+import gzip
+import hashlib
+import heapq
+import http.client
 import json
+import os
 import random
 import re
+import sqlite3
+import sys
+import textwrap
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from difflib import SequenceMatcher
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Literal
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Literal
+from urllib.parse import urlsplit
 from enum import Enum
 
 import numpy as np
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationError, validator
 from tqdm.asyncio import tqdm
 
 
@@ -29,6 +47,26 @@ class Faction(str, Enum):
     AERO_VANGUARD = "Aero-Vanguard"
 
 
+# Faction triangle: each faction deals 25% more damage to the one it beats
+# and 25% less to the one it loses against.
+FACTION_BEATS = {
+    Faction.TERRAGUARD: Faction.CYBER_OPS,
+    Faction.CYBER_OPS: Faction.AERO_VANGUARD,
+    Faction.AERO_VANGUARD: Faction.TERRAGUARD,
+}
+FACTION_BONUS = 1.25
+FACTION_PENALTY = 0.75
+
+
+def faction_multiplier(attacker: Faction, defender: Faction) -> float:
+    """Damage multiplier for an attacker of one faction against another."""
+    if FACTION_BEATS[attacker] == defender:
+        return FACTION_BONUS
+    if FACTION_BEATS[defender] == attacker:
+        return FACTION_PENALTY
+    return 1.0
+
+
 class Rarity(str, Enum):
     COMMON = "Common"
     RARE = "Rare"
@@ -36,6 +74,24 @@ class Rarity(str, Enum):
     LEGENDARY = "Legendary"
 
 
+# Compact integer codes used by array-backed storage and exports
+FACTIONS = list(Faction)
+RARITIES = list(Rarity)
+FACTION_CODES = {faction: i for i, faction in enumerate(FACTIONS)}
+RARITY_CODES = {rarity: i for i, rarity in enumerate(RARITIES)}
+
+STAT_NAMES = ['strength', 'speed', 'power', 'durability', 'combat', 'intelligence']
+
+COMBAT_SCORE_WEIGHTS = {
+    'strength': 0.2,
+    'speed': 0.15,
+    'power': 0.25,
+    'durability': 0.2,
+    'combat': 0.15,
+    'intelligence': 0.05,
+}
+
+
 class HeroStats(BaseModel):
     strength: int = Field(ge=0, le=100)
     speed: int = Field(ge=0, le=100)
@@ -46,14 +102,7 @@ class HeroStats(BaseModel):
 
     def compute_combat_score(self) -> float:
         """Compute weighted combat score."""
-        return (
-            self.strength * 0.2 +
-            self.speed * 0.15 +
-            self.power * 0.25 +
-            self.durability * 0.2 +
-            self.combat * 0.15 +
-            self.intelligence * 0.05
-        )
+        return sum(getattr(self, stat) * weight for stat, weight in COMBAT_SCORE_WEIGHTS.items())
 
 
 class RawHero(BaseModel):
@@ -141,16 +190,111 @@ def check_blacklist(text: str) -> bool:
 # LORE GUARDIAN - UNIQUENESS VALIDATOR
 # ============================================================================
 
+class LoreRegistry:
+    """
+    Persistent name/bio registry shared across runs and processes.
+
+    Backed by SQLite in WAL mode: any number of forge processes can read
+    while one writes, and a UNIQUE index on the normalized name makes
+    claiming a callsign atomic across processes. Guardians pull only the
+    rows added since their last sync, so startup is a single indexed scan
+    instead of replaying earlier JSON outputs.
+
+    The connection may be used from worker threads (the forge claims
+    names off the event loop); a lock serializes access to it.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lore (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL UNIQUE,
+            bio TEXT NOT NULL,
+            hero_id INTEGER,
+            source TEXT
+        )
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.SCHEMA)
+
+    @staticmethod
+    def name_key(name: str) -> str:
+        """Normalize a callsign so 'Neon-Shade' and 'neon shade' collide."""
+        return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM lore").fetchone()[0]
+
+    def entries_since(self, seq: int) -> List[Tuple[int, str, str]]:
+        """Rows accepted (by any process) after the given sequence number."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT seq, name, bio FROM lore WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+    def claim(self, name: str, bio: str, hero_id: Optional[int] = None, source: Optional[str] = None) -> bool:
+        """Atomically register a name; False if another run already owns it."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT INTO lore (name, name_key, bio, hero_id, source) VALUES (?, ?, ?, ?, ?)",
+                    (name, self.name_key(name), bio, hero_id, source)
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def import_heroes(self, heroes: Iterable[Dict], source: str) -> int:
+        """Seed the registry from an existing forge output; returns rows added."""
+        before = len(self)
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO lore (name, name_key, bio, hero_id, source) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (hero['name'], self.name_key(hero['name']), hero['bio'], hero.get('id'), source)
+                    for hero in heroes
+                    if not hero.get('needsManualReview')
+                )
+            )
+        return len(self) - before
+
+    def close(self):
+        self.conn.close()
+
+
 class LoreGuardian:
     """Ensures all generated bios are unique."""
 
-    def __init__(self, similarity_threshold: float = 0.60):
+    def __init__(self, similarity_threshold: float = 0.60, registry: Optional[LoreRegistry] = None):
         self.existing_bios: List[str] = []
         self.existing_names: List[str] = []
         self.similarity_threshold = similarity_threshold
+        self.registry = registry
+        self._registry_seq = 0
+        self._sync_lock = threading.Lock()  # sync() also runs in worker threads
+        self.sync()
+
+    def sync(self):
+        """Pull names/bios accepted by earlier runs or other processes."""
+        if self.registry is None:
+            return
+        with self._sync_lock:
+            for seq, name, bio in self.registry.entries_since(self._registry_seq):
+                self.existing_names.append(name)
+                self.existing_bios.append(bio)
+                self._registry_seq = seq
 
     def check_name_uniqueness(self, name: str) -> bool:
         """Check if name is unique."""
+        self.sync()
         name_lower = name.lower()
         for existing in self.existing_names:
             if name_lower == existing.lower():
@@ -160,21 +304,56 @@ class LoreGuardian:
                 return False
         return True
 
+    def unique_names(self, candidates: Iterable[str], reserved: Iterable[str] = ()) -> List[str]:
+        """
+        Batch version of check_name_uniqueness.
+
+        Candidates are also checked against `reserved` and each other. The
+        cheap upper bounds of SequenceMatcher rule out most pairs before
+        the full ratio is computed.
+        """
+        self.sync()
+        taken = [name.lower() for name in self.existing_names]
+        taken.extend(name.lower() for name in reserved)
+        seen = set(taken)
+        accepted = []
+        for name in candidates:
+            key = name.lower()
+            if key in seen:
+                continue
+            matcher = SequenceMatcher(None, b=key)
+            for existing in taken:
+                matcher.set_seq1(existing)
+                if matcher.real_quick_ratio() > 0.85 and matcher.quick_ratio() > 0.85 and matcher.ratio() > 0.85:
+                    break
+            else:
+                accepted.append(name)
+                taken.append(key)
+            seen.add(key)
+        return accepted
+
     def check_bio_uniqueness(self, bio: str) -> Tuple[bool, float, Optional[str]]:
         """
         Check if bio is sufficiently unique.
         Returns: (is_unique, similarity_score, conflicting_bio)
         """
+        self.sync()
         for existing in self.existing_bios:
             similarity = self._calculate_similarity(bio, existing)
             if similarity > self.similarity_threshold:
                 return False, similarity, existing
         return True, 0.0, None
 
-    def add_content(self, name: str, bio: str):
-        """Register name and bio as used."""
+    def add_content(self, name: str, bio: str, hero_id: Optional[int] = None) -> bool:
+        """Register name and bio as used; False if another process claimed the name first."""
+        if self.registry is not None:
+            claimed = self.registry.claim(name, bio, hero_id, source=f"pid:{os.getpid()}")
+            self.sync()  # Picks up our own row as well as concurrent ones
+            return claimed
+
         self.existing_names.append(name)
         self.existing_bios.append(bio)
+        return True
 
     @staticmethod
     def _calculate_similarity(text1: str, text2: str) -> float:
@@ -182,6 +361,386 @@ class LoreGuardian:
         return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
 
+# ============================================================================
+# PROVIDER ERRORS & RETRY POLICY
+# ============================================================================
+
+class ProviderError(Exception):
+    """Provider request rejected for this hero; retrying will not help."""
+
+
+class TransientProviderError(ProviderError):
+    """Timeouts, connection errors, 5xx: retry with backoff."""
+
+
+class ProviderRateLimitError(TransientProviderError):
+    """HTTP 429 / quota exhausted; honours Retry-After when the provider sends it."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderAuthError(ProviderError):
+    """Invalid or unauthorized API key: fail the whole run immediately."""
+
+
+class ContentValidationError(ProviderError):
+    """Provider answered but the content was unusable: retry immediately."""
+
+
+class ContentSchemaError(ContentValidationError):
+    """The JSON parsed, but a field is missing or out of bounds (pydantic validation)."""
+
+
+# SDK exception class names (matched along the MRO, so subclasses count)
+AUTH_ERROR_NAMES = {'AuthenticationError', 'PermissionDeniedError', 'Unauthenticated', 'PermissionDenied'}
+RATE_LIMIT_ERROR_NAMES = {'RateLimitError', 'ResourceExhausted', 'TooManyRequests'}
+TRANSIENT_ERROR_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'InternalServerError',   # openai
+    'TransportError', 'TimeoutException',                              # httpx
+    'ServiceUnavailable', 'DeadlineExceeded', 'ServerError',           # google.api_core
+}
+
+
+def classify_provider_error(provider: str, error: Exception) -> ProviderError:
+    """Map SDK/HTTP/parse exceptions of any provider onto the typed hierarchy."""
+    if isinstance(error, ProviderError):
+        return error
+
+    message = f"{provider} generation failed: {type(error).__name__}: {error}"
+    if isinstance(error, ValidationError):
+        return ContentSchemaError(message)
+    if isinstance(error, json.JSONDecodeError):
+        return ContentValidationError(message)
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return TransientProviderError(message)
+
+    # openai exposes status_code, google.api_core exposes code
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    status = status if isinstance(status, int) else None
+    names = {cls.__name__ for cls in type(error).__mro__}
+
+    if status in (401, 403) or names & AUTH_ERROR_NAMES:
+        return ProviderAuthError(message)
+    if status == 429 or names & RATE_LIMIT_ERROR_NAMES:
+        return ProviderRateLimitError(message, _retry_after(error))
+    if (status is not None and status >= 500) or status == 408 or names & TRANSIENT_ERROR_NAMES:
+        return TransientProviderError(message)
+    # 4xx, and anything unrecognised (including bugs): not worth retrying
+    return ProviderError(message)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    try:
+        return float(headers.get('retry-after')) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient provider errors."""
+
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, error: Optional[ProviderError] = None) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = getattr(error, 'retry_after', None)
+        return max(backoff, retry_after) if retry_after else backoff
+
+
+class CircuitBreaker:
+    """
+    Pauses the whole worker pool while a provider is down.
+
+    After `failure_threshold` consecutive transient failures the breaker
+    opens and every caller waits `cooldown` seconds. Then one probe
+    request is let through (half-open): success closes the breaker,
+    failure opens it again. A probe that is cancelled hands the slot
+    back via abandon_probe(); one that never reports back is given up
+    after `probe_timeout` and the next caller probes instead.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+    PROBE_POLL = 0.05
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, probe_timeout: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.trips = 0
+
+    async def wait(self) -> bool:
+        """Block until requests may be sent; True if this caller is the half-open probe."""
+        while True:
+            if self.state == self.CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN and now - self.probe_started > self.probe_timeout:
+                self.state = self.OPEN  # Probe lost; let this caller take over
+            remaining = self.opened_at + self.cooldown - now
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                self.probe_started = now
+                return True
+            await asyncio.sleep(remaining if self.state == self.OPEN else self.PROBE_POLL)
+
+    def abandon_probe(self):
+        """The probe ended without an outcome (cancelled): reopen so another caller probes."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                tqdm.write(f"[!] Provider unavailable - pausing requests for {self.cooldown:.0f}s")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+# ============================================================================
+# STREAMING RESPONSE PARSING
+# ============================================================================
+
+# Returns None if the name is acceptable, otherwise a rejection reason
+NameValidator = Callable[[str], Optional[str]]
+
+
+def loop_bound_validator(
+    name_validator: Optional[NameValidator],
+    loop: asyncio.AbstractEventLoop
+) -> Optional[NameValidator]:
+    """
+    Wrap a validator for use from a worker thread (asyncio.to_thread).
+
+    The check itself runs on the event loop thread, which owns the lore
+    registry's sqlite connection, the LoreGuardian lists and the profiler.
+    """
+    if name_validator is None:
+        return None
+
+    async def check(name: str) -> Optional[str]:
+        return name_validator(name)
+
+    return lambda name: asyncio.run_coroutine_threadsafe(check(name), loop).result()
+
+
+class NameRejectedError(ContentValidationError):
+    """Raised when a streamed name fails validation before the completion ends."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"Name '{name}' rejected ({reason})")
+        self.name = name
+        self.reason = reason
+
+
+class StreamingNameWatcher:
+    """
+    Accumulates streamed completion text and validates the `name` field
+    as soon as its closing quote arrives, so rejected attempts can be
+    cancelled without paying for the rest of the output.
+    """
+
+    NAME_PATTERN = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+    def __init__(self, name_validator: Optional[NameValidator] = None):
+        self.name_validator = name_validator
+        self.text = ""
+        self.name: Optional[str] = None
+
+    def feed(self, chunk: Optional[str]):
+        """Append a chunk; raises NameRejectedError once a bad name is complete."""
+        if not chunk:
+            return
+        self.text += chunk
+        if self.name is not None or self.name_validator is None:
+            return
+
+        match = self.NAME_PATTERN.search(self.text)
+        if match:
+            self.name = json.loads(f'"{match.group(1)}"')
+            reason = self.name_validator(self.name)
+            if reason:
+                raise NameRejectedError(self.name, reason)
+
+
+def content_json_schema(strict: bool = True) -> Dict:
+    """
+    JSON schema of AIGeneratedContent for provider-native structured output.
+
+    Uses the subset both OpenAI and Gemini accept: length limits become
+    descriptions (pydantic still enforces them). Property order follows
+    the model, so `name` is generated first and can be checked while
+    streaming. Strict schemas (OpenAI) also forbid extra properties.
+    """
+    model_schema = AIGeneratedContent.model_json_schema()
+    properties = {
+        field: {'type': spec['type'], 'description': f"{spec['minLength']}-{spec['maxLength']} characters"}
+        for field, spec in model_schema['properties'].items()
+    }
+    schema = {'type': 'object', 'properties': properties, 'required': list(model_schema['required'])}
+    if strict:
+        schema['additionalProperties'] = False
+    return schema
+
+
+def openai_response_format() -> Dict:
+    """response_format for OpenAI-compatible chat completions (strict JSON schema)."""
+    return {
+        'type': 'json_schema',
+        'json_schema': {'name': 'hero_content', 'strict': True, 'schema': content_json_schema()}
+    }
+
+
+# A 400 naming the schema parameter: the model/endpoint has no structured output
+_STRUCTURED_OUTPUT_PARAMS = re.compile(r'response_format|json_schema|response_schema|response_mime_type|structured output', re.I)
+
+
+def structured_output_rejected(error: Exception) -> bool:
+    """True if the provider rejected the request because of the JSON schema mode."""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    names = {cls.__name__ for cls in type(error).__mro__}
+    bad_request = status == 400 or bool(names & {'BadRequestError', 'InvalidArgument'})
+    return bad_request and bool(_STRUCTURED_OUTPUT_PARAMS.search(str(error)))
+
+
+# Common LLM JSON slips: smart quotes and trailing commas
+_JSON_REPAIRS = [
+    (re.compile(r'[\u201c\u201d]'), '"'),
+    (re.compile(r',\s*([}\]])'), r'\1'),
+]
+
+
+def extract_json_object(text: str, fields: Sequence[str] = ('name', 'bio', 'quote')) -> Dict:
+    """
+    Recover a JSON object embedded in prose or markdown fences.
+
+    Decodes from every '{' in turn; the first object that has all
+    `fields` (directly or one level down) wins. If none parses, common
+    slips are repaired and the scan runs once more.
+    """
+    for candidate in (text, _repair_json(text)):
+        decoder = json.JSONDecoder()
+        fallback = None
+        pos = candidate.find('{')
+        while pos != -1:
+            try:
+                data, end = decoder.raw_decode(candidate, pos)
+            except json.JSONDecodeError:
+                pos = candidate.find('{', pos + 1)
+                continue
+            if isinstance(data, dict):
+                for obj in (data, *(value for value in data.values() if isinstance(value, dict))):
+                    if all(field in obj for field in fields):
+                        return obj
+                if fallback is None:
+                    fallback = data
+            pos = candidate.find('{', end)
+        if fallback is not None:
+            return fallback  # Incomplete object: let the model validation report it
+    raise json.JSONDecodeError("No JSON object found", text, 0)
+
+
+def _repair_json(text: str) -> str:
+    for pattern, replacement in _JSON_REPAIRS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def parse_ai_json(content: str) -> AIGeneratedContent:
+    """Parse a completion: plain JSON (structured output) fast path, else extract it from prose."""
+    content = content.strip()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict) or not AIGeneratedContent.model_fields.keys() <= data.keys():
+        # Prose, fences, or valid JSON of the wrong shape (a list, a wrapper object)
+        try:
+            data = extract_json_object(content)
+        except json.JSONDecodeError as e:
+            raise ContentValidationError(f"No usable JSON object in response: {e}") from e
+    return AIGeneratedContent(**data)
+
+
+async def stream_chat_completion(
+    client,
+    name_validator: Optional[NameValidator] = None,
+    **request
+) -> str:
+    """Stream an OpenAI-compatible chat completion, aborting early on a rejected name."""
+    watcher = StreamingNameWatcher(name_validator)
+    stream = await client.chat.completions.create(stream=True, **request)
+    try:
+        async for chunk in stream:
+            if chunk.choices:
+                watcher.feed(chunk.choices[0].delta.content)
+    finally:
+        # Closing mid-stream drops the connection and stops generation
+        await stream.close()
+    return watcher.text
+
+
+# Completion budget for a callsign batch: list/JSON formatting included
+CALLSIGN_TOKENS_PER_NAME = 16
+CALLSIGN_TOKEN_OVERHEAD = 64
+
+
+def callsign_max_tokens(count: int) -> int:
+    return count * CALLSIGN_TOKENS_PER_NAME + CALLSIGN_TOKEN_OVERHEAD
+
+
+class CallsignBatch(list):
+    """Callsigns of one batch request; `truncated` if the reply hit the token limit."""
+
+    def __init__(self, names: Iterable[str] = (), truncated: bool = False):
+        super().__init__(names)
+        self.truncated = truncated
+
+
+def callsign_prompt(faction: Faction, count: int, avoid: Sequence[str] = ()) -> str:
+    """Prompt for a batch of callsigns; the names are validated by the caller."""
+    avoid_line = f"\nAlready taken (do not reuse or closely imitate): {', '.join(avoid)}\n" if avoid else ''
+    return f"""Invent {count} distinct military-style callsigns (2-3 words, e.g., "Vortex Striker", "Iron Sentinel")
+for {faction.value} heroes of the sci-fi battle game "Infinite Arena".
+NO Marvel/DC references, NO real-world names, locations or brands. Vary the words; avoid near-duplicates.
+{avoid_line}
+Respond ONLY with a JSON array of strings."""
+
+
+def parse_callsigns(content: str) -> List[str]:
+    """
+    Names from a JSON array completion, falling back to one name per line.
+
+    An array cut off by the token limit still yields its complete strings.
+    """
+    start, end = content.find('['), content.rfind(']')
+    if start != -1 and end > start:
+        try:
+            return [str(name).strip() for name in json.loads(content[start:end + 1]) if str(name).strip()]
+        except json.JSONDecodeError:
+            pass
+    if start != -1:
+        quoted = re.findall(r'"((?:[^"\\]|\\.)*)"', content[start:])
+        if quoted:
+            return [name for name in (json.loads(f'"{q}"').strip() for q in quoted) if name]
+    names = (re.sub(r'^[\s\-*\d.)"\']+|[\s",\']+$', '', line) for line in content.splitlines())
+    return [name for name in names if name and len(name.split()) <= 4]
+
+
 # ============================================================================
 # AI PROVIDER INTERFACE
 # ============================================================================
@@ -189,13 +748,38 @@ class LoreGuardian:
 class AIProvider:
     """Base class for AI content generation."""
 
+    structured_output = False
+    # Set when the provider rejected the JSON schema mode and requests went prompt-only
+    structured_output_fallback: Optional[str] = None
+
+    def fall_back_to_prompt_json(self, provider: str, error: Exception) -> bool:
+        """
+        True if `error` rejects the JSON schema mode: structured output is
+        switched off for this provider (logged once) and the caller retries
+        the request prompt-only.
+        """
+        if not structured_output_rejected(error):
+            return False
+        if self.structured_output:
+            self.structured_output = False
+            self.structured_output_fallback = str(error)
+            tqdm.write(f"[!] {provider} rejected structured output - falling back to prompt-only JSON ({error})")
+        return True
+
     async def generate_hero_content(
         self,
         stats: HeroStats,
         faction: Faction,
         rarity: Rarity,
-        retry_context: Optional[str] = None
+        retry_context: Optional[str] = None,
+        name_validator: Optional[NameValidator] = None,
+        name: Optional[str] = None
     ) -> AIGeneratedContent:
+        """Generate name, bio and quote; a given name is reserved and must be used."""
+        raise NotImplementedError
+
+    async def generate_callsigns(self, faction: Faction, count: int, avoid: Sequence[str] = ()) -> List[str]:
+        """Generate a batch of candidate callsigns in one request."""
         raise NotImplementedError
 
 
@@ -212,12 +796,20 @@ class MockAIProvider(AIProvider):
         stats: HeroStats,
         faction: Faction,
         rarity: Rarity,
-        retry_context: Optional[str] = None
+        retry_context: Optional[str] = None,
+        name_validator: Optional[NameValidator] = None,
+        name: Optional[str] = None
     ) -> AIGeneratedContent:
         """Generate mock content."""
-        await asyncio.sleep(0.1)  # Simulate API delay
+        name = name or f"{random.choice(self.PREFIXES)} {random.choice(self.SUFFIXES)}"
 
-        name = f"{random.choice(self.PREFIXES)} {random.choice(self.SUFFIXES)}"
+        # Name is "streamed" first; a rejected name skips the remaining delay
+        await asyncio.sleep(0.02)
+        if name_validator:
+            reason = name_validator(name)
+            if reason:
+                raise NameRejectedError(name, reason)
+        await asyncio.sleep(0.08)  # Simulate API delay
 
         bios = [
             f"Elite operative from Sector {random.randint(1, 99)}. Specializes in {faction.value} combat tactics.",
@@ -239,12 +831,19 @@ class MockAIProvider(AIProvider):
             quote=random.choice(quotes)
         )
 
+    async def generate_callsigns(self, faction: Faction, count: int, avoid: Sequence[str] = ()) -> List[str]:
+        """Generate mock callsigns: one request delay for the whole batch."""
+        await asyncio.sleep(0.1)
+        combos = [f"{prefix} {suffix}" for prefix in self.PREFIXES for suffix in self.SUFFIXES]
+        return random.sample(combos, min(count, len(combos)))
+
 
 class OpenAIProvider(AIProvider):
     """OpenAI GPT-4o-mini provider."""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, structured_output: bool = True):
         self.api_key = api_key
+        self.structured_output = structured_output
         try:
             import openai
             self.client = openai.AsyncOpenAI(api_key=api_key)
@@ -256,7 +855,9 @@ class OpenAIProvider(AIProvider):
         stats: HeroStats,
         faction: Faction,
         rarity: Rarity,
-        retry_context: Optional[str] = None
+        retry_context: Optional[str] = None,
+        name_validator: Optional[NameValidator] = None,
+        name: Optional[str] = None
     ) -> AIGeneratedContent:
         """Generate content using OpenAI."""
 
@@ -284,44 +885,65 @@ Dominant Stats: Power={stats.power}, Speed={stats.speed}, Durability={stats.dura
 {retry_context or ''}
 
 Generate a unique hero:
-1. NAME: Military-style callsign (2-3 words, e.g., "Vortex Striker", "Iron Sentinel")
+1. NAME: {f'Use exactly "{name}" (already reserved)' if name else 'Military-style callsign (2-3 words, e.g., "Vortex Striker", "Iron Sentinel")'}
 2. BIO: 2-sentence backstory (30-50 words, focus on origin and motivation)
 3. QUOTE: One battle quote (max 15 words)
 
 Respond ONLY with valid JSON:
 {{"name": "...", "bio": "...", "quote": "..."}}"""
 
+        request = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a creative sci-fi hero designer. Always respond with valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.9,
+            max_tokens=250
+        )
+        structured = self.structured_output
+        try:
+            try:
+                content = await stream_chat_completion(
+                    self.client,
+                    name_validator,
+                    **request,
+                    **({'response_format': openai_response_format()} if structured else {})
+                )
+            except Exception as e:
+                if not (structured and self.fall_back_to_prompt_json("OpenAI", e)):
+                    raise
+                content = await stream_chat_completion(self.client, name_validator, **request)
+            return parse_ai_json(content)
+
+        except Exception as e:
+            raise classify_provider_error("OpenAI", e) from e
+
+    async def generate_callsigns(self, faction: Faction, count: int, avoid: Sequence[str] = ()) -> List[str]:
+        """Generate a batch of callsigns in one request."""
         try:
             response = await self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a creative sci-fi hero designer. Always respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": callsign_prompt(faction, count, avoid)}
                 ],
-                temperature=0.9,
-                max_tokens=250
+                temperature=1.0,
+                max_tokens=callsign_max_tokens(count)
             )
-
-            content = response.choices[0].message.content.strip()
-
-            # Extract JSON if wrapped in markdown
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-
-            data = json.loads(content)
-            return AIGeneratedContent(**data)
+            choice = response.choices[0]
+            return CallsignBatch(parse_callsigns(choice.message.content or ''), truncated=choice.finish_reason == 'length')
 
         except Exception as e:
-            raise Exception(f"OpenAI generation failed: {e}")
+            raise classify_provider_error("OpenAI", e) from e
 
 
 class AIMLAPIProvider(AIProvider):
     """AIMLAPI Gemini 3 Flash provider (OpenAI-compatible API)."""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, structured_output: bool = True):
         self.api_key = api_key
+        self.structured_output = structured_output
         try:
             import openai
             self.client = openai.AsyncOpenAI(
@@ -336,7 +958,9 @@ class AIMLAPIProvider(AIProvider):
         stats: HeroStats,
         faction: Faction,
         rarity: Rarity,
-        retry_context: Optional[str] = None
+        retry_context: Optional[str] = None,
+        name_validator: Optional[NameValidator] = None,
+        name: Optional[str] = None
     ) -> AIGeneratedContent:
         """Generate content using AIMLAPI Gemini 3 Flash."""
 
@@ -364,44 +988,65 @@ Dominant Stats: Power={stats.power}, Speed={stats.speed}, Durability={stats.dura
 {retry_context or ''}
 
 Generate a unique hero:
-1. NAME: Military-style callsign (2-3 words, e.g., "Vortex Striker", "Iron Sentinel")
+1. NAME: {f'Use exactly "{name}" (already reserved)' if name else 'Military-style callsign (2-3 words, e.g., "Vortex Striker", "Iron Sentinel")'}
 2. BIO: 2-sentence backstory (30-50 words, focus on origin and motivation)
 3. QUOTE: One battle quote (max 15 words)
 
 Respond ONLY with valid JSON:
 {{"name": "...", "bio": "...", "quote": "..."}}"""
 
+        request = dict(
+            model="google/gemini-3-flash-preview",
+            messages=[
+                {"role": "system", "content": "You are a creative sci-fi hero designer. Always respond with valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.9,
+            max_tokens=250
+        )
+        structured = self.structured_output
+        try:
+            try:
+                content = await stream_chat_completion(
+                    self.client,
+                    name_validator,
+                    **request,
+                    **({'response_format': openai_response_format()} if structured else {})
+                )
+            except Exception as e:
+                if not (structured and self.fall_back_to_prompt_json("AIMLAPI", e)):
+                    raise
+                content = await stream_chat_completion(self.client, name_validator, **request)
+            return parse_ai_json(content)
+
+        except Exception as e:
+            raise classify_provider_error("AIMLAPI", e) from e
+
+    async def generate_callsigns(self, faction: Faction, count: int, avoid: Sequence[str] = ()) -> List[str]:
+        """Generate a batch of callsigns in one request."""
         try:
             response = await self.client.chat.completions.create(
                 model="google/gemini-3-flash-preview",
                 messages=[
                     {"role": "system", "content": "You are a creative sci-fi hero designer. Always respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": callsign_prompt(faction, count, avoid)}
                 ],
-                temperature=0.9,
-                max_tokens=250
+                temperature=1.0,
+                max_tokens=callsign_max_tokens(count)
             )
-
-            content = response.choices[0].message.content.strip()
-
-            # Extract JSON if wrapped in markdown
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-
-            data = json.loads(content)
-            return AIGeneratedContent(**data)
+            choice = response.choices[0]
+            return CallsignBatch(parse_callsigns(choice.message.content or ''), truncated=choice.finish_reason == 'length')
 
         except Exception as e:
-            raise Exception(f"AIMLAPI generation failed: {e}")
+            raise classify_provider_error("AIMLAPI", e) from e
 
 
 class GeminiProvider(AIProvider):
     """Google Gemini Flash provider."""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, structured_output: bool = True):
         self.api_key = api_key
+        self.structured_output = structured_output
         try:
             import google.generativeai as genai
             genai.configure(api_key=api_key)
@@ -414,7 +1059,9 @@ class GeminiProvider(AIProvider):
         stats: HeroStats,
         faction: Faction,
         rarity: Rarity,
-        retry_context: Optional[str] = None
+        retry_context: Optional[str] = None,
+        name_validator: Optional[NameValidator] = None,
+        name: Optional[str] = None
     ) -> AIGeneratedContent:
         """Generate content using Gemini."""
 
@@ -431,56 +1078,331 @@ Rules:
 - Military/cyberpunk style
 - Respond with JSON only: {{"name": "...", "bio": "...", "quote": "..."}}
 
-Generate unique name (2-3 words), short bio (30-50 words), and battle quote (max 15 words)."""
+Generate {f'the name "{name}" exactly' if name else 'unique name (2-3 words)'}, short bio (30-50 words), and battle quote (max 15 words)."""
+
+        validator = loop_bound_validator(name_validator, asyncio.get_running_loop())
+
+        def stream_content(structured: bool) -> str:
+            watcher = StreamingNameWatcher(validator)
+            config = {
+                'response_mime_type': 'application/json',
+                'response_schema': content_json_schema(strict=False)
+            } if structured else None
+            for chunk in self.model.generate_content(prompt, generation_config=config, stream=True):
+                watcher.feed(chunk.text)
+            return watcher.text
+
+        structured = self.structured_output
+        try:
+            try:
+                content = await asyncio.to_thread(stream_content, structured)
+            except Exception as e:
+                if not (structured and self.fall_back_to_prompt_json("Gemini", e)):
+                    raise
+                content = await asyncio.to_thread(stream_content, False)
+            return parse_ai_json(content)
+
+        except Exception as e:
+            raise classify_provider_error("Gemini", e) from e
 
+    async def generate_callsigns(self, faction: Faction, count: int, avoid: Sequence[str] = ()) -> List[str]:
+        """Generate a batch of callsigns in one request."""
         try:
             response = await asyncio.to_thread(
                 self.model.generate_content,
-                prompt
+                callsign_prompt(faction, count, avoid),
+                generation_config={'max_output_tokens': callsign_max_tokens(count)}
             )
+            finish_reason = getattr(response.candidates[0].finish_reason, 'name', None) if response.candidates else None
+            return CallsignBatch(parse_callsigns(response.text), truncated=finish_reason == 'MAX_TOKENS')
+
+        except Exception as e:
+            raise classify_provider_error("Gemini", e) from e
+
+
+# ============================================================================
+# NAME RESERVOIR - PRE-VALIDATED CALLSIGNS
+# ============================================================================
 
-            content = response.text.strip()
+class NameReservoir:
+    """
+    Pre-validated callsigns per faction, handed out before bio generation.
 
-            # Extract JSON
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
+    Callsigns are requested in batches of `batch_size` and validated as a
+    batch against the blacklist, the LoreGuardian and every name already
+    reserved. A name collision then costs a share of one batch request
+    instead of a full generation round-trip. A faction whose refill yields
+    no new name is marked exhausted and borrows from the other pools; once
+    all are empty, heroes fall back to names chosen during generation.
 
-            data = json.loads(content)
-            return AIGeneratedContent(**data)
+    A failed refill puts its faction on a cooldown from the shared
+    RetryPolicy (honouring Retry-After); until it expires, takes skip the
+    refill instead of re-sending the batch request for every hero.
+    Transient failures also count towards the shared CircuitBreaker.
+    """
+
+    AVOID_SAMPLE = 60
+
+    def __init__(
+        self,
+        provider: AIProvider,
+        lore_guardian: LoreGuardian,
+        batch_size: int = 200,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        self.provider = provider
+        self.lore_guardian = lore_guardian
+        self.batch_size = batch_size
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+        self.pools: Dict[Faction, deque] = {faction: deque() for faction in Faction}
+        self.reserved: List[str] = []
+        self.pooled: set = set()
+        self.exhausted: set = set()
+        self._locks = {faction: asyncio.Lock() for faction in Faction}
+        self._failures = {faction: 0 for faction in Faction}
+        self._retry_at = {faction: 0.0 for faction in Faction}
+        self.stats = {
+            'batches': 0, 'generated': 0, 'accepted': 0, 'handed_out': 0,
+            'discarded': 0, 'truncated': 0, 'refill_failures': 0
+        }
 
+    async def take(self, faction: Faction) -> Optional[str]:
+        """Next reserved name for a faction, or None if the provider should pick one."""
+        pool = self.pools[faction]
+        async with self._locks[faction]:  # One refill per faction in flight
+            cooling_down = time.monotonic() < self._retry_at[faction]
+            if not pool and faction not in self.exhausted and not cooling_down:
+                await self._refill(faction)
+        if not pool:
+            pool = max(self.pools.values(), key=len)
+            if not pool:
+                return None
+        self.stats['handed_out'] += 1
+        name = pool.popleft()
+        self.pooled.discard(name.lower())
+        return name
+
+    def is_pooled(self, name: str) -> bool:
+        """True if the name waits in a pool (not yet handed out)."""
+        return name.lower() in self.pooled
+
+    def release(self, faction: Faction, name: str):
+        """Return a name that was handed out but not used."""
+        self.pools[faction].appendleft(name)
+        self.pooled.add(name.lower())
+        self.stats['handed_out'] -= 1
+
+    def discard(self):
+        """Count a handed-out name that failed validation after all."""
+        self.stats['discarded'] += 1
+
+    async def _refill(self, faction: Faction):
+        avoid = self.reserved[-self.AVOID_SAMPLE:]
+        try:
+            candidates = await self.provider.generate_callsigns(faction, self.batch_size, avoid)
+        except NotImplementedError:
+            self.exhausted.update(Faction)
+            return
         except Exception as e:
-            raise Exception(f"Gemini generation failed: {e}")
+            error = classify_provider_error(self.provider.__class__.__name__, e)
+            if isinstance(error, ProviderAuthError):
+                raise error from e
+            if isinstance(error, TransientProviderError) and self.circuit_breaker:
+                self.circuit_breaker.record_failure()
+            delay = self.retry_policy.delay(self._failures[faction], error)
+            self._failures[faction] += 1
+            self._retry_at[faction] = time.monotonic() + delay
+            self.stats['refill_failures'] += 1
+            tqdm.write(f"[!] Name reservoir refill failed for {faction.value} (next try in {delay:.1f}s): {error}")
+            return
+
+        self._failures[faction] = 0
+        accepted = self.lore_guardian.unique_names(
+            (name for name in candidates if check_blacklist(name)), self.reserved
+        )
+        self.stats['batches'] += 1
+        self.stats['generated'] += len(candidates)
+        self.stats['accepted'] += len(accepted)
+        self.reserved.extend(accepted)
+        self.pools[faction].extend(accepted)
+        self.pooled.update(name.lower() for name in accepted)
+        if getattr(candidates, 'truncated', False):
+            self.stats['truncated'] += 1  # Short batch, not a sign the name space is used up
+        elif not accepted:
+            self.exhausted.add(faction)
+            tqdm.write(f"[i] Name reservoir exhausted for {faction.value} - provider picks names")
 
 
 # ============================================================================
 # STAT PROCESSING & FACTION ASSIGNMENT
 # ============================================================================
 
+# Combat score percentile at which each rarity starts
+RARITY_PERCENTILES = {
+    Rarity.LEGENDARY: 95,
+    Rarity.EPIC: 85,
+    Rarity.RARE: 60,
+}
+
+# Stat multipliers applied per rarity
+RARITY_MULTIPLIERS = {
+    Rarity.LEGENDARY: 1.5,
+    Rarity.EPIC: 1.25,
+    Rarity.RARE: 1.0,
+    Rarity.COMMON: 0.8
+}
+
+
+# ============================================================================
+# RARITY SKETCH - INCREMENTAL THRESHOLDS
+# ============================================================================
+
+class RaritySketch:
+    """
+    Persistent, mergeable quantile sketch of combat scores.
+
+    Combat scores are bounded to [0, 100] and, with integer stats and the
+    current weights, quantized to multiples of 0.05. A fixed-resolution
+    count histogram at that step is therefore constant-size, merges by
+    addition and reproduces np.percentile exactly. Thresholds are frozen
+    until rebalance() is called, so onboarding new heroes never shifts
+    the rarity of existing ones.
+    """
+
+    VERSION = 1
+
+    def __init__(self, resolution: float = 0.05, max_score: float = 100.0):
+        self.resolution = resolution
+        self.max_score = max_score
+        self.counts = np.zeros(int(round(max_score / resolution)) + 1, dtype=np.int64)
+        self.percentiles: Dict[Rarity, float] = dict(RARITY_PERCENTILES)
+        self.thresholds: Dict[Rarity, float] = {}
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add_many(self, scores: List[float]):
+        """Record combat scores."""
+        bins = np.rint(np.asarray(scores, dtype=np.float64) / self.resolution).astype(np.int64)
+        np.add.at(self.counts, np.clip(bins, 0, len(self.counts) - 1), 1)
+
+    def merge(self, other: 'RaritySketch'):
+        """Add the counts of another (e.g. shard) sketch; thresholds stay as they are."""
+        if other.resolution != self.resolution or len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge sketches with different resolution")
+        self.counts += other.counts
+
+    def quantile(self, percentile: float) -> float:
+        """Percentile with NumPy's default linear interpolation."""
+        n = self.count
+        if n == 0:
+            raise ValueError("Sketch is empty")
+        rank = (n - 1) * percentile / 100
+        cumulative = np.cumsum(self.counts)
+        lo, hi = np.searchsorted(cumulative, [np.floor(rank), np.ceil(rank)], side='right')
+        value_lo, value_hi = lo * self.resolution, hi * self.resolution
+        return float(value_lo + (rank - np.floor(rank)) * (value_hi - value_lo))
+
+    def rarity_thresholds(self) -> Dict[Rarity, float]:
+        """Frozen thresholds in the format StatProcessor uses."""
+        return {**self.thresholds, Rarity.COMMON: 0}
+
+    def rebalance(self, exact_scores: Optional[List[float]] = None) -> Dict[str, Dict]:
+        """
+        Recompute thresholds from all recorded scores.
+        Returns per-rarity old/new thresholds, the sketch's error bound and,
+        if exact_scores are given, the measured error against np.percentile.
+        """
+        report = {}
+        for rarity, percentile in self.percentiles.items():
+            new = self.quantile(percentile)
+            entry = {
+                'percentile': percentile,
+                'old': self.thresholds.get(rarity),
+                'new': round(new, 4),
+                'bound': self.resolution / 2,
+            }
+            if exact_scores is not None:
+                entry['exact'] = round(float(np.percentile(exact_scores, percentile)), 4)
+                entry['error'] = round(abs(new - entry['exact']), 6)
+            report[rarity.value] = entry
+            self.thresholds[rarity] = new
+        return report
+
+    def save(self, path: Path):
+        nonzero = np.flatnonzero(self.counts)
+        data = {
+            'version': self.VERSION,
+            'resolution': self.resolution,
+            'maxScore': self.max_score,
+            'count': self.count,
+            'percentiles': {r.value: p for r, p in self.percentiles.items()},
+            'thresholds': {r.value: t for r, t in self.thresholds.items()},
+            'bins': {str(int(i)): int(self.counts[i]) for i in nonzero},
+        }
+        path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+
+    @classmethod
+    def load(cls, path: Path) -> 'RaritySketch':
+        data = json.loads(path.read_text(encoding='utf-8'))
+        sketch = cls(data['resolution'], data['maxScore'])
+        for index, count in data['bins'].items():
+            sketch.counts[int(index)] = count
+        sketch.percentiles = {Rarity(r): p for r, p in data['percentiles'].items()}
+        sketch.thresholds = {Rarity(r): t for r, t in data['thresholds'].items()}
+        return sketch
+
+
 class StatProcessor:
     """Handles stat normalization, rarity assignment, and faction balancing."""
 
-    def __init__(self, heroes: List[RawHero]):
-        self.heroes = heroes
-        self.combat_scores = self._compute_all_scores()
+    def __init__(
+        self,
+        heroes: Iterable[RawHero],
+        rarity_percentiles: Optional[Dict[Rarity, float]] = None,
+        rarity_multipliers: Optional[Dict[Rarity, float]] = None,
+        sketch: Optional[RaritySketch] = None
+    ):
+        self.rarity_percentiles = rarity_percentiles or RARITY_PERCENTILES
+        self.rarity_multipliers = rarity_multipliers or RARITY_MULTIPLIERS
+        self.sketch = sketch
+        self.combat_scores = self._compute_all_scores(heroes)
         self.rarity_thresholds = self._compute_rarity_thresholds()
         self.faction_counts = {f: 0 for f in Faction}
 
-    def _compute_all_scores(self) -> List[float]:
-        """Compute combat scores for all heroes."""
-        return [hero.to_stats().compute_combat_score() for hero in self.heroes]
+    @staticmethod
+    def _compute_all_scores(heroes: Iterable[RawHero]) -> List[float]:
+        """Compute combat scores for all heroes (single pass, works on streams)."""
+        return [hero.to_stats().compute_combat_score() for hero in heroes]
 
     def _compute_rarity_thresholds(self) -> Dict[Rarity, float]:
         """Compute percentile thresholds for rarity tiers."""
+        if self.sketch is not None:
+            # Incremental run: record the batch, keep the frozen thresholds
+            self.sketch.add_many(self.combat_scores)
+            if not self.sketch.thresholds:
+                self.sketch.percentiles = dict(self.rarity_percentiles)
+                self.sketch.rebalance()
+            return self.sketch.rarity_thresholds()
+
         scores = np.array(self.combat_scores)
         return {
-            Rarity.LEGENDARY: np.percentile(scores, 95),
-            Rarity.EPIC: np.percentile(scores, 85),
-            Rarity.RARE: np.percentile(scores, 60),
+            Rarity.LEGENDARY: np.percentile(scores, self.rarity_percentiles[Rarity.LEGENDARY]),
+            Rarity.EPIC: np.percentile(scores, self.rarity_percentiles[Rarity.EPIC]),
+            Rarity.RARE: np.percentile(scores, self.rarity_percentiles[Rarity.RARE]),
             Rarity.COMMON: 0
         }
 
+    def verify_sketch(self) -> Dict[str, Dict]:
+        """Sketch thresholds of this batch alone, measured against exact np.percentile."""
+        probe = RaritySketch(*((self.sketch.resolution, self.sketch.max_score) if self.sketch else ()))
+        probe.percentiles = dict(self.rarity_percentiles)
+        probe.add_many(self.combat_scores)
+        return probe.rebalance(exact_scores=self.combat_scores)
+
     def assign_rarity(self, combat_score: float) -> Rarity:
         """Assign rarity based on combat score percentile."""
         if combat_score >= self.rarity_thresholds[Rarity.LEGENDARY]:
@@ -532,14 +1454,7 @@ class StatProcessor:
 
     def scale_stats_by_rarity(self, stats: HeroStats, rarity: Rarity) -> HeroStats:
         """Apply rarity multipliers to stats."""
-        multipliers = {
-            Rarity.LEGENDARY: 1.5,
-            Rarity.EPIC: 1.25,
-            Rarity.RARE: 1.0,
-            Rarity.COMMON: 0.8
-        }
-
-        mult = multipliers[rarity]
+        mult = self.rarity_multipliers[rarity]
 
         return HeroStats(
             strength=min(100, int(stats.strength * mult)),
@@ -551,10 +1466,354 @@ class StatProcessor:
         )
 
 
+# ============================================================================
+# COMPACT HERO STORE
+# ============================================================================
+
+class HeroStore(Sequence):
+    """
+    Struct-of-arrays storage for processed heroes.
+
+    Numeric fields live in NumPy columns (uint8 stats, uint8 faction/rarity
+    codes), and all text is UTF-8 in a single bytearray arena addressed by
+    per-hero offsets. ProcessedHero models are only built when a hero is
+    accessed by index, i.e. at the API boundary; export stages read the
+    columns and record() instead.
+    """
+
+    TEXT_FIELDS = ('originalName', 'name', 'bio', 'quote', 'image')
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._arena = bytearray()
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int):
+        size = self._size
+        old = getattr(self, 'ids', None)
+
+        def grow(name: str, shape: Tuple[int, ...], dtype):
+            array = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                array[:size] = getattr(self, name)[:size]
+            setattr(self, name, array)
+
+        grow('ids', (capacity,), np.uint32)
+        grow('stats', (capacity, len(STAT_NAMES)), np.uint8)
+        grow('combat_scores', (capacity,), np.float32)
+        grow('factions', (capacity,), np.uint8)
+        grow('rarities', (capacity,), np.uint8)
+        grow('retry_counts', (capacity,), np.uint8)
+        grow('needs_review', (capacity,), np.bool_)
+        grow('text_offsets', (capacity,), np.int64)
+        grow('text_lengths', (capacity, len(self.TEXT_FIELDS)), np.uint16)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the store (allocated columns plus text arena)."""
+        columns = (self.ids, self.stats, self.combat_scores, self.factions, self.rarities,
+                   self.retry_counts, self.needs_review, self.text_offsets, self.text_lengths)
+        return sum(c.nbytes for c in columns) + len(self._arena)
+
+    def append(self, hero: ProcessedHero):
+        """Copy a hero into the store; the model can be discarded afterwards."""
+        if self._size == self._capacity:
+            self._allocate(self._capacity * 2)
+
+        i = self._size
+        self.ids[i] = hero.id
+        self.stats[i] = [getattr(hero.stats, stat) for stat in STAT_NAMES]
+        self.combat_scores[i] = hero.combatScore
+        self.factions[i] = FACTION_CODES[hero.faction]
+        self.rarities[i] = RARITY_CODES[hero.rarity]
+        self.retry_counts[i] = min(hero.retryCount, 255)
+        self.needs_review[i] = hero.needsManualReview
+
+        self.text_offsets[i] = len(self._arena)
+        for j, field in enumerate(self.TEXT_FIELDS):
+            encoded = getattr(hero, field).encode('utf-8')
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f"Hero {hero.id}: {field} exceeds 64 KiB")
+            self.text_lengths[i, j] = len(encoded)
+            self._arena += encoded
+
+        self._size += 1
+
+    def text(self, index: int) -> Dict[str, str]:
+        """Decode the text fields of one hero from the arena."""
+        offset = int(self.text_offsets[index])
+        values = {}
+        for field, length in zip(self.TEXT_FIELDS, self.text_lengths[index].tolist()):
+            values[field] = self._arena[offset:offset + length].decode('utf-8')
+            offset += length
+        return values
+
+    def record(self, index: int) -> Dict:
+        """Plain dict in the forge output format, without building a model."""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        text = self.text(index)
+        return {
+            'id': int(self.ids[index]),
+            'originalName': text['originalName'],
+            'name': text['name'],
+            'faction': FACTIONS[self.factions[index]].value,
+            'rarity': RARITIES[self.rarities[index]].value,
+            'bio': text['bio'],
+            'quote': text['quote'],
+            'stats': dict(zip(STAT_NAMES, self.stats[index].tolist())),
+            'combatScore': round(float(self.combat_scores[index]), 2),
+            'image': text['image'],
+            'needsManualReview': bool(self.needs_review[index]),
+            'retryCount': int(self.retry_counts[index]),
+        }
+
+    def __getitem__(self, index: int) -> ProcessedHero:
+        if index < 0:
+            index += self._size
+        return ProcessedHero(**self.record(index))
+
+    def id_order(self) -> np.ndarray:
+        """Row indices in hero id order (stable), without reordering the store."""
+        return np.argsort(self.ids[:self._size], kind='stable')
+
+    def sort_by_id(self):
+        """Reorder rows by hero id; the text arena is left in place."""
+        order = np.argsort(self.ids[:self._size], kind='stable')
+        for name in ('ids', 'stats', 'combat_scores', 'factions', 'rarities',
+                     'retry_counts', 'needs_review', 'text_offsets', 'text_lengths'):
+            column = getattr(self, name)
+            column[:self._size] = column[:self._size][order]
+
+    def counts(self, column: str, size: int) -> np.ndarray:
+        """Histogram of a code column (e.g. 'factions', 'rarities')."""
+        return np.bincount(getattr(self, column)[:self._size], minlength=size)
+
+    def write_json(self, path: Path, rows: Optional[Iterable[int]] = None):
+        """Stream heroes (all, or the given rows) as the same indented JSON array json.dumps would produce."""
+        rows = range(self._size) if rows is None else rows
+        with path.open('w', encoding='utf-8') as f:
+            first = True
+            for i in rows:
+                f.write('[\n' if first else ',\n')
+                f.write(textwrap.indent(json.dumps(self.record(i), indent=2, ensure_ascii=False), '  '))
+                first = False
+            f.write('[]' if first else '\n]')
+
+
+# ============================================================================
+# PRIORITY SCHEDULING
+# ============================================================================
+
+class PriorityScheduler:
+    """
+    Orders heroes for processing so the ones the app shows first finish first.
+
+    Explicitly listed IDs always go first (in the given order), followed by
+    the rest in the configured order: 'input', 'rarity' (Legendary first,
+    strongest first within a tier) or 'score' (combat score, descending).
+    """
+
+    ORDERS = ('input', 'rarity', 'score')
+
+    def __init__(self, order: str = 'input', priority_ids: Optional[List[int]] = None):
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown priority order '{order}' (expected one of {', '.join(self.ORDERS)})")
+        self.order = order
+        self.priority_ids = {hero_id: i for i, hero_id in enumerate(priority_ids or [])}
+
+    @property
+    def is_noop(self) -> bool:
+        return self.order == 'input' and not self.priority_ids
+
+    def sort(self, raw_heroes: List[RawHero], processor: StatProcessor) -> List[RawHero]:
+        """Return heroes in processing order; scores come from the processor's pass."""
+        scores = processor.combat_scores
+
+        def key(i: int) -> Tuple:
+            hero_id = raw_heroes[i].id
+            if hero_id in self.priority_ids:
+                return (0, self.priority_ids[hero_id], 0)
+            if self.order == 'rarity':
+                return (1, -RARITY_CODES[processor.assign_rarity(scores[i])], -scores[i])
+            if self.order == 'score':
+                return (1, -scores[i], 0)
+            return (1, i, 0)
+
+        return [raw_heroes[i] for i in sorted(range(len(raw_heroes)), key=key)]
+
+    @staticmethod
+    def parse_ids(value: Optional[str]) -> List[int]:
+        """IDs from a comma-separated list or a file with one ID per line."""
+        if not value:
+            return []
+        path = Path(value)
+        text = path.read_text(encoding='utf-8') if path.exists() else value
+        return [int(token) for token in re.split(r'[,\s]+', text) if token]
+
+
+# ============================================================================
+# PROFILING - EVENT LOOP LAG & STAGE TIMING
+# ============================================================================
+
+class StageProfiler:
+    """
+    Low-overhead runtime profiler for the forge pipeline.
+
+    process_hero wraps each of its stages in `stage(name)`. Synchronous
+    stages run on the event loop thread, so their time is time no other
+    hero makes progress. A lag monitor task sleeps for `interval` and
+    measures how late it wakes up; a late wake-up above `lag_threshold`
+    is reported together with the stage that held the loop the longest
+    since the previous tick.
+
+    Optionally a sampling thread records the loop thread's stack
+    (prefixed with the active stage) in collapsed-stack format for
+    flamegraph.pl / speedscope, and a cProfile profiler is switched on
+    only inside blocking stages.
+    """
+
+    MAX_REPORTED_LAGS = 20
+
+    def __init__(
+        self,
+        lag_threshold: float = 0.05,
+        interval: float = 0.01,
+        sample_interval: float = 0.005,
+        flamegraph_path: Optional[Path] = None,
+        cprofile_path: Optional[Path] = None
+    ):
+        self.lag_threshold = lag_threshold
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.flamegraph_path = flamegraph_path
+        self.cprofile_path = cprofile_path
+
+        self.current_stage: Optional[str] = None
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.max_time: Dict[str, float] = defaultdict(float)
+        self.lag_events: List[Tuple[float, str]] = []
+        self.samples: Dict[str, int] = defaultdict(int)
+        self._since_tick: Dict[str, float] = defaultdict(float)
+        self._cprofile = cProfile.Profile() if cprofile_path else None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @contextmanager
+    def stage(self, name: str, blocking: bool = True):
+        """Time a pipeline stage; blocking stages are attributed event loop lag."""
+        if blocking:
+            previous, self.current_stage = self.current_stage, name
+            if self._cprofile:
+                self._cprofile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if blocking:
+                if self._cprofile:
+                    self._cprofile.disable()
+                self.current_stage = previous
+                self._since_tick[name] += elapsed
+            self.totals[name] += elapsed
+            self.calls[name] += 1
+            if elapsed > self.max_time[name]:
+                self.max_time[name] = elapsed
+
+    async def monitor_lag(self):
+        """Run until cancelled, recording every late wake-up of the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            if lag >= self.lag_threshold:
+                since_tick = self._since_tick
+                stage = max(since_tick, key=since_tick.get) if since_tick else 'outside stages'
+                self.lag_events.append((lag, stage))
+                if len(self.lag_events) <= self.MAX_REPORTED_LAGS:
+                    tqdm.write(f"[!] Event loop blocked {lag * 1000:.0f}ms (stage: {stage})")
+            self._since_tick.clear()
+
+    def start_sampling(self):
+        """Start the stack sampling thread if a flame graph was requested."""
+        if self.flamegraph_path is None:
+            return
+        self._stop.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, args=(threading.get_ident(),), daemon=True
+        )
+        self._sampler.start()
+
+    def stop_sampling(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample_loop(self, thread_id: int):
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(f"stage:{self.current_stage or 'idle'}")
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def write_outputs(self):
+        """Write the collapsed stacks and cProfile stats, if requested."""
+        if self.flamegraph_path is not None:
+            with open(self.flamegraph_path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f"{stack} {count}\n")
+            print(f"[OK] Collapsed stacks: {self.flamegraph_path} ({sum(self.samples.values())} samples)")
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(str(self.cprofile_path))
+            print(f"[OK] cProfile stats (blocking stages only): {self.cprofile_path}")
+
+    def print_report(self):
+        print(f"\n[i] Stage Profile:")
+        print(f"  {'Stage':<18} {'Calls':>8} {'Total':>9} {'Mean':>9} {'Max':>9}")
+        for name in sorted(self.totals, key=self.totals.get, reverse=True):
+            calls = self.calls[name]
+            print(f"  {name:<18} {calls:>8} {self.totals[name]:>8.2f}s "
+                  f"{self.totals[name] / calls * 1000:>7.2f}ms {self.max_time[name] * 1000:>7.2f}ms")
+
+        print(f"\n[i] Event Loop Lag (>= {self.lag_threshold * 1000:.0f}ms): {len(self.lag_events)} events")
+        if self.lag_events:
+            by_stage: Dict[str, List[float]] = defaultdict(list)
+            for lag, stage in self.lag_events:
+                by_stage[stage].append(lag)
+            for stage, lags in sorted(by_stage.items(), key=lambda item: -sum(item[1])):
+                print(f"  {stage}: {len(lags)} events, max {max(lags) * 1000:.0f}ms, "
+                      f"total {sum(lags) * 1000:.0f}ms")
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off; stages cost one attribute lookup."""
+
+    _context = nullcontext()
+
+    def stage(self, name: str, blocking: bool = True):
+        return self._context
+
+
 # ============================================================================
 # MAIN PIPELINE
 # ============================================================================
 
+# Queue slots per worker between pipeline stages
+QUEUE_DEPTH = 2
+
+
 class HeroForge:
     """Main pipeline orchestrator."""
 
@@ -563,20 +1822,70 @@ class HeroForge:
         ai_provider: AIProvider,
         max_retries: int = 3,
         rate_limit: int = 10,
-        similarity_threshold: float = 0.60
+        similarity_threshold: float = 0.60,
+        progressive: bool = False,
+        first_n_legendaries: int = 10,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        registry: Optional[LoreRegistry] = None,
+        profiler: Optional[StageProfiler] = None,
+        name_batch: int = 0
     ):
         self.ai_provider = ai_provider
+        self.profiler = profiler
         self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
         self.rate_limit = rate_limit
+        self.progressive = progressive
+        self.first_n_legendaries = first_n_legendaries
+        self.legendary_times: List[float] = []
         self.semaphore = asyncio.Semaphore(rate_limit)
-        self.lore_guardian = LoreGuardian(similarity_threshold)
+        self.lore_guardian = LoreGuardian(similarity_threshold, registry)
+        self._lore_lock = asyncio.Lock()
+        self.name_reservoir = NameReservoir(
+            ai_provider, self.lore_guardian, name_batch, self.retry_policy, self.circuit_breaker
+        ) if name_batch > 0 else None
+        self._stages = profiler or _NullProfiler()
 
         self.stats_total = {
             'processed': 0,
             'manual_review': 0,
             'blacklist_hits': 0,
-            'similarity_retries': 0
+            'similarity_retries': 0,
+            'early_aborts': 0,
+            'parse_failures': 0,
+            'validation_failures': 0,
+            'transient_errors': 0,
+            'rate_limited': 0
         }
+        # Completed responses vs. unparsable / schema-invalid ones, per provider
+        self.parse_stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'responses': 0, 'parse_failures': 0, 'validation_failures': 0}
+        )
+
+    def _validate_name(self, name: str) -> Optional[str]:
+        """Streaming name check: blacklist and uniqueness, before the bio is generated."""
+        with self._stages.stage('stream_name_check'):
+            if not check_blacklist(name):
+                return 'blacklist'
+            if not self.lore_guardian.check_name_uniqueness(name):
+                return 'duplicate'
+            if self.name_reservoir and self.name_reservoir.is_pooled(name):
+                return 'duplicate'
+            return None
+
+    def _record_response(self, failure: Optional[str] = None):
+        """Count a completed response; failure is 'parse_failures' or 'validation_failures'."""
+        stats = self.parse_stats[self.ai_provider.__class__.__name__]
+        stats['responses'] += 1
+        if failure:
+            stats[failure] += 1
+
+    def _discard_reserved(self, reserved_name: Optional[str]):
+        """Count a reserved name that failed validation (e.g. claimed by another process)."""
+        if reserved_name:
+            self.name_reservoir.discard()
 
     async def process_hero(
         self,
@@ -585,68 +1894,144 @@ class HeroForge:
     ) -> ProcessedHero:
         """Process a single hero through the complete pipeline."""
 
+        stages = self._stages
         async with self.semaphore:  # Rate limiting
-            stats = raw_hero.to_stats()
-            combat_score = stats.compute_combat_score()
-            rarity = processor.assign_rarity(combat_score)
-            faction = processor.assign_faction(stats)
-            scaled_stats = processor.scale_stats_by_rarity(stats, rarity)
+            with stages.stage('assign_stats'):
+                stats = raw_hero.to_stats()
+                combat_score = stats.compute_combat_score()
+                rarity = processor.assign_rarity(combat_score)
+                faction = processor.assign_faction(stats)
+                scaled_stats = processor.scale_stats_by_rarity(stats, rarity)
 
             # AI Content Generation with validation loop
             content = None
             retry_count = 0
             needs_review = False
+            reserved_name = None
 
             for attempt in range(self.max_retries):
-                try:
-                    # Generate content
-                    retry_context = None
-                    if attempt > 0:
-                        retry_context = "PREVIOUS ATTEMPT FAILED VALIDATION. Generate completely different content."
-
-                    content = await self.ai_provider.generate_hero_content(
-                        scaled_stats, faction, rarity, retry_context
-                    )
+                # Generate content
+                retry_context = None
+                if attempt > 0:
+                    retry_context = "PREVIOUS ATTEMPT FAILED VALIDATION. Generate completely different content."
 
-                    # Validation 1: Blacklist check
-                    if not check_blacklist(content.name):
-                        self.stats_total['blacklist_hits'] += 1
-                        retry_count += 1
-                        continue
-
-                    if not check_blacklist(content.bio):
-                        self.stats_total['blacklist_hits'] += 1
-                        retry_count += 1
-                        continue
+                probe = await self.circuit_breaker.wait()
+                try:
+                    if self.name_reservoir and reserved_name is None:
+                        with stages.stage('reserve_name', blocking=False):
+                            reserved_name = await self.name_reservoir.take(faction)
+                    with stages.stage('generate', blocking=False):
+                        content = await self.ai_provider.generate_hero_content(
+                            scaled_stats, faction, rarity, retry_context,
+                            name_validator=None if reserved_name else self._validate_name,
+                            name=reserved_name
+                        )
+                    if reserved_name:
+                        content.name = reserved_name
+                except Exception as e:
+                    error = classify_provider_error(self.ai_provider.__class__.__name__, e)
+                    retry_count += 1
+                    last_attempt = attempt == self.max_retries - 1
 
-                    # Validation 2: Name uniqueness
-                    if not self.lore_guardian.check_name_uniqueness(content.name):
-                        retry_count += 1
-                        continue
+                    if isinstance(error, ProviderAuthError):
+                        raise error from e
 
-                    # Validation 3: Bio uniqueness
-                    is_unique, similarity, conflict = self.lore_guardian.check_bio_uniqueness(content.bio)
-                    if not is_unique:
-                        self.stats_total['similarity_retries'] += 1
-                        retry_count += 1
-                        # Add context for next retry
-                        retry_context = f"Bio was too similar ({similarity:.0%}) to: '{conflict[:100]}...'. Create completely different story."
+                    if isinstance(error, NameRejectedError):
+                        # Stream was cancelled as soon as the name was known
+                        self.circuit_breaker.record_success()
+                        self.stats_total['early_aborts'] += 1
+                        if error.reason == 'blacklist':
+                            self.stats_total['blacklist_hits'] += 1
                         continue
 
-                    # All validations passed!
-                    self.lore_guardian.add_content(content.name, content.bio)
-                    break
-
-                except Exception as e:
-                    retry_count += 1
-                    if attempt == self.max_retries - 1:
-                        # Last attempt failed
+                    if isinstance(error, ContentValidationError):
+                        # Provider is healthy, the output was not: retry at once
+                        self.circuit_breaker.record_success()
+                        failure = 'validation_failures' if isinstance(error, ContentSchemaError) else 'parse_failures'
+                        self.stats_total[failure] += 1
+                        self._record_response(failure)
+                    elif isinstance(error, TransientProviderError):
+                        self.circuit_breaker.record_failure()
+                        self.stats_total['transient_errors'] += 1
+                        if isinstance(error, ProviderRateLimitError):
+                            self.stats_total['rate_limited'] += 1
+                        if not last_attempt:
+                            await asyncio.sleep(self.retry_policy.delay(attempt, error))
+                    else:
+                        # Request rejected for this hero (4xx); the provider itself answered
+                        self.circuit_breaker.record_success()
+                        last_attempt = True
+
+                    if last_attempt:
                         needs_review = True
                         content = AIGeneratedContent(
                             name=f"REVIEW_{raw_hero.id}_{raw_hero.name[:20]}",
                             bio=f"[MANUAL REVIEW NEEDED] Original: {raw_hero.name}",
                             quote="NEEDS REVIEW"
                         )
+                        break
+                    continue
+                except BaseException:
+                    # Cancelled mid-request: no outcome to record
+                    if probe:
+                        self.circuit_breaker.abandon_probe()
+                    raise
+
+                self.circuit_breaker.record_success()
+                self._record_response()
+
+                # Validation 1: Blacklist check
+                with stages.stage('blacklist'):
+                    name_clean = check_blacklist(content.name)
+                    clean = name_clean and check_blacklist(content.bio)
+                if not clean:
+                    self.stats_total['blacklist_hits'] += 1
+                    retry_count += 1
+                    if not name_clean:
+                        self._discard_reserved(reserved_name)
+                        reserved_name = None
+                    continue
+
+                # Validation 2: Name uniqueness
+                with stages.stage('name_uniqueness'):
+                    name_unique = self.lore_guardian.check_name_uniqueness(content.name)
+                if not name_unique:
+                    retry_count += 1
+                    self._discard_reserved(reserved_name)
+                    reserved_name = None
+                    continue
+
+                # Validation 3: Bio uniqueness, then claim the name (atomic across processes).
+                # Both run in worker threads; the lock keeps check and claim together.
+                async with self._lore_lock:
+                    with stages.stage('bio_similarity', blocking=False):
+                        is_unique, similarity, conflict = await asyncio.to_thread(
+                            self.lore_guardian.check_bio_uniqueness, content.bio
+                        )
+                    claimed = False
+                    if is_unique:
+                        with stages.stage('register', blocking=False):
+                            claimed = await asyncio.to_thread(
+                                self.lore_guardian.add_content, content.name, content.bio, raw_hero.id
+                            )
+                if not is_unique:
+                    self.stats_total['similarity_retries'] += 1
+                    retry_count += 1
+                    # Add context for next retry
+                    retry_context = f"Bio was too similar ({similarity:.0%}) to: '{conflict[:100]}...'. Create completely different story."
+                    continue
+
+                if not claimed:
+                    retry_count += 1
+                    self._discard_reserved(reserved_name)
+                    reserved_name = None
+                    continue
+                reserved_name = None
+                break
+
+            if reserved_name and needs_review:
+                # Placeholder content replaces the hero; the name is still free
+                self.name_reservoir.release(faction, reserved_name)
 
             if content is None or needs_review:
                 needs_review = True
@@ -660,60 +2045,148 @@ class HeroForge:
 
             self.stats_total['processed'] += 1
 
-            return ProcessedHero(
-                id=raw_hero.id,
-                originalName=raw_hero.name,
-                name=content.name,
-                faction=faction,
-                rarity=rarity,
-                bio=content.bio,
-                quote=content.quote,
-                stats=scaled_stats,
-                combatScore=round(combat_score, 2),
-                image=raw_hero.image,
-                needsManualReview=needs_review,
-                retryCount=retry_count
-            )
+            with stages.stage('build_model'):
+                return ProcessedHero(
+                    id=raw_hero.id,
+                    originalName=raw_hero.name,
+                    name=content.name,
+                    faction=faction,
+                    rarity=rarity,
+                    bio=content.bio,
+                    quote=content.quote,
+                    stats=scaled_stats,
+                    combatScore=round(combat_score, 2),
+                    image=raw_hero.image,
+                    needsManualReview=needs_review,
+                    retryCount=retry_count
+                )
 
     async def process_all(
         self,
-        raw_heroes: List[RawHero],
-        output_path: Path
-    ) -> List[ProcessedHero]:
-        """Process all heroes with progress bar."""
+        raw_heroes: Iterable[RawHero],
+        output_path: Path,
+        sketch: Optional[RaritySketch] = None,
+        processor: Optional[StatProcessor] = None
+    ) -> HeroStore:
+        """
+        Process all heroes with progress bar.
 
-        processor = StatProcessor(raw_heroes)
+        Heroes flow loader -> bounded input queue -> fixed worker pool ->
+        bounded output queue -> writer, so only a constant number of heroes
+        is in flight regardless of input size. raw_heroes may be a stream
+        if a processor built from a previous pass over the input is given.
+        """
+
+        if processor is None:
+            raw_heroes = list(raw_heroes)  # Thresholds need every score up front
+            processor = StatProcessor(raw_heroes, sketch=sketch)
+        total = len(processor.combat_scores)
 
         print(f"\n[*] Starting Hero Forge Pipeline")
-        print(f"[i] Processing {len(raw_heroes)} heroes")
+        print(f"[i] Processing {total} heroes")
         print(f"[>] Rate limit: {self.rate_limit} concurrent requests")
         print(f"[~] AI Provider: {self.ai_provider.__class__.__name__}\n")
 
-        tasks = [
-            self.process_hero(hero, processor)
-            for hero in raw_heroes
-        ]
-
-        processed = []
-        for coro in tqdm.as_completed(tasks, total=len(tasks), desc="Processing Heroes"):
-            hero = await coro
-            processed.append(hero)
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=self.rate_limit * QUEUE_DEPTH)
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=self.rate_limit * QUEUE_DEPTH)
+        processed = HeroStore(total)
+
+        # Expected heroes per rarity, so finished tiers can be written early
+        expected = {rarity: 0 for rarity in Rarity}
+        for score in processor.combat_scores:
+            expected[processor.assign_rarity(score)] += 1
+        self._started = time.perf_counter()
+
+        with tqdm(total=total, desc="Processing Heroes") as progress:
+            tasks = [
+                asyncio.create_task(self._produce(raw_heroes, inbox)),
+                *(asyncio.create_task(self._work(processor, inbox, outbox)) for _ in range(self.rate_limit)),
+                asyncio.create_task(self._write(outbox, processed, progress, expected, output_path)),
+            ]
+            monitor = None
+            if self.profiler:
+                monitor = asyncio.create_task(self.profiler.monitor_lag())
+                self.profiler.start_sampling()
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # On Ctrl-C or a failing stage, stop every stage before returning
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if monitor:
+                    monitor.cancel()
+                    await asyncio.gather(monitor, return_exceptions=True)
+                    self.profiler.stop_sampling()
 
         # Sort by original ID
-        processed.sort(key=lambda h: h.id)
+        processed.sort_by_id()
 
         # Save to file
-        output_path.write_text(
-            json.dumps([h.dict() for h in processed], indent=2, ensure_ascii=False),
-            encoding='utf-8'
-        )
+        processed.write_json(output_path)
 
         # Print statistics
         self._print_stats(processed, processor)
+        if self.profiler:
+            self.profiler.print_report()
+            self.profiler.write_outputs()
 
         return processed
 
-    def _print_stats(self, processed: List[ProcessedHero], processor: StatProcessor):
+    async def _produce(self, raw_heroes: Iterable[RawHero], inbox: asyncio.Queue):
+        """Feed heroes into the input queue; blocks while workers are saturated."""
+        for hero in raw_heroes:
+            await inbox.put(hero)
+        for _ in range(self.rate_limit):
+            await inbox.put(None)  # One stop signal per worker
+
+    async def _work(self, processor: StatProcessor, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        """Worker: process heroes until the stop signal arrives."""
+        while True:
+            hero = await inbox.get()
+            if hero is None:
+                break
+            await outbox.put(await self.process_hero(hero, processor))
+        await outbox.put(None)
+
+    async def _write(
+        self,
+        outbox: asyncio.Queue,
+        processed: HeroStore,
+        progress: tqdm,
+        expected: Dict[Rarity, int],
+        output_path: Path
+    ):
+        """Writer: move finished heroes into the compact store."""
+        done = {rarity: 0 for rarity in Rarity}
+        running = self.rate_limit
+        while running:
+            hero = await outbox.get()
+            if hero is None:
+                running -= 1
+                continue
+            with self._stages.stage('store'):
+                processed.append(hero)
+            progress.update(1)
+
+            done[hero.rarity] += 1
+            if hero.rarity == Rarity.LEGENDARY:
+                self.legendary_times.append(time.perf_counter() - self._started)
+            if self.progressive and done[hero.rarity] == expected[hero.rarity]:
+                # Off the loop so in-flight streams keep going; the store is only
+                # appended to here, so it cannot change during the write
+                await asyncio.to_thread(self._write_tier, processed, hero.rarity, output_path)
+
+    @staticmethod
+    def _write_tier(processed: HeroStore, rarity: Rarity, output_path: Path):
+        """Write a finished rarity tier next to the output, usable before the run ends."""
+        rows = np.flatnonzero(processed.rarities[:len(processed)] == RARITY_CODES[rarity])
+        rows = rows[np.argsort(processed.ids[rows], kind='stable')]
+        tier_path = output_path.with_name(f"{output_path.stem}.{rarity.value.lower()}{output_path.suffix}")
+        processed.write_json(tier_path, rows.tolist())
+        tqdm.write(f"[OK] {rarity.value} tier complete: {tier_path} ({len(rows)} heroes)")
+
+    def _print_stats(self, processed: HeroStore, processor: StatProcessor):
         """Print pipeline statistics."""
 
         print(f"\n{'='*60}")
@@ -725,26 +2198,1213 @@ class HeroForge:
         print(f"  Manual Review Needed: {self.stats_total['manual_review']} ({self.stats_total['manual_review']/len(processed)*100:.1f}%)")
         print(f"  Blacklist Hits (retried): {self.stats_total['blacklist_hits']}")
         print(f"  Similarity Retries: {self.stats_total['similarity_retries']}")
+        print(f"  Early Stream Aborts (name rejected): {self.stats_total['early_aborts']}")
+        print(f"  Parse Failures (retried immediately): {self.stats_total['parse_failures']}")
+        print(f"  Validation Failures (fields/lengths, retried immediately): {self.stats_total['validation_failures']}")
+        for provider, stats in self.parse_stats.items():
+            if self.ai_provider.structured_output_fallback:
+                mode = 'free text after structured output was rejected'
+            else:
+                mode = 'structured' if self.ai_provider.structured_output else 'free text'
+            responses = stats['responses'] or 1
+            print(f"    {provider} ({mode}): {stats['parse_failures'] / responses * 100:.1f}% unparsable, "
+                  f"{stats['validation_failures'] / responses * 100:.1f}% invalid of {stats['responses']} responses")
+        print(f"  Transient Errors (backoff): {self.stats_total['transient_errors']} ({self.stats_total['rate_limited']} rate limited)")
+        print(f"  Circuit Breaker Trips: {self.circuit_breaker.trips}")
+        if self.name_reservoir:
+            reservoir = self.name_reservoir.stats
+            print(f"  Name Reservoir: {reservoir['handed_out']} names handed out, "
+                  f"{reservoir['accepted']}/{reservoir['generated']} accepted in {reservoir['batches']} batches, "
+                  f"{reservoir['discarded']} discarded, {reservoir['refill_failures']} failed refills")
+        if self.legendary_times:
+            n = min(self.first_n_legendaries, len(self.legendary_times))
+            first = f"Time to first {n} Legendary: {self.legendary_times[n - 1]:.1f}s " if n > 0 else ""
+            print(f"  {first}(all {len(self.legendary_times)} Legendary: {self.legendary_times[-1]:.1f}s)")
 
         print(f"\n[>] Faction Distribution:")
+        faction_counts = processed.counts('factions', len(FACTIONS))
         for faction in Faction:
-            count = sum(1 for h in processed if h.faction == faction)
+            count = faction_counts[FACTION_CODES[faction]]
             print(f"  {faction.value}: {count} ({count/len(processed)*100:.1f}%)")
 
         print(f"\n[*] Rarity Distribution:")
+        rarity_counts = processed.counts('rarities', len(RARITIES))
         for rarity in Rarity:
-            count = sum(1 for h in processed if h.rarity == rarity)
+            count = rarity_counts[RARITY_CODES[rarity]]
             print(f"  {rarity.value}: {count} ({count/len(processed)*100:.1f}%)")
 
         print(f"\n[~] Sample Heroes:")
         for rarity in [Rarity.LEGENDARY, Rarity.EPIC]:
-            heroes = [h for h in processed if h.rarity == rarity and not h.needsManualReview]
-            if heroes:
-                sample = random.choice(heroes)
-                print(f"\n  [{rarity.value}] {sample.name}")
-                print(f"    Faction: {sample.faction.value}")
-                print(f"    Bio: {sample.bio}")
-                print(f"    Quote: \"{sample.quote}\"")
+            candidates = np.flatnonzero(
+                (processed.rarities[:len(processed)] == RARITY_CODES[rarity]) &
+                ~processed.needs_review[:len(processed)]
+            )
+            if len(candidates):
+                sample = processed.record(int(random.choice(candidates)))
+                print(f"\n  [{rarity.value}] {sample['name']}")
+                print(f"    Faction: {sample['faction']}")
+                print(f"    Bio: {sample['bio']}")
+                print(f"    Quote: \"{sample['quote']}\"")
+
+
+# ============================================================================
+# BUNDLE EXPORT
+# ============================================================================
+
+BUNDLE_VERSION = 1
+
+# Numeric columns written to core.bin: (name, little-endian dtype)
+BUNDLE_COLUMNS: List[Tuple[str, str]] = [
+    ('id', '<u4'),
+    ('combatScore', '<u2'),  # score * 100
+    ('strength', 'u1'),
+    ('speed', 'u1'),
+    ('power', 'u1'),
+    ('durability', 'u1'),
+    ('combat', 'u1'),
+    ('intelligence', 'u1'),
+    ('faction', 'u1'),       # index into manifest["factions"]
+    ('rarity', 'u1'),        # index into manifest["rarities"]
+    ('retryCount', 'u1'),
+    ('needsManualReview', 'u1'),
+]
+
+# Fields needed for first render vs. fields loaded on demand (detail view)
+BUNDLE_LABEL_FIELDS = ['name', 'image']
+BUNDLE_TEXT_FIELDS = ['originalName', 'bio', 'quote']
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip copies are written without it
+    brotli = None
+
+
+class BundleExporter:
+    """
+    Writes forge output as a compact bundle for the HeroRank frontend:
+    numeric stats as columnar typed arrays (core.bin), names/images as a
+    small columnar JSON, long text in a separate lazily-loaded file,
+    per-faction and per-rarity shards, precompressed .gz/.br copies and
+    a manifest with content hashes.
+    """
+
+    def __init__(self, bundle_dir: Path, compress: bool = True):
+        self.bundle_dir = bundle_dir
+        self.compress = compress
+        self.files: Dict[str, Dict] = {}
+
+    def export(self, heroes: HeroStore) -> Dict:
+        """Write the full bundle and return the manifest."""
+        self.bundle_dir.mkdir(parents=True, exist_ok=True)
+        rows = heroes.id_order()
+
+        bundles = {'all': self._write_bundle(heroes, rows, 'all')}
+
+        factions = heroes.factions[rows]
+        for faction in Faction:
+            subset = rows[factions == FACTION_CODES[faction]]
+            if len(subset):
+                bundles[f'faction/{_slug(faction.value)}'] = self._write_bundle(
+                    heroes, subset, f'faction-{_slug(faction.value)}'
+                )
+
+        rarities = heroes.rarities[rows]
+        for rarity in Rarity:
+            subset = rows[rarities == RARITY_CODES[rarity]]
+            if len(subset):
+                bundles[f'rarity/{_slug(rarity.value)}'] = self._write_bundle(
+                    heroes, subset, f'rarity-{_slug(rarity.value)}'
+                )
+
+        manifest = {
+            'version': BUNDLE_VERSION,
+            'count': len(heroes),
+            'factions': [f.value for f in Faction],
+            'rarities': [r.value for r in Rarity],
+            'bundles': bundles,
+            'files': self.files,
+        }
+        self._write_file('manifest.json', _compact_json(manifest), track=False)
+        return manifest
+
+    def _write_bundle(self, heroes: HeroStore, rows: np.ndarray, prefix: str) -> Dict:
+        """Write core/labels/text files for one hero subset (store rows, in order)."""
+        core, layout = self._encode_core(heroes, rows)
+        texts = [heroes.text(i) for i in rows.tolist()]
+        labels = {field: [t[field] for t in texts] for field in BUNDLE_LABEL_FIELDS}
+        text = {field: [t[field] for t in texts] for field in BUNDLE_TEXT_FIELDS}
+
+        return {
+            'count': len(rows),
+            'core': self._write_file(f'{prefix}.core.bin', core),
+            'columns': layout,
+            'labels': self._write_file(f'{prefix}.labels.json', _compact_json(labels)),
+            'text': self._write_file(f'{prefix}.text.json', _compact_json(text)),
+        }
+
+    @staticmethod
+    def _encode_core(heroes: HeroStore, rows: np.ndarray) -> Tuple[bytes, Dict[str, Dict]]:
+        """Pack numeric fields column by column."""
+        values = {
+            'id': heroes.ids[rows],
+            # Same rounding as the output JSON (2 decimals), then to hundredths
+            'combatScore': [round(round(score, 2) * 100) for score in heroes.combat_scores[rows].tolist()],
+            'faction': heroes.factions[rows],
+            'rarity': heroes.rarities[rows],
+            'retryCount': heroes.retry_counts[rows],
+            'needsManualReview': heroes.needs_review[rows],
+        }
+        for j, stat in enumerate(STAT_NAMES):
+            values[stat] = heroes.stats[rows, j]
+
+        return pack_columns([
+            (name, np.asarray(values[name], dtype=dtype))
+            for name, dtype in BUNDLE_COLUMNS
+        ])
+
+    def _write_file(self, name: str, data: bytes, track: bool = True) -> str:
+        """Write a file plus precompressed copies and record its content hash."""
+        entry = write_bundle_file(self.bundle_dir, name, data, self.compress)
+        if track:
+            self.files[name] = entry
+        return name
+
+
+def pack_columns(columns: List[Tuple[str, np.ndarray]]) -> Tuple[bytes, Dict[str, Dict]]:
+    """Concatenate arrays into one buffer, 4-byte aligned for TypedArray views."""
+    chunks = []
+    layout = {}
+    offset = 0
+    for name, array in columns:
+        data = np.ascontiguousarray(array).tobytes()
+        layout[name] = {'dtype': array.dtype.name, 'offset': offset, 'length': int(array.size)}
+        if array.ndim > 1:
+            layout[name]['shape'] = list(array.shape)
+        padding = -len(data) % 4
+        chunks.append(data + b'\0' * padding)
+        offset += len(data) + padding
+
+    return b''.join(chunks), layout
+
+
+def write_bundle_file(bundle_dir: Path, name: str, data: bytes, compress: bool = True) -> Dict:
+    """Write a bundle file plus .gz/.br copies; returns its manifest entry."""
+    (bundle_dir / name).write_bytes(data)
+
+    entry = {
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'bytes': len(data),
+    }
+    if compress:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        (bundle_dir / f'{name}.gz').write_bytes(gz)
+        entry['gzip'] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            (bundle_dir / f'{name}.br').write_bytes(br)
+            entry['br'] = len(br)
+
+    return entry
+
+
+def _slug(value: str) -> str:
+    return value.lower().replace(' ', '-')
+
+
+def _compact_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# ============================================================================
+# MATCHUP MATRIX
+# ============================================================================
+
+# Max float32 cells per block (~8 MB, keeps temporaries cache-friendly)
+MATCHUP_BLOCK_CELLS = 2_000_000
+
+
+def stats_matrix(stats: Sequence) -> np.ndarray:
+    """
+    Stack stats into an (N, 6) float32 array in STAT_NAMES order.
+
+    Accepts HeroStats or plain stat dicts (e.g. record['stats']); missing
+    or null dict entries count as 0.
+    """
+    return np.array(
+        [
+            [(s.get(stat) or 0) if isinstance(s, dict) else getattr(s, stat) for stat in STAT_NAMES]
+            for s in stats
+        ],
+        dtype=np.float32
+    ).reshape(len(stats), len(STAT_NAMES))
+
+
+def faction_multiplier_table() -> np.ndarray:
+    """3x3 attacker/defender damage multipliers indexed by FACTION_CODES."""
+    table = np.ones((len(Faction), len(Faction)), dtype=np.float32)
+    for attacker, a in FACTION_CODES.items():
+        for defender, d in FACTION_CODES.items():
+            table[a, d] = faction_multiplier(attacker, defender)
+    return table
+
+
+class MatchupMatrixBuilder:
+    """
+    Precomputes faction-aware expected advantage for every hero pair.
+
+    advantage[i, j] = (S_i * m_ij - S_j * m_ji) / (S_i * m_ij + S_j * m_ji)
+
+    where S is the combat score of the (rarity-scaled) stats and m the
+    faction multiplier. Values lie in [-1, 1]; positive means i is
+    favoured. Rows are computed in blocks so N x N never has to fit in
+    memory; the full matrix is only written (memory-mapped) on request.
+    """
+
+    def __init__(self, heroes: HeroStore, block_cells: int = MATCHUP_BLOCK_CELLS):
+        rows = heroes.id_order()
+        self.ids = heroes.ids[rows]
+        weights = np.array([COMBAT_SCORE_WEIGHTS[stat] for stat in STAT_NAMES], dtype=np.float32)
+        self.scores = heroes.stats[rows].astype(np.float32) @ weights
+        self.factions = heroes.factions[rows].astype(np.intp)
+        self.block_rows = max(1, block_cells // max(1, len(self.ids)))
+
+        # Per attacker faction: multiplier against every hero, and every
+        # hero's effective score when hitting back. Rows of a block are then
+        # plain row lookups instead of per-cell multiplier gathers.
+        table = faction_multiplier_table()
+        self.attack_mult = table[:, self.factions]
+        self.defend_score = table[self.factions, :].T * self.scores[None, :]
+
+    def advantage_block(self, start: int, stop: int) -> np.ndarray:
+        """Advantage of heroes [start, stop) against every hero, shape (stop-start, N)."""
+        fi = self.factions[start:stop]
+        attack = self.attack_mult[fi]
+        attack *= self.scores[start:stop, None]
+        defend = self.defend_score[fi]
+
+        total = attack + defend
+        attack -= defend
+        advantage = np.zeros_like(attack)
+        np.divide(attack, total, out=advantage, where=total > 0)
+        return advantage
+
+    def build(self, out_dir: Path, top_k: int = 10, write_matrix: bool = False, compress: bool = True) -> Dict:
+        """Write the top-k counters/victims index (and optionally the full matrix)."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        n = len(self.ids)
+        k = max(0, min(top_k, n - 1))
+
+        counters = np.zeros((n, k), dtype=np.uint32)
+        victims = np.zeros((n, k), dtype=np.uint32)
+        counter_adv = np.zeros((n, k), dtype=np.int8)
+        victim_adv = np.zeros((n, k), dtype=np.int8)
+
+        matrix = None
+        if write_matrix:
+            matrix = np.lib.format.open_memmap(
+                out_dir / 'matchups.matrix.npy', mode='w+', dtype=np.float16, shape=(n, n)
+            )
+
+        for start in range(0, n, self.block_rows):
+            stop = min(n, start + self.block_rows)
+            block = self.advantage_block(start, stop)
+            if matrix is not None:
+                matrix[start:stop] = block
+            if k == 0:
+                continue
+
+            rows = np.arange(stop - start)
+            own = np.arange(start, stop)
+
+            # Counters: opponents with the lowest advantage (they beat this hero)
+            block[rows, own] = np.inf
+            counters[start:stop], counter_adv[start:stop] = self._top_k(block, k)
+
+            # Victims: opponents with the highest advantage
+            block[rows, own] = -np.inf
+            np.negative(block, out=block)
+            victims[start:stop], victim_adv[start:stop] = self._top_k(block, k)
+            np.negative(victim_adv[start:stop], out=victim_adv[start:stop])
+
+        if matrix is not None:
+            matrix.flush()
+
+        data, layout = pack_columns([
+            ('counters', counters),
+            ('counterAdvantage', counter_adv),
+            ('victims', victims),
+            ('victimAdvantage', victim_adv),
+        ])
+        meta = {
+            'count': n,
+            'k': k,
+            # Row i refers to the i-th hero in id order (same as all.core.bin)
+            'ids': self.ids.tolist(),
+            'advantageScale': 127,
+            'columns': layout,
+            'file': 'matchups.topk.bin',
+            'files': {'matchups.topk.bin': write_bundle_file(out_dir, 'matchups.topk.bin', data, compress)},
+        }
+        if matrix is not None:
+            meta['matrix'] = 'matchups.matrix.npy'
+        (out_dir / 'matchups.json').write_bytes(_compact_json(meta))
+        return meta
+
+    @staticmethod
+    def _top_k(block: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and int8-scaled values of the k smallest entries per row, sorted."""
+        part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(values, axis=1, kind='stable')
+        indices = np.take_along_axis(part, order, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        return indices.astype(np.uint32), np.rint(values * 127).astype(np.int8)
+
+
+# ============================================================================
+# SIMILAR HEROES - K-NEAREST NEIGHBOURS ON STAT VECTORS
+# ============================================================================
+
+# Points per KD-tree leaf; leaves are scanned as one vectorized block.
+# Ad-hoc queries favour larger leaves (fewer Python steps), the all-pairs
+# precompute smaller ones (tighter boxes to prune against).
+SIMILARITY_LEAF_SIZE = 256
+SIMILARITY_BATCH_LEAF_SIZE = 32
+
+# Stored neighbour distances are Euclidean distance * scale as uint16
+SIMILARITY_DISTANCE_SCALE = 100
+
+# Neighbour slot left empty because the group has fewer than k other heroes
+SIMILARITY_MISSING = np.iinfo(np.uint32).max
+
+
+# Leaves scanned per step of an ad-hoc query before re-checking the bound
+SIMILARITY_QUERY_CHUNK = 8
+
+
+class SimilarityIndex:
+    """
+    KD-tree over six-dimensional stat vectors (Euclidean distance).
+
+    The tree is built with argpartition median splits on the widest
+    dimension and only its leaves are kept: points are stored
+    leaf-contiguous with one bounding box per leaf. Lookups rank all leaf
+    boxes by distance in one vectorized step, scan leaves nearest-first
+    and stop once the next box is farther than the k-th hit.
+    """
+
+    def __init__(self, vectors: np.ndarray, leaf_size: int = SIMILARITY_LEAF_SIZE):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        n = len(vectors)
+        perm = np.arange(n)
+        leaves = []
+
+        stack = [(0, n)] if n else []
+        while stack:
+            start, stop = stack.pop()
+            points = vectors[perm[start:stop]]
+            if stop - start <= leaf_size:
+                leaves.append((start, stop))
+                continue
+            dim = int(np.argmax(np.ptp(points, axis=0)))
+            mid = (start + stop) // 2
+            perm[start:stop] = perm[start:stop][np.argpartition(points[:, dim], mid - start)]
+            stack.extend([(start, mid), (mid, stop)])
+
+        leaves.sort()
+        self.perm = perm                       # tree position -> input row
+        self.rank = np.empty_like(perm)        # input row -> tree position
+        self.rank[perm] = np.arange(n)
+        self.points = vectors[perm]            # leaf-contiguous copy
+        self.norms = np.einsum('ij,ij->i', self.points, self.points)
+        self.leaf_start = np.array([start for start, _ in leaves], dtype=np.intp)
+        self.leaf_size = np.array([stop - start for start, stop in leaves], dtype=np.intp)
+        self.leaf_lo = np.array([self.points[a:b].min(axis=0) for a, b in leaves], dtype=np.float32).reshape(-1, vectors.shape[1])
+        self.leaf_hi = np.array([self.points[a:b].max(axis=0) for a, b in leaves], dtype=np.float32).reshape(-1, vectors.shape[1])
+
+    def __len__(self) -> int:
+        return len(self.perm)
+
+    def query(self, point: np.ndarray, k: int = 10, exclude: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Input rows and distances of the k nearest points, closest first."""
+        point = np.asarray(point, dtype=np.float32).reshape(1, -1)
+        norm = np.einsum('ij,ij->i', point, point)[:, None]
+        exclude_pos = self.rank[exclude] if exclude is not None else -1
+        box = self._box_distance(point)[0]
+        order = np.argsort(box)
+        best_pos = np.empty((1, 0), dtype=np.intp)
+        best_dist = np.empty((1, 0), dtype=np.float32)
+
+        for chunk in range(0, len(order), SIMILARITY_QUERY_CHUNK):
+            if best_dist.shape[1] == k and box[order[chunk]] > best_dist[0, -1]:
+                break
+            pos = self._positions(order[chunk:chunk + SIMILARITY_QUERY_CHUNK])
+            dist = self._distance(point, norm, pos)
+            dist[0, pos == exclude_pos] = np.inf
+            best_pos, best_dist = self._merge(best_pos, best_dist, pos[None, :], dist, k)
+
+        valid = np.isfinite(best_dist[0])
+        return self.perm[best_pos[0][valid]], np.sqrt(best_dist[0][valid])
+
+    def all_neighbours(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest other points for every point, shape (N, k), in input row order.
+
+        Per leaf: exact neighbours among the closest leaves give every point
+        an upper bound; a second pass scans only the leaves some point of
+        the leaf can still reach within its own bound.
+        """
+        n = len(self)
+        k = max(0, min(k, n - 1))
+        rows_out = np.zeros((n, k), dtype=np.intp)
+        dist_out = np.zeros((n, k), dtype=np.float32)
+        if k == 0:
+            return rows_out, dist_out
+
+        for start, size in zip(self.leaf_start, self.leaf_size):
+            own = np.arange(start, start + size)
+            points = self.points[own]
+            box = self._box_distance(points)
+            order = np.argsort(box.min(axis=0))
+
+            # Seed with the nearest leaves covering at least 16 * (k + 1) points
+            seeded = int(np.searchsorted(np.cumsum(self.leaf_size[order]), 16 * (k + 1))) + 1
+            pos = self._positions(order[:seeded])
+            best_pos, best_dist = self._merge(
+                np.empty((size, 0), dtype=np.intp), np.empty((size, 0), dtype=np.float32),
+                np.broadcast_to(pos, (size, len(pos))), self._self_masked(own, pos), k
+            )
+
+            rest = order[seeded:]
+            rest = rest[(box[:, rest] <= best_dist[:, -1:]).any(axis=0)]
+            if len(rest):
+                pos = self._positions(rest)
+                best_pos, best_dist = self._merge_below(best_pos, best_dist, pos, self._self_masked(own, pos))
+
+            rows_out[self.perm[own]] = self.perm[best_pos]
+            dist_out[self.perm[own]] = np.sqrt(best_dist)
+        return rows_out, dist_out
+
+    def _box_distance(self, points: np.ndarray) -> np.ndarray:
+        """Squared distance from each point to each leaf box, shape (m, leaves)."""
+        gap = np.maximum(self.leaf_lo[None] - points[:, None], 0)
+        gap += np.maximum(points[:, None] - self.leaf_hi[None], 0)
+        return np.einsum('ijk,ijk->ij', gap, gap)
+
+    def _positions(self, leaves: np.ndarray) -> np.ndarray:
+        """Tree positions of all points in `leaves`."""
+        sizes = self.leaf_size[leaves]
+        offsets = np.repeat(self.leaf_start[leaves] - np.cumsum(sizes) + sizes, sizes)
+        return offsets + np.arange(sizes.sum())
+
+    def _distance(self, points: np.ndarray, norms: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        """Squared distances between points and tree positions, shape (m, len(pos))."""
+        block = points @ self.points[pos].T
+        block *= -2
+        block += norms
+        block += self.norms[None, pos]
+        return np.maximum(block, 0, out=block)
+
+    def _self_masked(self, own: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        """Distances from the points at `own` to `pos`, excluding each point itself."""
+        dist = self._distance(self.points[own], self.norms[own, None], pos)
+        dist[own[:, None] == pos[None, :]] = np.inf
+        return dist
+
+    @staticmethod
+    def _merge(best_pos, best_dist, pos, dist, k) -> Tuple[np.ndarray, np.ndarray]:
+        """Row-wise k smallest of the current best and a new candidate block, sorted."""
+        pos = np.concatenate([best_pos, pos], axis=1)
+        dist = np.concatenate([best_dist, dist], axis=1)
+        if dist.shape[1] > k:
+            part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            pos, dist = np.take_along_axis(pos, part, axis=1), np.take_along_axis(dist, part, axis=1)
+        order = np.argsort(dist, axis=1, kind='stable')
+        return np.take_along_axis(pos, order, axis=1), np.take_along_axis(dist, order, axis=1)
+
+    @staticmethod
+    def _merge_below(best_pos, best_dist, pos, dist) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Like _merge for a block where most cells exceed each row's k-th
+        distance: only the cells below it are gathered and ranked.
+        """
+        m, k = best_dist.shape
+        hit_rows, hit_cols = np.nonzero(dist < best_dist[:, -1:])
+        rows = np.concatenate([np.repeat(np.arange(m), k), hit_rows])
+        cand_pos = np.concatenate([best_pos.ravel(), pos[hit_cols]])
+        cand_dist = np.concatenate([best_dist.ravel(), dist[hit_rows, hit_cols]])
+
+        order = np.lexsort((cand_dist, rows))
+        rows, cand_pos, cand_dist = rows[order], cand_pos[order], cand_dist[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = rank < k
+        return cand_pos[keep].reshape(m, k), cand_dist[keep].reshape(m, k)
+
+
+class SimilarHeroesBuilder:
+    """
+    Precomputes the k most similar heroes (closest stat vectors) per hero.
+
+    `within` restricts neighbours to the same faction or rarity; each
+    group then gets its own tree. Rows follow id order like all.core.bin
+    and matchups.topk.bin.
+    """
+
+    GROUPS = ('all', 'faction', 'rarity')
+
+    def __init__(self, heroes: HeroStore, within: str = 'all'):
+        if within not in self.GROUPS:
+            raise ValueError(f"within must be one of {self.GROUPS}")
+        rows = heroes.id_order()
+        self.ids = heroes.ids[rows]
+        self.within = within
+        self.vectors = heroes.stats[rows].astype(np.float32)
+        self.codes = {'faction': heroes.factions, 'rarity': heroes.rarities}.get(within, heroes.factions)[rows]
+
+    def groups(self) -> Dict[str, np.ndarray]:
+        """Rows per restriction group."""
+        if self.within == 'all':
+            return {'all': np.arange(len(self.ids))}
+        names = FACTIONS if self.within == 'faction' else RARITIES
+        return {names[code].value: np.flatnonzero(self.codes == code) for code in np.unique(self.codes).tolist()}
+
+    def neighbours(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Neighbour rows (global) and distances, shape (N, k), closest first.
+
+        Groups with k or fewer heroes fill the remaining slots with
+        SIMILARITY_MISSING and an infinite distance.
+        """
+        rows_out = np.full((len(self.ids), k), SIMILARITY_MISSING, dtype=np.uint32)
+        dist_out = np.full((len(self.ids), k), np.inf, dtype=np.float32)
+        for rows in self.groups().values():
+            local, dist = SimilarityIndex(self.vectors[rows], SIMILARITY_BATCH_LEAF_SIZE).all_neighbours(k)
+            found = local.shape[1]
+            rows_out[rows, :found] = rows[local]
+            dist_out[rows, :found] = dist
+        return rows_out, dist_out
+
+    def build(self, out_dir: Path, top_k: int = 10, compress: bool = True) -> Dict:
+        """Write similar.topk.bin and similar.json into the bundle directory."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        rows, dist = self.neighbours(top_k)
+        distances = np.minimum(np.rint(dist * SIMILARITY_DISTANCE_SCALE), np.iinfo(np.uint16).max).astype(np.uint16)
+
+        data, layout = pack_columns([('neighbours', rows), ('distance', distances)])
+        meta = {
+            'count': len(self.ids),
+            'k': top_k,
+            'within': self.within,
+            'ids': self.ids.tolist(),
+            'stats': STAT_NAMES,
+            'distanceScale': SIMILARITY_DISTANCE_SCALE,
+            'missing': SIMILARITY_MISSING,
+            'columns': layout,
+            'file': 'similar.topk.bin',
+            'files': {'similar.topk.bin': write_bundle_file(out_dir, 'similar.topk.bin', data, compress)},
+        }
+        (out_dir / 'similar.json').write_bytes(_compact_json(meta))
+        return meta
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with path.open(encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path}: expected a JSON array")
+        pos = 1
+        eof = False
+
+        while True:
+            # Skip separators; refill when the buffer runs dry
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            yield item
+            pos = end
+
+
+def iter_raw_heroes(path: Path, limit: Optional[int] = None) -> Iterator[RawHero]:
+    """Stream RawHero objects from an input file."""
+    for i, data in enumerate(iter_json_array(path)):
+        if limit is not None and i >= limit:
+            return
+        yield RawHero(**data)
+
+
+def load_processed_heroes(path: Path, limit: Optional[int] = None) -> HeroStore:
+    """Load (the first `limit` heroes of) an existing forge output file into a store."""
+    store = HeroStore()
+    for record in iter_json_array(path):
+        if limit and len(store) >= limit:
+            break
+        store.append(ProcessedHero(**record))  # Validates the file once; the model is dropped
+    return store
+
+
+# ============================================================================
+# SOURCE INGESTION
+# ============================================================================
+
+# Correction buckets in lookup priority order (power-corrections.json)
+CORRECTION_TIERS = ['Cosmic', 'S', 'A', 'B', 'C', 'D', 'downgrade']
+
+# Power from stats when no correction exists (insertion order = summation order)
+POWER_WEIGHTS = {'strength': 0.25, 'speed': 0.15, 'durability': 0.25, 'intelligence': 0.15, 'combat': 0.2}
+POWER_TIERS = [(90, 'S'), (75, 'A'), (55, 'B'), (40, 'C')]
+
+# Replacement stats for raw records with every stat at 100 (broken data);
+# the first key contained in the race wins
+RACE_DEFAULT_STATS = {
+    'human': (30, 30, 30, 50, 50),
+    'mutant': (50, 45, 50, 55, 60),
+    'inhuman': (55, 50, 55, 50, 55),
+    'asgardian': (75, 60, 80, 60, 75),
+    'eternal': (70, 65, 75, 70, 65),
+    'demon': (65, 50, 70, 55, 60),
+    'vampire': (55, 50, 60, 50, 60),
+    'alien': (55, 50, 55, 55, 50),
+    'robot': (60, 45, 70, 60, 50),
+    'symbiote': (65, 55, 60, 40, 65),
+    'god': (80, 70, 85, 70, 75),
+}
+DEFAULT_RACE_STATS = (45, 40, 45, 45, 45)
+
+
+class SourceIngest:
+    """
+    Builds forge input directly from src/data/marvel-raw.json and the
+    curated DC roster (src/data/dc-roster.json).
+
+    Replaces the scripts/generate-heroes.cjs -> superheroes.json step.
+    The DC roster is the script's dcHeroesBase + generateMoreDCHeroes list
+    in the same order, with the stats superheroes.json shipped (the script
+    rolls them with Math.random).
+    Power corrections and manual descriptions are indexed once by
+    (universe, name), so each raw record is corrected with O(1) lookups
+    instead of scanning every correction bucket per hero.
+    """
+
+    def __init__(self, corrections: Dict[Tuple[str, str], Dict], descriptions: Dict[Tuple[str, str], str]):
+        self.corrections = corrections
+        self.descriptions = descriptions
+
+    @classmethod
+    def from_dir(cls, corrections_dir: Path) -> 'SourceIngest':
+        """Index power-corrections.json and descriptions.json."""
+        power = json.loads((corrections_dir / 'power-corrections.json').read_text(encoding='utf-8'))
+        corrections = {}
+        for universe, buckets in power['corrections'].items():
+            for bucket in CORRECTION_TIERS:
+                for name, correction in buckets.get(bucket, {}).items():
+                    # An explicit tier wins; downgrades must name theirs
+                    tier = correction.get('tier') or (bucket if bucket != 'downgrade' else None)
+                    corrections.setdefault((universe, name), {**correction, 'tier': tier})
+
+        manual = json.loads((corrections_dir / 'descriptions.json').read_text(encoding='utf-8'))
+        descriptions = {
+            (universe, name): text
+            for universe, entries in manual.items() if isinstance(entries, dict)
+            for name, text in entries.items()
+        }
+        return cls(corrections, descriptions)
+
+    @staticmethod
+    def calculate_power(stats: Dict[str, Optional[int]]) -> int:
+        # Missing stats count as 0; rounds half up like Math.round
+        return int(sum((stats.get(name) or 0) * weight for name, weight in POWER_WEIGHTS.items()) + 0.5)
+
+    @staticmethod
+    def determine_tier(power: int) -> str:
+        for threshold, tier in POWER_TIERS:
+            if power >= threshold:
+                return tier
+        return 'D'
+
+    @staticmethod
+    def default_stats(race: str) -> Dict[str, int]:
+        race = race.lower()
+        values = next((stats for key, stats in RACE_DEFAULT_STATS.items() if key in race), DEFAULT_RACE_STATS)
+        return dict(zip(['strength', 'speed', 'durability', 'intelligence', 'combat'], values))
+
+    def correct(self, record: Dict, universe: str = 'Marvel') -> Dict:
+        """Apply power/tier corrections and the manual description to one raw record."""
+        name = record['name']
+        stats = record['stats']
+        correction = self.corrections.get((universe, name))
+        if correction:
+            power = correction['power']
+            tier = correction['tier'] or self.determine_tier(power)
+        else:
+            if all(stats.get(key) == 100 for key in POWER_WEIGHTS):
+                stats = self.default_stats(record.get('race') or 'Unknown')
+            power = self.calculate_power(stats)
+            tier = self.determine_tier(power)
+
+        return {
+            'name': name,
+            'universe': universe,
+            'tier': tier,
+            'power': power,
+            'image': record['image'],
+            'description': self.descriptions.get((universe, name)),
+            'stats': stats
+        }
+
+    def correct_curated(self, record: Dict, universe: str = 'DC') -> Dict:
+        """
+        applyDCCorrections for a curated roster entry: a correction overrides
+        tier and power, the manual description wins over the curated one.
+        """
+        name = record['name']
+        correction = self.corrections.get((universe, name))
+        power = correction['power'] if correction else record['power']
+        tier = (correction['tier'] or self.determine_tier(power)) if correction else record['tier']
+        return {
+            'name': name,
+            'universe': universe,
+            'tier': tier,
+            'power': power,
+            'image': record.get('image'),
+            'abilities': record.get('abilities'),
+            'description': self.descriptions.get((universe, name)) or record.get('description'),
+            'stats': record['stats']
+        }
+
+    @staticmethod
+    def load_roster(roster_path: Path) -> List[Dict]:
+        if not roster_path.exists():
+            raise FileNotFoundError(
+                f"DC roster '{roster_path}' not found - --ingest would silently drop every DC hero "
+                f"(the roster replaces dcHeroesBase/generateMoreDCHeroes of scripts/generate-heroes.cjs)"
+            )
+        return json.loads(roster_path.read_text(encoding='utf-8'))
+
+    def heroes(self, raw_path: Path, roster_path: Path, universe: str = 'Marvel') -> List[RawHero]:
+        """
+        Forge input in the order and with the IDs generate-heroes.cjs assigns:
+        raw Marvel records first, then the curated DC roster.
+        """
+        roster = self.load_roster(roster_path)
+        heroes = [self.correct(record, universe) for record in iter_json_array(raw_path)]
+        heroes.extend(self.correct_curated(record, 'DC') for record in roster)
+
+        # Drop duplicate names (first wins), strongest first, IDs by rank
+        seen = set()
+        unique = []
+        for hero in heroes:
+            key = hero['name'].lower()
+            if key not in seen:
+                seen.add(key)
+                unique.append(hero)
+        unique.sort(key=lambda hero: -hero['power'])
+
+        return [
+            RawHero(
+                id=rank,
+                name=hero['name'],
+                universe=hero['universe'],
+                tier=hero['tier'],
+                power=hero['power'],
+                image=hero.get('image') or '⚡',
+                stats=hero['stats'],
+                abilities=hero.get('abilities'),
+                description=hero.get('description')
+            )
+            for rank, hero in enumerate(unique, 1)
+        ]
+
+
+# ============================================================================
+# BULK UPLOAD - ADMIN API (server/index.cjs)
+# ============================================================================
+
+# Endpoint path and body key per upload mode
+UPLOAD_ENDPOINTS = {
+    'bulk': ('/api/heroes/bulk', 'updates'),
+    'import': ('/api/import', 'heroes'),
+}
+
+# Answers worth retrying; any other non-2xx rejects the chunk for good
+UPLOAD_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Uncompressed bytes per piece of a streamed import body
+UPLOAD_STREAM_BLOCK = 1 << 16
+
+
+class UploadError(Exception):
+    """A chunk was rejected by the server or ran out of retries."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def iter_hero_records(heroes: HeroStore) -> Iterator[Dict]:
+    """Plain dicts of processed heroes, straight from the store columns."""
+    return (heroes.record(i) for i in range(len(heroes)))
+
+
+class BulkUploader:
+    """
+    Ships processed heroes to the admin API in gzip-compressed chunks.
+
+    mode='bulk' posts {"updates": [...]} chunks of `chunk_size` heroes to
+    /api/heroes/bulk from `concurrency` worker threads, each keeping one
+    keep-alive connection; at most 2x that many chunks are encoded ahead.
+    The endpoint merges by id (unknown ids are skipped), so resending a
+    chunk is harmless: failures are retried with backoff, and finished
+    chunks are appended (index + content digest) to `progress_path`, so an
+    interrupted upload resumes with the first unfinished chunk.
+
+    mode='import' replaces the whole server file and therefore cannot be
+    split: the roster is streamed as one gzip body (chunked transfer
+    encoding) and retried as a whole.
+
+    express.json() inflates gzip bodies (body-parser's `inflate` default);
+    its 50 MB limit applies to the inflated size.
+    """
+
+    STAT_KEYS = ('chunks', 'skipped', 'heroes', 'retries', 'raw_bytes', 'sent_bytes')
+
+    def __init__(
+        self,
+        base_url: str,
+        mode: str = 'bulk',
+        chunk_size: int = 200,
+        concurrency: int = 4,
+        progress_path: Optional[Path] = None,
+        retry: Optional[RetryPolicy] = None,
+        max_attempts: int = 5,
+        timeout: float = 60.0
+    ):
+        if mode not in UPLOAD_ENDPOINTS:
+            raise ValueError(f"mode must be one of {tuple(UPLOAD_ENDPOINTS)}")
+        url = urlsplit(base_url)
+        if url.scheme not in ('http', 'https') or not url.netloc:
+            raise ValueError(f"unsupported upload URL: {base_url}")
+
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = url.netloc
+        self.path = url.path.rstrip('/') + UPLOAD_ENDPOINTS[mode][0]
+        self.target = f"{url.scheme}://{url.netloc}{self.path}"
+        self.key = UPLOAD_ENDPOINTS[mode][1]
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size) if mode == 'bulk' else 0
+        self.concurrency = max(1, concurrency)
+        self.progress_path = progress_path
+        self.retry = retry or RetryPolicy(base_delay=0.5, max_delay=10.0)
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+        self.stats: Dict = dict.fromkeys(self.STAT_KEYS, 0)
+        self._done: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+
+    def upload(self, heroes: HeroStore) -> Dict:
+        """Upload all heroes; returns this call's counters. Raises UploadError when a chunk fails for good."""
+        start = time.perf_counter()
+        self.stats = dict.fromkeys(self.STAT_KEYS, 0)
+        self._open_progress()
+        try:
+            if self.mode == 'import':
+                self._upload_import(heroes)
+            else:
+                self._upload_chunks(heroes)
+        finally:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self.stats['seconds'] = round(time.perf_counter() - start, 3)
+        return self.stats
+
+    def chunks(self, heroes: HeroStore) -> Iterator[Tuple[int, List[Dict]]]:
+        """(index, records) in input order; indexes are stable for unchanged input."""
+        batch = []
+        index = 0
+        for record in iter_hero_records(heroes):
+            batch.append(record)
+            if len(batch) == self.chunk_size:
+                yield index, batch
+                index += 1
+                batch = []
+        if batch:
+            yield index, batch
+
+    def _upload_chunks(self, heroes: HeroStore):
+        pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix='upload')
+        pending = set()
+        try:
+            for index, batch in self.chunks(heroes):
+                raw = _compact_json({self.key: batch})
+                digest = hashlib.sha256(raw).hexdigest()[:16]
+                if self._done.get(index) == digest:
+                    self.stats['skipped'] += 1
+                    continue
+                if len(pending) >= 2 * self.concurrency:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                pending.add(pool.submit(self._send_chunk, index, digest, raw, len(batch)))
+            for future in pending:
+                future.result()
+        except BaseException:
+            # Let in-flight chunks finish (and be recorded), drop the queued ones
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+    def _send_chunk(self, index: int, digest: str, raw: bytes, count: int):
+        body = gzip.compress(raw, compresslevel=6, mtime=0)
+        self._post(lambda: body, {
+            'Content-Type': 'application/json',
+            'Content-Encoding': 'gzip',
+            'Content-Length': str(len(body)),
+            'Idempotency-Key': f"{self.mode}-{index}-{digest}",
+        })
+        self._record(index, digest, count, len(raw), len(body))
+
+    def _upload_import(self, heroes: HeroStore):
+        # Digest pass first: an unchanged roster that already went through is skipped
+        hasher = hashlib.sha256()
+        for piece in self._import_json(heroes):
+            hasher.update(piece)
+        digest = hasher.hexdigest()[:16]
+        if self._done.get(0) == digest:
+            self.stats['skipped'] += 1
+            return
+
+        sizes = {}
+
+        def body() -> Iterator[bytes]:
+            sizes['raw'] = sizes['sent'] = 0
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+            for piece in self._import_json(heroes):
+                sizes['raw'] += len(piece)
+                out = compressor.compress(piece)
+                if out:
+                    sizes['sent'] += len(out)
+                    yield out
+            out = compressor.flush()
+            sizes['sent'] += len(out)
+            yield out
+
+        self._post(body, {
+            'Content-Type': 'application/json',
+            'Content-Encoding': 'gzip',
+            'Idempotency-Key': f"{self.mode}-0-{digest}",
+        }, chunked=True)
+        self._record(0, digest, len(heroes), sizes['raw'], sizes['sent'])
+
+    def _import_json(self, heroes: HeroStore) -> Iterator[bytes]:
+        """{"heroes":[...]} in pieces of about UPLOAD_STREAM_BLOCK bytes."""
+        buffer = bytearray(f'{{"{self.key}":['.encode())
+        for i, record in enumerate(iter_hero_records(heroes)):
+            if i:
+                buffer += b','
+            buffer += _compact_json(record)
+            if len(buffer) >= UPLOAD_STREAM_BLOCK:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b']}'
+        yield bytes(buffer)
+
+    def _post(self, body: Callable[[], object], headers: Dict[str, str], chunked: bool = False):
+        """POST with retry; `body` is called once per attempt."""
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                with self._lock:
+                    self.stats['retries'] += 1
+                time.sleep(self.retry.delay(attempt - 1, error))
+
+            connection = self._connection()
+            try:
+                connection.request('POST', self.path, body=body(), headers=headers, encode_chunked=chunked)
+                response = connection.getresponse()
+                payload = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()  # Reconnects on the next request
+                error = UploadError(f"{self.target}: {type(e).__name__}: {e}")
+                continue
+
+            if 200 <= response.status < 300:
+                return
+            message = f"{self.target}: HTTP {response.status} {payload[:200].decode('utf-8', 'replace')}"
+            if response.status not in UPLOAD_RETRY_STATUSES:
+                raise UploadError(message)
+            retry_after = response.getheader('Retry-After')
+            error = UploadError(message, float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+        raise UploadError(f"giving up after {self.max_attempts} attempts: {error}")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        """This thread's keep-alive connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.connection_class(self.netloc, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _open_progress(self):
+        """Load finished chunks; a log for another target or chunk size starts over."""
+        self._done = {}
+        if not self.progress_path:
+            return
+        header = {'target': self.target, 'chunkSize': self.chunk_size}
+        if self.progress_path.exists():
+            lines = self.progress_path.read_text(encoding='utf-8').splitlines()
+            if lines and json.loads(lines[0]) == header:
+                for line in lines[1:]:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn last line of an interrupted run
+                    self._done[entry['chunk']] = entry['digest']
+                return
+        self.progress_path.write_text(json.dumps(header) + '\n', encoding='utf-8')
+
+    def _record(self, index: int, digest: str, count: int, raw_bytes: int, sent_bytes: int):
+        with self._lock:
+            self.stats['chunks'] += 1
+            self.stats['heroes'] += count
+            self.stats['raw_bytes'] += raw_bytes
+            self.stats['sent_bytes'] += sent_bytes
+            self._done[index] = digest
+            if self.progress_path:
+                with self.progress_path.open('a', encoding='utf-8') as f:
+                    f.write(json.dumps({'chunk': index, 'digest': digest}) + '\n')
+
+
+class StandInAdminServer:
+    """
+    Local stand-in for server/index.cjs to exercise uploads.
+
+    Serves GET /api/heroes and POST /api/heroes/bulk and /api/import with
+    the same merge/replace semantics, accepting gzip and chunked request
+    bodies. `fail_rate` answers that share of POSTs with 503.
+    """
+
+    def __init__(self, heroes: Optional[List[Dict]] = None, host: str = '127.0.0.1', port: int = 0, fail_rate: float = 0.0):
+        self.heroes = {hero['id']: hero for hero in heroes or []}
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+        handler = type('BoundStandInHandler', (StandInHandler,), {'stand_in': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def __enter__(self) -> 'StandInAdminServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    stand_in: StandInAdminServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/api/heroes':
+            return self._send(404, {'error': 'Not found'})
+        with self.stand_in.lock:
+            heroes = list(self.stand_in.heroes.values())
+        self._send(200, heroes)
+
+    def do_POST(self):
+        stand_in = self.stand_in
+        body = self._read_body()
+        with stand_in.lock:
+            stand_in.requests += 1
+            if random.random() < stand_in.fail_rate:
+                stand_in.failed += 1
+                return self._send(503, {'error': 'Injected failure'})
+
+        try:
+            data = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return self._send(400, {'error': 'Invalid JSON'})
+
+        path = self.path.rstrip('/')
+        with stand_in.lock:
+            if path == '/api/heroes/bulk':
+                for update in data['updates']:
+                    if update.get('id') in stand_in.heroes:
+                        stand_in.heroes[update['id']] = {**stand_in.heroes[update['id']], **update}
+                return self._send(200, {'message': f"Updated {len(data['updates'])} heroes"})
+            if path == '/api/import':
+                if not isinstance(data.get('heroes'), list):
+                    return self._send(400, {'error': 'Invalid data format'})
+                stand_in.heroes = {hero['id']: hero for hero in data['heroes']}
+                return self._send(200, {'message': f"Imported {len(data['heroes'])} heroes"})
+        self._send(404, {'error': 'Not found'})
+
+    def _read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass  # Trailers
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b''.join(parts)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    def _send(self, status: int, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 
 # ============================================================================
@@ -763,24 +3423,108 @@ async def main():
     parser.add_argument('--api-key', type=str, help='API key for AI provider')
     parser.add_argument('--limit', type=int, help='Limit number of heroes (for testing)')
     parser.add_argument('--rate-limit', type=int, default=10, help='Max concurrent API requests')
+    parser.add_argument('--no-structured-output', action='store_true', help='Ask for JSON in the prompt only instead of using the provider JSON schema mode')
+    parser.add_argument('--max-retries', type=int, default=3, help='Attempts per hero before manual review')
+    parser.add_argument('--retry-base-delay', type=float, default=1.0, help='Base delay (s) for exponential backoff on transient errors')
+    parser.add_argument('--breaker-threshold', type=int, default=5, help='Consecutive transient failures before pausing all requests')
+    parser.add_argument('--breaker-cooldown', type=float, default=30.0, help='Seconds to pause when the circuit breaker opens')
     parser.add_argument('--similarity-threshold', type=float, default=0.60, help='Bio similarity threshold (0-1)')
+    parser.add_argument('--name-batch', type=int, default=0, help='Reserve pre-validated callsigns in batches of this size per faction (0 = off)')
+    parser.add_argument('--registry', type=str, help='SQLite lore registry shared across runs/processes (names & bios)')
+    parser.add_argument('--registry-import', type=str, action='append', default=[], help='Seed the registry from an existing forge output (repeatable)')
+    parser.add_argument('--priority', choices=PriorityScheduler.ORDERS, default='input', help='Processing order: input, rarity (Legendary first) or score')
+    parser.add_argument('--priority-ids', type=str, help='Hero IDs to process first: comma list or file with one ID per line')
+    parser.add_argument('--progressive', action='store_true', help='Write each rarity tier to <output>.<rarity>.json as soon as it is complete')
+    parser.add_argument('--first-n', type=int, default=10, help='Report time until the first N Legendary heroes are done')
+    parser.add_argument('--bundle-dir', type=str, help='Also write a compact frontend bundle to this directory')
+    parser.add_argument('--ingest', action='store_true', help='Build the input from --raw-source and --corrections-dir instead of --input')
+    parser.add_argument('--raw-source', type=str, default='src/data/marvel-raw.json', help='Raw Marvel data for --ingest')
+    parser.add_argument('--corrections-dir', type=str, default='scripts/corrections', help='Directory with power-corrections.json and descriptions.json')
+    parser.add_argument('--dc-roster', type=str, default='src/data/dc-roster.json', help='Curated DC heroes merged during --ingest')
+    parser.add_argument('--export-only', action='store_true', help='Treat --input as forge output and only run export stages')
+    parser.add_argument('--rarity-sketch', type=str, help='Persistent rarity sketch: load frozen thresholds, record this batch, save')
+    parser.add_argument('--merge-sketch', type=str, action='append', default=[], help='Merge a shard sketch into --rarity-sketch (repeatable)')
+    parser.add_argument('--rebalance', action='store_true', help='Recompute the sketch thresholds and report error bounds')
+    parser.add_argument('--verify-sketch', action='store_true', help='Compare sketch thresholds of this batch with exact percentiles and report the error')
+    parser.add_argument('--sketch-only', action='store_true', help='Only merge/rebalance the rarity sketch, do not process heroes')
+    parser.add_argument('--matchups', type=int, metavar='K', help='Write top-K counters/victims per hero to --bundle-dir')
+    parser.add_argument('--matchup-matrix', action='store_true', help='Also write the full N x N matchup matrix (memory-mapped .npy)')
+    parser.add_argument('--similar', type=int, metavar='K', help='Write the K most similar heroes (stat distance) per hero to --bundle-dir')
+    parser.add_argument('--similar-within', choices=SimilarHeroesBuilder.GROUPS, default='all', help='Only pick similar heroes of the same faction or rarity')
+    parser.add_argument('--upload', type=str, metavar='URL', help='Upload the processed heroes to the admin API (e.g. http://localhost:3001)')
+    parser.add_argument('--upload-mode', choices=list(UPLOAD_ENDPOINTS), default='bulk', help='bulk: merge into existing heroes in chunks; import: replace the whole file')
+    parser.add_argument('--upload-chunk', type=int, default=200, help='Heroes per bulk upload request')
+    parser.add_argument('--upload-concurrency', type=int, default=4, help='Concurrent upload requests (one connection each)')
+    parser.add_argument('--upload-progress', type=str, help='Progress log; a rerun skips chunks that were already uploaded')
+    parser.add_argument('--stand-in-server', type=int, metavar='PORT', help='Serve a local stand-in of the admin API (seeded from --input) for upload tests')
+    parser.add_argument('--stand-in-fail-rate', type=float, default=0.0, help='Share of stand-in POSTs answered with 503')
+    parser.add_argument('--profile', action='store_true', help='Report per-stage timings and event loop stalls')
+    parser.add_argument('--profile-lag-ms', type=float, default=50.0, help='Report event loop stalls longer than this (ms)')
+    parser.add_argument('--profile-flamegraph', type=str, help='Write sampled stacks in collapsed format (flamegraph.pl / speedscope)')
+    parser.add_argument('--profile-cprofile', type=str, help='Write cProfile stats of the blocking stages (.prof)')
 
     args = parser.parse_args()
 
+    if args.stand_in_server is not None:
+        seed = json.loads(Path(args.input).read_text(encoding='utf-8')) if Path(args.input).exists() else []
+        stand_in = StandInAdminServer(seed, port=args.stand_in_server, fail_rate=args.stand_in_fail_rate)
+        print(f"[OK] Stand-in admin API with {len(seed)} heroes on {stand_in.url}")
+        stand_in.serve_forever()
+        return
+
+    # Incremental rarity thresholds
+    sketch = None
+    if args.rarity_sketch:
+        sketch_path = Path(args.rarity_sketch)
+        sketch = RaritySketch.load(sketch_path) if sketch_path.exists() else RaritySketch()
+        for shard in args.merge_sketch:
+            sketch.merge(RaritySketch.load(Path(shard)))
+        if args.rebalance and sketch.count:
+            print_rebalance_report(sketch.rebalance())
+        if args.sketch_only:
+            sketch.save(sketch_path)
+            print(f"[OK] Rarity sketch saved to: {sketch_path} ({sketch.count} scores)")
+            return
+
     # Load input data
     input_path = Path(args.input)
-    if not input_path.exists():
+    if not args.ingest and not input_path.exists():
         print(f"[ERROR] Input file '{args.input}' not found!")
         print(f"        Please provide a JSON file with hero data.")
         return
 
-    raw_data = json.loads(input_path.read_text(encoding='utf-8'))
-    raw_heroes = [RawHero(**hero) for hero in raw_data]
+    if args.export_only:
+        processed = load_processed_heroes(input_path, args.limit)
+        run_export_stages(processed, args)
+        return
 
     if args.limit:
-        raw_heroes = raw_heroes[:args.limit]
         print(f"[i] Test mode: Processing first {args.limit} heroes")
 
+    if args.ingest:
+        # Corrections joined in memory; no intermediate superheroes.json
+        ingest = SourceIngest.from_dir(Path(args.corrections_dir))
+        try:
+            raw_heroes = ingest.heroes(Path(args.raw_source), Path(args.dc_roster))[:args.limit]
+        except FileNotFoundError as e:
+            print(f"[ERROR] {e}")
+            return
+        print(f"[i] Ingested {len(raw_heroes)} heroes from {args.raw_source} "
+              f"({len(ingest.corrections)} corrections, {len(ingest.descriptions)} descriptions)")
+        processor = StatProcessor(raw_heroes, sketch=sketch)
+    else:
+        # Two streaming passes: scores for the rarity thresholds, then the heroes
+        processor = StatProcessor(iter_raw_heroes(input_path, args.limit), sketch=sketch)
+        raw_heroes = iter_raw_heroes(input_path, args.limit)
+
+    if args.verify_sketch:
+        print_rebalance_report(processor.verify_sketch(), title="Rarity sketch vs. exact percentiles (this batch)")
+
+    scheduler = PriorityScheduler(args.priority, PriorityScheduler.parse_ids(args.priority_ids))
+    if not scheduler.is_noop:
+        # Reordering needs random access, so the input is materialized here
+        raw_heroes = scheduler.sort(list(raw_heroes), processor)
+
     # Initialize AI provider
     if args.mode == 'test' or args.provider == 'mock':
         ai_provider = MockAIProvider()
@@ -788,33 +3532,127 @@ async def main():
         if not args.api_key:
             print("[ERROR] --api-key required for OpenAI provider")
             return
-        ai_provider = OpenAIProvider(args.api_key)
+        ai_provider = OpenAIProvider(args.api_key, structured_output=not args.no_structured_output)
     elif args.provider == 'gemini':
         if not args.api_key:
             print("[ERROR] --api-key required for Gemini provider")
             return
-        ai_provider = GeminiProvider(args.api_key)
+        ai_provider = GeminiProvider(args.api_key, structured_output=not args.no_structured_output)
     elif args.provider == 'aimlapi':
         if not args.api_key:
             print("[ERROR] --api-key required for AIMLAPI provider")
             return
-        ai_provider = AIMLAPIProvider(args.api_key)
+        ai_provider = AIMLAPIProvider(args.api_key, structured_output=not args.no_structured_output)
     else:
         ai_provider = MockAIProvider()
 
+    # Shared uniqueness registry
+    registry = None
+    if args.registry:
+        registry = LoreRegistry(Path(args.registry))
+        for source in args.registry_import:
+            added = registry.import_heroes(iter_json_array(Path(source)), source=Path(source).name)
+            print(f"[i] Registry: imported {added} names from {source}")
+        print(f"[i] Registry: {len(registry)} names protected ({args.registry})")
+
+    # Optional runtime profiling
+    profiler = None
+    if args.profile or args.profile_flamegraph or args.profile_cprofile:
+        profiler = StageProfiler(
+            lag_threshold=args.profile_lag_ms / 1000,
+            flamegraph_path=Path(args.profile_flamegraph) if args.profile_flamegraph else None,
+            cprofile_path=Path(args.profile_cprofile) if args.profile_cprofile else None
+        )
+
     # Run pipeline
     forge = HeroForge(
         ai_provider=ai_provider,
+        max_retries=args.max_retries,
         rate_limit=args.rate_limit,
-        similarity_threshold=args.similarity_threshold
+        similarity_threshold=args.similarity_threshold,
+        progressive=args.progressive,
+        first_n_legendaries=args.first_n,
+        retry_policy=RetryPolicy(base_delay=args.retry_base_delay),
+        circuit_breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown),
+        registry=registry,
+        profiler=profiler,
+        name_batch=args.name_batch
     )
 
-    await forge.process_all(raw_heroes, Path(args.output))
+    try:
+        processed = await forge.process_all(raw_heroes, Path(args.output), sketch, processor)
+    finally:
+        if registry is not None:
+            registry.close()
 
     print(f"\n[OK] Saved to: {args.output}")
+    if sketch is not None:
+        sketch.save(Path(args.rarity_sketch))
+        print(f"[OK] Rarity sketch saved to: {args.rarity_sketch} ({sketch.count} scores)")
+    run_export_stages(processed, args)
     print(f"[*] Ready to import into HeroRank!\n")
 
 
+def print_rebalance_report(report: Dict[str, Dict], title: str = "Rarity rebalance"):
+    """Print threshold changes of a sketch rebalance (and measured errors, if any)."""
+    print(f"[i] {title}:")
+    for rarity, entry in report.items():
+        old = f"{entry['old']:.2f}" if entry['old'] is not None else "-"
+        line = f"  {rarity} (p{entry['percentile']}): {old} -> {entry['new']:.2f} (bound +-{entry['bound']:.3f})"
+        if 'exact' in entry:
+            line += f", exact {entry['exact']:.2f}, error {entry['error']:.4f}"
+        print(line)
+    errors = [entry['error'] for entry in report.values() if 'error' in entry]
+    if errors:
+        print(f"  Error vs. exact: max {max(errors):.4f}, mean {sum(errors) / len(errors):.4f}")
+
+
+def run_export_stages(processed: HeroStore, args):
+    """Run the optional post-processing stages selected on the command line."""
+    if args.bundle_dir:
+        manifest = BundleExporter(Path(args.bundle_dir)).export(processed)
+        all_files = manifest['bundles']['all']
+        size = sum(manifest['files'][all_files[key]]['bytes'] for key in ('core', 'labels', 'text'))
+        print(f"[OK] Bundle written to: {args.bundle_dir} ({manifest['count']} heroes, {size/1024:.1f} KiB uncompressed)")
+
+    if args.matchups:
+        if not args.bundle_dir:
+            print("[ERROR] --matchups requires --bundle-dir")
+            return
+        meta = MatchupMatrixBuilder(processed).build(
+            Path(args.bundle_dir), top_k=args.matchups, write_matrix=args.matchup_matrix
+        )
+        print(f"[OK] Matchup index written: top-{meta['k']} counters/victims for {meta['count']} heroes")
+
+    if args.similar:
+        if not args.bundle_dir:
+            print("[ERROR] --similar requires --bundle-dir")
+            return
+        meta = SimilarHeroesBuilder(processed, within=args.similar_within).build(
+            Path(args.bundle_dir), top_k=args.similar
+        )
+        print(f"[OK] Similarity index written: top-{meta['k']} similar heroes ({meta['within']}) for {meta['count']} heroes")
+
+    if args.upload:
+        uploader = BulkUploader(
+            args.upload,
+            mode=args.upload_mode,
+            chunk_size=args.upload_chunk,
+            concurrency=args.upload_concurrency,
+            progress_path=Path(args.upload_progress) if args.upload_progress else None
+        )
+        try:
+            stats = uploader.upload(processed)
+        except UploadError as e:
+            print(f"[ERROR] Upload failed: {e}")
+            if args.upload_progress:
+                print(f"        Rerun with --upload-progress={args.upload_progress} to resume")
+            return
+        print(f"[OK] Uploaded {stats['heroes']} heroes to {uploader.target} in {stats['seconds']:.1f}s "
+              f"({stats['chunks']} chunks, {stats['skipped']} already done, {stats['retries']} retries, "
+              f"{stats['sent_bytes']/1024:.1f} KiB gzip of {stats['raw_bytes']/1024:.1f} KiB)")
+
+
 if __name__ == '__main__':
     try:
         asyncio.run(main())
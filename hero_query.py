@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+🔎 HERO QUERY: Indexed Hero Query Service
+Serves forge output (or superheroes.json) through precomputed indexes:
+sorted stat columns for range filters, per-value bitmaps for faction/rarity/
+tier and a prefix index on names. Paginated JSON responses with ETags.
+Similar-hero lookups run on KD-trees over the stat vectors, built lazily
+per faction/rarity scope.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from hero_forge import RARITY_MULTIPLIERS, STAT_NAMES, Faction, Rarity, SimilarityIndex, stats_matrix
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+# Low-cardinality fields that get one bitmap per value (if present in the data)
+CATEGORICAL_FIELDS = ['faction', 'rarity', 'tier', 'universe', 'needsManualReview']
+
+# Top-level numeric fields; every key of `stats` is indexed as well
+NUMERIC_FIELDS = ['id', 'combatScore', 'power', 'retryCount']
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+DEFAULT_SIMILAR = 10
+MAX_SIMILAR = 100
+
+
+def _category_key(value) -> str:
+    """Bitmap key for a field value, as it appears in query strings."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class HeroIndex:
+    """
+    Read-only indexes over a hero list.
+
+    Every filter can produce its matching positions directly (bitmap
+    positions, a slice of a sorted column, a slice of the sorted names)
+    and can test a candidate array. Queries seed candidates from the most
+    selective filter and test the rest, so the cost follows the smallest
+    result set rather than the roster size. Only the requested page is
+    ordered: sparse results by partial sort on precomputed ranks, dense
+    ones by walking the presorted column.
+    """
+
+    def __init__(self, records: List[Dict], version: str = ''):
+        self.records = records
+        self.version = version
+        n = len(records)
+
+        # Each hero serialized once; responses are joined from these
+        self.encoded = [json.dumps(record, ensure_ascii=False).encode('utf-8') for record in records]
+
+        # Sorted numeric columns with their inverse permutation (rank)
+        self.columns: Dict[str, np.ndarray] = {}
+        # Stat keys from every record: the first one may have no stats
+        stat_keys = list(dict.fromkeys(key for record in records for key in record.get('stats') or {}))
+        for name in NUMERIC_FIELDS:
+            if records and name in records[0]:
+                self.columns[name] = np.array([record.get(name) or 0 for record in records], dtype=np.float64)
+        for name in stat_keys:
+            self.columns[name] = np.array([(record.get('stats') or {}).get(name) or 0 for record in records], dtype=np.float64)
+
+        # Orders and ranks per direction; ties keep input order both ways
+        self.sorted: Dict[str, np.ndarray] = {}
+        self.order: Dict[Tuple[str, bool], np.ndarray] = {}
+        self.rank: Dict[Tuple[str, bool], np.ndarray] = {}
+        for name, values in self.columns.items():
+            for descending in (False, True):
+                order = np.argsort(-values if descending else values, kind='stable')
+                rank = np.empty(n, dtype=np.intp)
+                rank[order] = np.arange(n)
+                self.order[name, descending], self.rank[name, descending] = order, rank
+            self.sorted[name] = values[self.order[name, False]]
+
+        # One bitmap (and its positions) per categorical value
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        self.positions: Dict[str, Dict[str, np.ndarray]] = {}
+        for name in CATEGORICAL_FIELDS:
+            if not records or name not in records[0]:
+                continue
+            keys = np.array([_category_key(record.get(name)) for record in records])
+            self.bitmaps[name] = {}
+            self.positions[name] = {}
+            for key in np.unique(keys):
+                bitmap = keys == key
+                self.bitmaps[name][str(key)] = bitmap
+                self.positions[name][str(key)] = np.flatnonzero(bitmap)
+
+        # Prefix index: lower-cased names in sorted order
+        names = [record['name'].lower() for record in records]
+        self.name_order = np.array(sorted(range(n), key=names.__getitem__), dtype=np.intp)
+        self.name_keys = [names[i] for i in self.name_order]
+        self.name_rank = np.empty(n, dtype=np.intp)
+        self.name_rank[self.name_order] = np.arange(n)
+
+        self.by_id = {record['id']: i for i, record in enumerate(records)}
+
+        # Stat vectors for similar-hero lookups, from `stats` only (same layout
+        # as the precomputed similar.topk.bin); one tree per scope on demand.
+        # Heroes without stats are in no tree and have no similar heroes.
+        self.has_stats = np.array([bool(record.get('stats')) for record in records], dtype=bool)
+        self.vectors = stats_matrix([record.get('stats') or {} for record in records])
+        self.trees: Dict[Tuple, Tuple[np.ndarray, SimilarityIndex]] = {}
+        self._tree_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'HeroIndex':
+        data = path.read_bytes()
+        return cls(json.loads(data), version=hashlib.sha256(data).hexdigest()[:16])
+
+    def select(self, query: 'HeroQuery') -> Tuple[int, np.ndarray]:
+        """Total match count and the positions of the requested page, in sort order."""
+        filters = []  # (size, seed positions, candidate test)
+        for name, values in query.categories.items():
+            filters.append(self._category_filter(name, values))
+        for name, (low, high) in query.ranges.items():
+            filters.append(self._range_filter(name, low, high))
+        if query.name_prefix:
+            filters.append(self._prefix_filter(query.name_prefix.lower()))
+
+        n = len(self)
+        start, stop = query.offset, query.offset + query.limit
+        order = self.order[query.sort, query.descending]
+        if not filters:
+            return n, order[start:stop]
+
+        filters.sort(key=lambda item: item[0])
+        candidates = filters[0][1]()
+        for _, _, test in filters[1:]:
+            if not len(candidates):
+                break
+            candidates = candidates[test(candidates)]
+        total = len(candidates)
+
+        if total * 16 >= n:
+            # Dense result: walk the presorted column until the page is full
+            mask = np.zeros(n, dtype=bool)
+            mask[candidates] = True
+            span = stop * n // total + 64
+            while True:
+                head = order[:span]
+                hits = head[mask[head]]
+                if len(hits) >= stop or span >= n:
+                    return total, hits[start:stop]
+                span *= 2
+
+        # Sparse result: ranks are unique, so only the page end needs ordering
+        keys = self.rank[query.sort, query.descending][candidates]
+        if stop < total:
+            head = np.argpartition(keys, stop - 1)[:stop]
+            head = head[np.argsort(keys[head])]
+        else:
+            head = np.argsort(keys)
+        return total, candidates[head[start:stop]]
+
+    def _category_filter(self, name: str, values: Tuple[str, ...]):
+        # Values absent from the data match nothing
+        bitmaps = self.bitmaps[name]
+        known = [value for value in values if value in bitmaps]
+        positions = [self.positions[name][value] for value in known]
+        size = sum(len(p) for p in positions)
+        if len(known) == 1:
+            bitmap = bitmaps[known[0]]
+        else:
+            bitmap = np.zeros(len(self), dtype=bool)
+            for value in known:
+                bitmap = bitmap | bitmaps[value]
+
+        def seed() -> np.ndarray:
+            if not positions:
+                return np.empty(0, dtype=np.intp)
+            return positions[0] if len(positions) == 1 else np.sort(np.concatenate(positions))
+
+        return size, seed, lambda candidates: bitmap[candidates]
+
+    def _range_filter(self, name: str, low: float, high: float):
+        column = self.columns[name]
+        start = np.searchsorted(self.sorted[name], low, side='left')
+        stop = np.searchsorted(self.sorted[name], high, side='right')
+        return (
+            stop - start,
+            lambda: self.order[name, False][start:stop],
+            lambda candidates: (column[candidates] >= low) & (column[candidates] <= high)
+        )
+
+    def _prefix_filter(self, prefix: str):
+        start = bisect_left(self.name_keys, prefix)
+        stop = bisect_left(self.name_keys, prefix + '\U0010ffff')
+        return (
+            stop - start,
+            lambda: self.name_order[start:stop],
+            lambda candidates: (self.name_rank[candidates] >= start) & (self.name_rank[candidates] < stop)
+        )
+
+    def similar(self, position: int, k: int = DEFAULT_SIMILAR, scope: Optional[Dict[str, str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions and stat distances of the k heroes closest to `position`.
+
+        `scope` (e.g. {'rarity': 'Legendary'}) restricts the candidates; the
+        hero itself does not have to be inside it, which covers replacement
+        suggestions from another rarity.
+        """
+        if not self.has_stats[position]:
+            raise ValueError(f"hero {self.records[position]['id']} has no stats")
+        rows, tree = self._tree(tuple(sorted((scope or {}).items())))
+        local = np.searchsorted(rows, position)
+        exclude = int(local) if local < len(rows) and rows[local] == position else None
+        found, distances = tree.query(self.vectors[position], k, exclude=exclude)
+        return rows[found], distances
+
+    def _tree(self, scope: Tuple[Tuple[str, str], ...]) -> Tuple[np.ndarray, SimilarityIndex]:
+        with self._tree_lock:
+            if scope not in self.trees:
+                mask = self.has_stats.copy()
+                for name, value in scope:
+                    mask &= self.bitmaps[name].get(value, np.zeros(len(self), dtype=bool))
+                rows = np.flatnonzero(mask)
+                self.trees[scope] = rows, SimilarityIndex(self.vectors[rows])
+            return self.trees[scope]
+
+    def render_similar(self, position: int, found: np.ndarray, distances: np.ndarray) -> bytes:
+        """Similar-hero response body from pre-serialized heroes."""
+        head = f'{{"id":{json.dumps(self.records[position]["id"])},"distances":{json.dumps([round(float(d), 2) for d in distances])},"items":['
+        return head.encode() + b','.join(self.encoded[i] for i in found.tolist()) + b']}'
+
+    def render(self, total: int, page: np.ndarray, query: 'HeroQuery') -> bytes:
+        """Paginated response body from pre-serialized heroes."""
+        head = f'{{"total":{total},"offset":{query.offset},"limit":{query.limit},"items":['.encode()
+        return head + b','.join(self.encoded[i] for i in page.tolist()) + b']}'
+
+    def facets(self) -> Dict:
+        """Value counts per categorical field and min/max per numeric column."""
+        return {
+            'total': len(self),
+            'categories': {
+                name: {value: int(len(p)) for value, p in positions.items()}
+                for name, positions in self.positions.items()
+            },
+            'ranges': {
+                name: [float(values[0]), float(values[-1])] if len(values) else None
+                for name, values in self.sorted.items()
+            }
+        }
+
+
+# ============================================================================
+# QUERY PARSING
+# ============================================================================
+
+@dataclass
+class HeroQuery:
+    """
+    Parsed query string.
+
+    faction=Cyber-Ops,Terraguard (comma = any of), min_speed=60,
+    max_combatScore=80, name=vor (prefix), sort=-combatScore,
+    offset=0, limit=50.
+    """
+
+    categories: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    ranges: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    name_prefix: Optional[str] = None
+    sort: str = 'id'
+    descending: bool = False
+    offset: int = 0
+    limit: int = DEFAULT_LIMIT
+
+    @classmethod
+    def from_params(cls, params: Dict[str, List[str]], index: HeroIndex) -> 'HeroQuery':
+        """Build a query from parse_qs output; raises ValueError on unknown fields."""
+        query = cls()
+        for key, values in params.items():
+            value = values[-1]
+            if key in index.bitmaps:
+                query.categories[key] = tuple(sorted(v for v in value.split(',') if v))
+            elif key.startswith(('min_', 'max_')) and key[4:] in index.columns:
+                low, high = query.ranges.get(key[4:], (-np.inf, np.inf))
+                bound = float(value)
+                query.ranges[key[4:]] = (bound, high) if key.startswith('min_') else (low, bound)
+            elif key == 'name':
+                query.name_prefix = value
+            elif key == 'sort':
+                query.descending = value.startswith('-')
+                query.sort = value.lstrip('-+')
+                if query.sort not in index.columns:
+                    raise ValueError(f"cannot sort by '{query.sort}'")
+            elif key == 'offset':
+                query.offset = max(0, int(value))
+            elif key == 'limit':
+                query.limit = min(MAX_LIMIT, max(1, int(value)))
+            else:
+                raise ValueError(f"unknown parameter '{key}'")
+        return query
+
+    def cache_key(self) -> str:
+        """Canonical form: equal queries get equal ETags regardless of parameter order."""
+        return json.dumps([
+            sorted(self.categories.items()), sorted(self.ranges.items()), self.name_prefix,
+            self.sort, self.descending, self.offset, self.limit
+        ])
+
+
+def similar_params(params: Dict[str, List[str]], index: HeroIndex) -> Tuple[int, Dict[str, str]]:
+    """k and scope of a similar-hero request (k=10&faction=Terraguard&rarity=Epic)."""
+    k = DEFAULT_SIMILAR
+    scope = {}
+    for key, values in params.items():
+        if key == 'k':
+            k = min(MAX_SIMILAR, max(1, int(values[-1])))
+        elif key in ('faction', 'rarity') and key in index.bitmaps:
+            scope[key] = values[-1]
+        else:
+            raise ValueError(f"unknown parameter '{key}'")
+    return k, scope
+
+
+# ============================================================================
+# HTTP SERVICE
+# ============================================================================
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /api/heroes?…, /api/heroes/<id>[/similar], /api/facets with ETag revalidation."""
+
+    index: HeroIndex
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.rstrip('/').split('/')
+
+        try:
+            if url.path.rstrip('/') == '/api/heroes':
+                query = HeroQuery.from_params(parse_qs(url.query), self.index)
+                etag = self._etag(query.cache_key())
+                if self._not_modified(etag):
+                    return
+                self._send(200, self.index.render(*self.index.select(query), query), etag)
+            elif len(parts) == 4 and parts[:3] == ['', 'api', 'heroes']:
+                position = self.index.by_id.get(int(parts[3]))
+                if position is None:
+                    self._send(404, b'{"error":"Hero not found"}')
+                    return
+                etag = self._etag(parts[3])
+                if not self._not_modified(etag):
+                    self._send(200, self.index.encoded[position], etag)
+            elif len(parts) == 5 and parts[:3] == ['', 'api', 'heroes'] and parts[4] == 'similar':
+                position = self.index.by_id.get(int(parts[3]))
+                if position is None:
+                    self._send(404, b'{"error":"Hero not found"}')
+                    return
+                if not self.index.has_stats[position]:
+                    self._send(404, b'{"error":"Hero has no stats to compare"}')
+                    return
+                k, scope = similar_params(parse_qs(url.query), self.index)
+                etag = self._etag(json.dumps([parts[3], k, sorted(scope.items())]))
+                if not self._not_modified(etag):
+                    self._send(200, self.index.render_similar(position, *self.index.similar(position, k, scope)), etag)
+            elif url.path.rstrip('/') == '/api/facets':
+                etag = self._etag('facets')
+                if not self._not_modified(etag):
+                    self._send(200, json.dumps(self.index.facets()).encode(), etag)
+            else:
+                self._send(404, b'{"error":"Not found"}')
+        except (ValueError, LookupError) as e:
+            self._send(400, json.dumps({'error': str(e)}).encode())
+
+    def _etag(self, key: str) -> str:
+        return f'"{self.index.version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+    def _not_modified(self, etag: str) -> bool:
+        if etag not in self.headers.get('If-None-Match', ''):
+            return False
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        return True
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Always revalidate; cheap 304s
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(index: HeroIndex, host: str = '127.0.0.1', port: int = 3002):
+    """Run the query service until interrupted."""
+    handler = type('BoundQueryHandler', (QueryHandler,), {'index': index})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"[OK] Serving {len(index)} heroes on http://{host}:{port}/api/heroes")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+SYLLABLES = ['vor', 'tex', 'neo', 'qua', 'ron', 'zel', 'kai', 'dra', 'syn', 'tor', 'vex', 'lux', 'mor', 'ash']
+
+BENCH_QUERIES = [
+    'faction=Cyber-Ops&rarity=Legendary&sort=-combatScore',
+    'faction=Terraguard&min_speed=60&max_speed=80&min_durability=70&limit=20',
+    'rarity=Epic,Legendary&min_combatScore=70&sort=-speed',
+    'name=vor&faction=Aero-Vanguard',
+    'min_strength=90&min_intelligence=90&needsManualReview=false',
+    'rarity=Common&sort=-combatScore&offset=1000',
+]
+
+
+def synthetic_heroes(count: int, seed: int = 0) -> List[Dict]:
+    """Forge-shaped heroes with random stats, for benchmarks."""
+    rng = random.Random(seed)
+    factions = [faction.value for faction in Faction]
+    rarities = [rarity.value for rarity in Rarity]
+    heroes = []
+    for hero_id in range(1, count + 1):
+        stats = {name: rng.randint(1, 100) for name in STAT_NAMES}
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(3)).title() + f" {hero_id}"
+        heroes.append({
+            'id': hero_id,
+            'originalName': f"Hero {hero_id}",
+            'name': name,
+            'faction': rng.choice(factions),
+            'rarity': rng.choices(rarities, weights=[60, 25, 10, 5])[0],
+            'bio': "Synthetic benchmark hero.",
+            'quote': "Benchmarks never sleep.",
+            'stats': stats,
+            'combatScore': round(sum(stats.values()) / len(stats), 2),
+            'image': "⚡",
+            'needsManualReview': rng.random() < 0.05,
+            'retryCount': rng.randint(0, 3)
+        })
+    return heroes
+
+
+def run_benchmark(count: int, repeats: int = 200):
+    """Time index build and multi-filter queries against a linear scan."""
+    heroes = synthetic_heroes(count)
+    start = time.perf_counter()
+    index = HeroIndex(heroes, version='bench')
+    print(f"[i] Indexed {count:,} heroes in {time.perf_counter() - start:.2f}s\n")
+
+    print(f"  {'Query':<72} {'Matches':>8} {'Median':>9} {'p99':>9} {'Scan':>9}")
+    for text in BENCH_QUERIES:
+        query = HeroQuery.from_params(parse_qs(text), index)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            total, page = index.select(query)
+            index.render(total, page, query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+
+        start = time.perf_counter()
+        expected = _linear_scan(heroes, query)
+        scan = time.perf_counter() - start
+        if [hero['id'] for hero in expected] != [heroes[i]['id'] for i in page.tolist()]:
+            print(f"  [!] Result differs from linear scan: {text}")
+
+        print(f"  {text:<72} {total:>8} {timings[len(timings) // 2] * 1000:>7.3f}ms "
+              f"{timings[int(len(timings) * 0.99)] * 1000:>7.3f}ms {scan * 1000:>7.1f}ms")
+
+
+def run_similarity_benchmark(count: int, k: int = DEFAULT_SIMILAR, repeats: int = 200):
+    """Time similar-hero lookups on stat vectors against a brute-force scan."""
+    rng = np.random.default_rng(0)
+    multipliers = np.array([RARITY_MULTIPLIERS[rarity] for rarity in Rarity], dtype=np.float32)
+    scale = multipliers[rng.choice(len(multipliers), count, p=[0.60, 0.25, 0.10, 0.05])]
+    vectors = rng.integers(1, 101, (count, len(STAT_NAMES))).astype(np.float32) * scale[:, None]
+
+    start = time.perf_counter()
+    tree = SimilarityIndex(vectors)
+    print(f"[i] Built similarity index over {count:,} stat vectors in {time.perf_counter() - start:.2f}s\n")
+
+    timings, scans = [], []
+    for row in rng.integers(0, count, repeats).tolist():
+        start = time.perf_counter()
+        _, distances = tree.query(vectors[row], k, exclude=row)
+        timings.append(time.perf_counter() - start)
+
+        if len(scans) < 20:
+            start = time.perf_counter()
+            brute = np.einsum('ij,ij->i', vectors - vectors[row], vectors - vectors[row])
+            brute[row] = np.inf
+            expected = np.sort(brute[np.argpartition(brute, k - 1)[:k]])
+            scans.append(time.perf_counter() - start)
+            if not np.allclose(np.sqrt(expected), distances, atol=1e-2):
+                print(f"  [!] Result differs from brute-force scan for row {row}")
+    timings.sort()
+    print(f"  top-{k} similar: median {timings[len(timings) // 2] * 1000:.3f}ms, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f}ms, scan {np.median(scans) * 1000:.1f}ms")
+
+
+def _linear_scan(heroes: List[Dict], query: HeroQuery) -> List[Dict]:
+    """Reference: filter and sort the plain list, as the Express endpoint would."""
+    def value(hero: Dict, name: str):
+        return hero['stats'][name] if name in hero['stats'] else hero[name]
+
+    matches = [
+        hero for hero in heroes
+        if all(_category_key(hero[name]) in values for name, values in query.categories.items())
+        and all(low <= value(hero, name) <= high for name, (low, high) in query.ranges.items())
+        and (not query.name_prefix or hero['name'].lower().startswith(query.name_prefix.lower()))
+    ]
+    matches.sort(key=lambda hero: value(hero, query.sort), reverse=query.descending)
+    return matches[query.offset:query.offset + query.limit]
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hero Query - indexed hero query service")
+    parser.add_argument('--input', type=str, default='heroes_processed.json', help='Forge output (or superheroes.json) to serve')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=3002, help='HTTP port')
+    parser.add_argument('--bench', type=int, metavar='N', help='Benchmark queries on N synthetic heroes instead of serving')
+    parser.add_argument('--bench-similar', type=int, metavar='N', help='Benchmark similar-hero lookups on N synthetic stat vectors')
+
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args.bench)
+        return
+    if args.bench_similar:
+        run_similarity_benchmark(args.bench_similar)
+        return
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"[ERROR] Input file '{args.input}' not found!")
+        return
+
+    start = time.perf_counter()
+    index = HeroIndex.from_file(input_path)
+    print(f"[i] Indexed {len(index)} heroes in {time.perf_counter() - start:.2f}s")
+    serve(index, args.host, args.port)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n[!] Server stopped")
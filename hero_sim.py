@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+⚔️ HERO SIM: Vectorized Monte Carlo Arena Simulator
+Runs millions of turn-based arena battles as NumPy array operations to check
+rarity multipliers, percentile cutoffs and faction balance.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hero_forge import (
+    FACTION_CODES,
+    RARITY_CODES,
+    RARITY_MULTIPLIERS,
+    RARITY_PERCENTILES,
+    STAT_NAMES,
+    Faction,
+    HeroStore,
+    Rarity,
+    RawHero,
+    StatProcessor,
+    faction_multiplier_table,
+    load_processed_heroes,
+    stats_matrix,
+)
+
+
+# ============================================================================
+# ARENA RULES (mirrors src/pages/ArenaPage.tsx)
+# ============================================================================
+
+ATTACK, TACTICS, DEFENSE, ULTIMATE = 0, 1, 2, 3
+
+MAX_ROUNDS = 100          # Battles still running after this count as draws
+BATCH_SIZE = 250_000      # Battles per worker task
+
+
+class HeroTable:
+    """
+    Per-hero arrays needed by the simulator, derived once from the roster.
+
+    `power` is the hero's top-level power (Hero.power in ArenaPage), which
+    the HP and damage formulas use instead of stats.power.
+    """
+
+    def __init__(self, stats: np.ndarray, power: np.ndarray, factions: np.ndarray, rarities: np.ndarray):
+        # float64 like JS numbers, so Math.round ties land on the same side
+        strength, speed, _, durability, combat, intelligence = stats.astype(np.float64).T
+        power = power.astype(np.float64)
+
+        # ArenaPage falls back to 50 for missing (0) stats, 10 for HP durability
+        strength = np.where(strength > 0, strength, 50)
+        intelligence = np.where(intelligence > 0, intelligence, 50)
+        hp_durability = np.where(durability > 0, durability, 10)
+        durability = np.where(durability > 0, durability, 50)
+
+        self.max_hp = np.clip(100 + _js_round(hp_durability * 1.2 + power * 0.5), 100, 250)
+        self.attack = strength * 0.4 + power * 0.15
+        self.tactics = intelligence * 0.3 + power * 0.12
+        self.defense = durability * 0.15
+        self.factions = factions.astype(np.intp)
+        self.rarities = rarities.astype(np.intp)
+
+    def __len__(self) -> int:
+        return len(self.max_hp)
+
+    @classmethod
+    def from_processed(cls, heroes: HeroStore) -> 'HeroTable':
+        """
+        Use the final (already rarity-scaled) stats of a forge output file.
+
+        Forge output has no top-level power; its stats.power stands in.
+        """
+        n = len(heroes)
+        stats = heroes.stats[:n].astype(np.float32)
+        return cls(
+            stats,
+            stats[:, STAT_NAMES.index('power')],
+            heroes.factions[:n],
+            heroes.rarities[:n],
+        )
+
+    @classmethod
+    def from_raw(
+        cls,
+        heroes: List[RawHero],
+        rarity_percentiles: Optional[Dict[Rarity, float]] = None,
+        rarity_multipliers: Optional[Dict[Rarity, float]] = None
+    ) -> 'HeroTable':
+        """Re-run rarity/faction assignment and scaling with candidate settings."""
+        processor = StatProcessor(heroes, rarity_percentiles, rarity_multipliers)
+        rows, factions, rarities = [], [], []
+        for hero, score in zip(heroes, processor.combat_scores):
+            stats = hero.to_stats()
+            rarity = processor.assign_rarity(score)
+            faction = processor.assign_faction(stats)
+            scaled = processor.scale_stats_by_rarity(stats, rarity)
+            rows.append(scaled)
+            factions.append(FACTION_CODES[faction])
+            rarities.append(RARITY_CODES[rarity])
+        return cls(
+            stats_matrix(rows),
+            np.array([hero.power for hero in heroes]),
+            np.array(factions),
+            np.array(rarities),
+        )
+
+
+def _js_round(values: np.ndarray) -> np.ndarray:
+    """Math.round semantics (half up) rather than NumPy's half-to-even."""
+    return np.floor(values + 0.5)
+
+
+def choose_actions(hp: np.ndarray, max_hp: np.ndarray, energy: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Vectorized getOpponentAction: both sides play the arena AI."""
+    r = rng.random(len(hp))
+    r_low = rng.random(len(hp))
+    hp_percent = hp / max_hp * 100
+
+    aggressive = np.where(r < 0.5, ATTACK, np.where(r < 0.85, TACTICS, DEFENSE))
+    mixed = np.where(r < 0.4, ATTACK, np.where(r < 0.7, TACTICS, DEFENSE))
+
+    actions = np.where(hp_percent < 60, mixed, aggressive)
+    actions = np.where((hp_percent < 30) & (r_low < 0.6), DEFENSE, actions)
+    return np.where(energy >= 100, ULTIMATE, actions)
+
+
+def compute_damage(
+    table: HeroTable,
+    multipliers: np.ndarray,
+    attacker: np.ndarray,
+    defender: np.ndarray,
+    actions: np.ndarray,
+    defending: np.ndarray
+) -> np.ndarray:
+    """Vectorized calculateDamage plus the faction triangle bonus/penalty."""
+    base = np.select(
+        [actions == ATTACK, actions == TACTICS, actions == ULTIMATE],
+        [table.attack[attacker], table.tactics[attacker], table.attack[attacker] * 3],
+        default=0.0,
+    )
+    damage = np.maximum(10, base - table.defense[defender])
+    damage = np.where(defending, damage * 0.5, damage)
+    damage = np.maximum(table.max_hp[defender] * 0.1, damage)
+
+    # Faction advantage scales the final hit (not part of the current arena UI yet)
+    damage = _js_round(damage * multipliers[table.factions[attacker], table.factions[defender]])
+    return np.where(actions == DEFENSE, 0.0, damage)
+
+
+def update_energy(energy: np.ndarray, actions: np.ndarray) -> np.ndarray:
+    gain = np.where(actions == TACTICS, 30, 20)
+    return np.where(actions == ULTIMATE, 0, np.minimum(100, energy + gain))
+
+
+# ============================================================================
+# BATCH SIMULATION
+# ============================================================================
+
+def simulate_batch(table: HeroTable, first: np.ndarray, second: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Fight first[k] vs second[k] for every k at once.
+    Returns 1 if the first hero won, 2 if the second won, 0 for a draw.
+    """
+    multipliers = faction_multiplier_table()
+    winner = np.zeros(len(first), dtype=np.int8)
+
+    # State of the still-running battles; finished ones are compacted away
+    live = np.arange(len(first))
+    a, b = first, second
+    hp1, hp2 = table.max_hp[a].copy(), table.max_hp[b].copy()
+    energy1 = np.zeros(len(first))
+    energy2 = np.zeros(len(first))
+    defending2 = np.zeros(len(first), dtype=bool)
+
+    for _ in range(MAX_ROUNDS):
+        if len(live) == 0:
+            break
+
+        # First hero acts against last round's defense stance
+        actions1 = choose_actions(hp1, table.max_hp[a], energy1, rng)
+        hp2 = np.maximum(0, hp2 - compute_damage(table, multipliers, a, b, actions1, defending2))
+        energy1 = update_energy(energy1, actions1)
+        won1 = hp2 <= 0
+
+        # Second hero answers; the first hero's stance applies immediately
+        actions2 = choose_actions(hp2, table.max_hp[b], energy2, rng)
+        damage2 = compute_damage(table, multipliers, b, a, actions2, actions1 == DEFENSE)
+        hp1 = np.where(won1, hp1, np.maximum(0, hp1 - damage2))
+        energy2 = update_energy(energy2, actions2)
+        won2 = ~won1 & (hp1 <= 0)
+
+        winner[live[won1]] = 1
+        winner[live[won2]] = 2
+
+        keep = ~(won1 | won2)
+        live, a, b = live[keep], a[keep], b[keep]
+        hp1, hp2 = hp1[keep], hp2[keep]
+        energy1, energy2 = energy1[keep], energy2[keep]
+        defending2 = (actions2 == DEFENSE)[keep]
+
+    return winner
+
+
+def _run_task(args: Tuple[HeroTable, int, np.random.SeedSequence]) -> Dict[str, np.ndarray]:
+    """Worker entry point: simulate random pairings and return aggregate counts."""
+    table, battles, seed = args
+    rng = np.random.default_rng(seed)
+    n = len(table)
+
+    first = rng.integers(0, n, battles)
+    second = (first + rng.integers(1, n, battles)) % n  # never a mirror match
+    winner = simulate_batch(table, first, second, rng)
+
+    wins = (
+        np.bincount(first[winner == 1], minlength=n) +
+        np.bincount(second[winner == 2], minlength=n)
+    )
+    games = np.bincount(first, minlength=n) + np.bincount(second, minlength=n)
+
+    return {
+        'wins': wins,
+        'games': games,
+        'draws': int(np.count_nonzero(winner == 0)),
+        'rarity_wins': _pair_counts(table.rarities, first, second, winner, len(Rarity)),
+        'faction_wins': _pair_counts(table.factions, first, second, winner, len(Faction)),
+    }
+
+
+def _pair_counts(codes: np.ndarray, first: np.ndarray, second: np.ndarray, winner: np.ndarray, size: int) -> np.ndarray:
+    """Wins of group row over group column, as a (size, size) count matrix."""
+    winners = np.where(winner == 1, codes[first], codes[second])
+    losers = np.where(winner == 1, codes[second], codes[first])
+    decided = winner != 0
+    return np.bincount(
+        winners[decided] * size + losers[decided], minlength=size * size
+    ).reshape(size, size)
+
+
+def run_simulation(table: HeroTable, battles: int, workers: int = 1, seed: Optional[int] = None) -> Dict:
+    """Split the battles into batches and spread them over worker processes."""
+    if len(table) < 2:
+        raise ValueError(f"A simulation needs at least 2 heroes, got {len(table)}")
+    sizes = [BATCH_SIZE] * (battles // BATCH_SIZE)
+    if battles % BATCH_SIZE:
+        sizes.append(battles % BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(table, size, s) for size, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        results = [_run_task(task) for task in tasks]
+
+    total = {key: sum(r[key] for r in results) for key in results[0]}
+    total['battles'] = battles
+    return total
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def build_report(table: HeroTable, result: Dict) -> Dict:
+    """Aggregate per-hero counts into win rates by rarity and faction."""
+    report = {
+        'battles': result['battles'],
+        'draws': result['draws'],
+        'byRarity': {},
+        'byFaction': {},
+        'rarityVsRarity': _matchup_rates(result['rarity_wins'], [r.value for r in Rarity]),
+        'factionVsFaction': _matchup_rates(result['faction_wins'], [f.value for f in Faction]),
+    }
+    for name, codes, members in (
+        ('byRarity', table.rarities, list(Rarity)),
+        ('byFaction', table.factions, list(Faction)),
+    ):
+        wins = np.bincount(codes, weights=result['wins'], minlength=len(members))
+        games = np.bincount(codes, weights=result['games'], minlength=len(members))
+        for code, member in enumerate(members):
+            report[name][member.value] = {
+                'heroes': int(np.count_nonzero(codes == code)),
+                'games': int(games[code]),
+                'winRate': round(float(wins[code] / games[code]), 4) if games[code] else None,
+            }
+    return report
+
+
+def _matchup_rates(wins: np.ndarray, labels: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """P(row beats column) among decided battles."""
+    rates = {}
+    for i, row in enumerate(labels):
+        rates[row] = {}
+        for j, col in enumerate(labels):
+            decided = wins[i, j] + wins[j, i]
+            rates[row][col] = round(float(wins[i, j] / decided), 4) if decided else None
+    return rates
+
+
+def print_report(report: Dict, elapsed: float):
+    print(f"\n{'='*60}")
+    print(f"[OK] SIMULATION COMPLETE")
+    print(f"{'='*60}\n")
+    print(f"  Battles: {report['battles']:,} in {elapsed:.1f}s ({report['battles']/elapsed:,.0f}/s)")
+    print(f"  Draws (>{MAX_ROUNDS} rounds): {report['draws']:,}")
+
+    for title, key in (("[*] Win Rate by Rarity", 'byRarity'), ("[>] Win Rate by Faction", 'byFaction')):
+        print(f"\n{title}:")
+        for label, row in report[key].items():
+            rate = f"{row['winRate']*100:.1f}%" if row['winRate'] is not None else "-"
+            print(f"  {label}: {rate} ({row['heroes']} heroes, {row['games']:,} games)")
+
+    for title, key in (("[*] Rarity vs Rarity", 'rarityVsRarity'), ("[>] Faction vs Faction", 'factionVsFaction')):
+        labels = list(report[key])
+        print(f"\n{title} (row beats column):")
+        print("  " + " " * 14 + "".join(f"{label[:12]:>14}" for label in labels))
+        for row in labels:
+            cells = "".join(
+                f"{report[key][row][col]*100:13.1f}%" if report[key][row][col] is not None else f"{'-':>14}"
+                for col in labels
+            )
+            print(f"  {row[:12]:<14}{cells}")
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def _parse_rarity_values(text: Optional[str], rarities: List[Rarity]) -> Optional[Dict[Rarity, float]]:
+    if not text:
+        return None
+    values = [float(v) for v in text.split(',')]
+    if len(values) != len(rarities):
+        raise SystemExit(f"[ERROR] Expected {len(rarities)} comma-separated values, got '{text}'")
+    return dict(zip(rarities, values))
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hero Sim - Monte Carlo arena balance simulator")
+    parser.add_argument('--input', type=str, default='src/data/superheroes.json', help='Raw hero JSON (or forge output with --processed)')
+    parser.add_argument('--processed', action='store_true', help='Input is forge output; use its final stats, rarities and factions')
+    parser.add_argument('--battles', type=int, default=1_000_000, help='Number of battles to simulate')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    parser.add_argument('--multipliers', type=str, help='Rarity multipliers Legendary,Epic,Rare,Common (e.g. 1.5,1.25,1.0,0.8)')
+    parser.add_argument('--percentiles', type=str, help='Rarity percentiles Legendary,Epic,Rare (e.g. 95,85,60)')
+    parser.add_argument('--report', type=str, help='Write the report as JSON to this file')
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"[ERROR] Input file '{args.input}' not found!")
+        return
+
+    if args.processed:
+        table = HeroTable.from_processed(load_processed_heroes(input_path))
+    else:
+        raw_heroes = [RawHero(**hero) for hero in json.loads(input_path.read_text(encoding='utf-8'))]
+        table = HeroTable.from_raw(
+            raw_heroes,
+            _parse_rarity_values(args.percentiles, [Rarity.LEGENDARY, Rarity.EPIC, Rarity.RARE]),
+            _parse_rarity_values(args.multipliers, [Rarity.LEGENDARY, Rarity.EPIC, Rarity.RARE, Rarity.COMMON]),
+        )
+
+    if len(table) < 2:
+        print(f"[ERROR] '{args.input}' has {len(table)} hero(es); battles need at least 2.")
+        return
+
+    print(f"\n[*] Starting Hero Sim")
+    print(f"[i] {len(table)} heroes, {args.battles:,} battles, {args.workers} workers")
+    print(f"[i] Multipliers: {args.multipliers or ','.join(str(v) for v in RARITY_MULTIPLIERS.values())}")
+    print(f"[i] Percentiles: {args.percentiles or ','.join(str(v) for v in RARITY_PERCENTILES.values())}")
+
+    start = time.perf_counter()
+    result = run_simulation(table, args.battles, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    report = build_report(table, result)
+    print_report(report, elapsed)
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\n[OK] Report saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n[!] Simulation interrupted by user")
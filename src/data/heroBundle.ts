@@ -0,0 +1,172 @@
+// Loader für das kompakte Frontend-Bundle von hero_forge.py (--bundle-dir)
+//
+// Das Bundle liegt z.B. unter public/heroes und wird von Vite als /heroes
+// ausgeliefert. manifest.json beschreibt pro Shard ("all", "faction/<slug>",
+// "rarity/<slug>") die Dateien: core.bin (numerische Spalten als TypedArrays),
+// labels.json (Name, Bild für die erste Ansicht) und text.json (Bio, Zitat,
+// Originalname; erst bei Bedarf geladen).
+
+export const BUNDLE_VERSION = 1;
+
+export type ColumnType = 'uint8' | 'int8' | 'uint16' | 'uint32' | 'float32';
+
+export interface BundleColumn {
+  dtype: ColumnType;
+  offset: number;
+  length: number;
+  shape?: number[];
+}
+
+export interface BundleFile {
+  sha256: string;
+  bytes: number;
+  gzip?: number;
+  br?: number;
+}
+
+export interface BundleShard {
+  count: number;
+  core: string;
+  columns: Record<string, BundleColumn>;
+  labels: string;
+  text: string;
+}
+
+export interface BundleManifest {
+  version: number;
+  count: number;
+  factions: string[];
+  rarities: string[];
+  bundles: Record<string, BundleShard>;
+  files: Record<string, BundleFile>;
+}
+
+export type TypedColumn = Uint8Array | Int8Array | Uint16Array | Uint32Array | Float32Array;
+
+export interface HeroText {
+  originalName: string[];
+  bio: string[];
+  quote: string[];
+}
+
+// Spalten in id-Reihenfolge; Index i ist derselbe Held in allen Arrays
+export interface HeroColumns {
+  count: number;
+  factions: string[];     // faction[i] ist ein Index hierauf
+  rarities: string[];     // rarity[i] ist ein Index hierauf
+  id: Uint32Array;
+  combatScore: Uint16Array;  // Combat Score * 100
+  strength: Uint8Array;
+  speed: Uint8Array;
+  power: Uint8Array;
+  durability: Uint8Array;
+  combat: Uint8Array;
+  intelligence: Uint8Array;
+  faction: Uint8Array;
+  rarity: Uint8Array;
+  retryCount: Uint8Array;
+  needsManualReview: Uint8Array;
+  name: string[];
+  image: string[];
+  loadText: () => Promise<HeroText>;
+}
+
+type ColumnConstructor = new (buffer: ArrayBuffer, byteOffset: number, length: number) => TypedColumn;
+
+const ARRAY_TYPES: Record<ColumnType, ColumnConstructor> = {
+  uint8: Uint8Array,
+  int8: Int8Array,
+  uint16: Uint16Array,
+  uint32: Uint32Array,
+  float32: Float32Array,
+};
+
+/**
+ * Legt Views auf die Spalten eines .bin-Buffers (ohne Kopie).
+ * Offsets sind 4-Byte-ausgerichtet, Werte Little Endian wie in allen gängigen Browsern.
+ */
+export function readColumns(buffer: ArrayBuffer, layout: Record<string, BundleColumn>): Record<string, TypedColumn> {
+  const columns: Record<string, TypedColumn> = {};
+  for (const [name, column] of Object.entries(layout)) {
+    const ArrayType = ARRAY_TYPES[column.dtype];
+    if (!ArrayType) {
+      throw new Error(`Unbekannter Spaltentyp ${column.dtype} (${name})`);
+    }
+    columns[name] = new ArrayType(buffer, column.offset, column.length);
+  }
+  return columns;
+}
+
+// Inhalts-Hash als Query, damit Dateien dauerhaft gecacht werden können
+function fileUrl(baseUrl: string, manifest: BundleManifest, name: string): string {
+  const hash = manifest.files[name]?.sha256;
+  return hash ? `${baseUrl}/${name}?v=${hash.slice(0, 12)}` : `${baseUrl}/${name}`;
+}
+
+async function fetchOk(url: string): Promise<Response> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`${url}: HTTP ${response.status}`);
+  }
+  return response;
+}
+
+/**
+ * Lädt manifest.json (immer ohne Cache, es verweist auf die aktuellen Hashes)
+ */
+export async function loadManifest(baseUrl: string): Promise<BundleManifest> {
+  const response = await fetchOk(`${baseUrl}/manifest.json`);
+  const manifest = (await response.json()) as BundleManifest;
+  if (manifest.version !== BUNDLE_VERSION) {
+    throw new Error(`Bundle-Version ${manifest.version} wird nicht unterstützt (erwartet ${BUNDLE_VERSION})`);
+  }
+  return manifest;
+}
+
+/**
+ * Lädt einen Shard (Standard: alle Helden) als Spalten; Texte erst über loadText()
+ */
+export async function loadHeroBundle(
+  baseUrl: string,
+  shard = 'all',
+  manifest?: BundleManifest
+): Promise<HeroColumns> {
+  const meta = manifest ?? (await loadManifest(baseUrl));
+  const entry = meta.bundles[shard];
+  if (!entry) {
+    throw new Error(`Shard ${shard} fehlt im Bundle (vorhanden: ${Object.keys(meta.bundles).join(', ')})`);
+  }
+
+  const [core, labels] = await Promise.all([
+    fetchOk(fileUrl(baseUrl, meta, entry.core)).then(response => response.arrayBuffer()),
+    fetchOk(fileUrl(baseUrl, meta, entry.labels)).then(response => response.json() as Promise<{ name: string[]; image: string[] }>),
+  ]);
+  const columns = readColumns(core, entry.columns);
+
+  let text: Promise<HeroText> | undefined;
+  const loadText = () => {
+    text ??= fetchOk(fileUrl(baseUrl, meta, entry.text)).then(response => response.json() as Promise<HeroText>);
+    return text;
+  };
+
+  return {
+    count: entry.count,
+    factions: meta.factions,
+    rarities: meta.rarities,
+    id: columns.id as Uint32Array,
+    combatScore: columns.combatScore as Uint16Array,
+    strength: columns.strength as Uint8Array,
+    speed: columns.speed as Uint8Array,
+    power: columns.power as Uint8Array,
+    durability: columns.durability as Uint8Array,
+    combat: columns.combat as Uint8Array,
+    intelligence: columns.intelligence as Uint8Array,
+    faction: columns.faction as Uint8Array,
+    rarity: columns.rarity as Uint8Array,
+    retryCount: columns.retryCount as Uint8Array,
+    needsManualReview: columns.needsManualReview as Uint8Array,
+    name: labels.name,
+    image: labels.image,
+    loadText,
+  };
+}
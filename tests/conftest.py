@@ -0,0 +1,103 @@
+import asyncio
+import random
+import string
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hero_forge import (  # noqa: E402
+    FACTIONS,
+    RARITIES,
+    STAT_NAMES,
+    AIGeneratedContent,
+    AIProvider,
+    HeroStats,
+    HeroStore,
+    ProcessedHero,
+    RawHero,
+    check_blacklist,
+)
+
+
+def random_heroes(n: int, seed: int = 0):
+    """Processed heroes with random stats, factions and rarities in shuffled id order."""
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(np.arange(1, n + 1)).tolist()
+    stats = rng.integers(0, 101, size=(n, len(STAT_NAMES))).tolist()
+    heroes = []
+    for hero_id, values in zip(ids, stats):
+        hero_stats = HeroStats(**dict(zip(STAT_NAMES, values)))
+        heroes.append(ProcessedHero(
+            id=hero_id,
+            originalName=f"Original {hero_id}",
+            name=f"Hero {hero_id}",
+            faction=FACTIONS[rng.integers(len(FACTIONS))],
+            rarity=RARITIES[rng.integers(len(RARITIES))],
+            bio=f"Bio of hero {hero_id}, long enough to pass validation.",
+            quote=f"Quote {hero_id}",
+            stats=hero_stats,
+            combatScore=round(hero_stats.compute_combat_score(), 2),
+            image="⚡",
+        ))
+    return heroes
+
+
+def raw_heroes(n: int, seed: int = 0):
+    """Raw heroes with ids 1..n and random stats, shuffled."""
+    rng = np.random.default_rng(seed)
+    heroes = [
+        RawHero(id=i, name=f"Source {i}", universe='Marvel', tier='B', power=int(rng.integers(1, 101)),
+                stats=dict(zip(STAT_NAMES, rng.integers(1, 101, size=len(STAT_NAMES)).tolist())))
+        for i in range(1, n + 1)
+    ]
+    rng.shuffle(heroes)
+    return heroes
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(words))
+
+
+class CountingProvider(AIProvider):
+    """
+    Instant provider with unrelated random content; records peak concurrency.
+    Raises the queued `errors` (one per call) before it starts answering.
+    """
+
+    def __init__(self, seed: int = 0, errors: List[Exception] = ()):
+        self.rng = random.Random(seed)
+        self.errors = list(errors)
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate_hero_content(self, stats, faction, rarity, retry_context=None, name_validator=None, name=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if self.errors:
+                raise self.errors.pop(0)
+            name = name or random_text(self.rng, 1).title()
+            while not check_blacklist(name):
+                name = random_text(self.rng, 1).title()
+            return AIGeneratedContent(name=name, bio=random_text(self.rng, 12)[:200], quote=random_text(self.rng, 4))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def make_store():
+    def make(n: int, seed: int = 0) -> HeroStore:
+        store = HeroStore(capacity=4)
+        for hero in random_heroes(n, seed):
+            store.append(hero)
+        return store
+    return make
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from hero_forge import (
+    CircuitBreaker,
+    HeroForge,
+    ProviderAuthError,
+    ProviderError,
+    ProviderRateLimitError,
+    RetryPolicy,
+    TransientProviderError,
+    classify_provider_error,
+)
+
+from conftest import CountingProvider, raw_heroes
+
+
+def tripped(cooldown: float = 0.05, probe_timeout: float = 10.0) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=cooldown, probe_timeout=probe_timeout)
+    for _ in range(3):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert asyncio.run(breaker.wait()) is False
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+
+
+def test_open_breaker_blocks_for_the_cooldown_then_lets_one_probe_through():
+    breaker = tripped(cooldown=0.1)
+
+    async def scenario():
+        started = time.monotonic()
+        first, second = asyncio.create_task(breaker.wait()), asyncio.create_task(breaker.wait())
+        done, _ = await asyncio.wait([first, second], return_when=asyncio.FIRST_COMPLETED)
+        assert time.monotonic() - started >= 0.09
+        assert [task.result() for task in done] == [True]
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # The other caller waits on the probe's outcome
+        waiter = second if first in done else first
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        breaker.record_success()
+        assert await waiter is False
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    breaker = tripped()
+
+    async def scenario():
+        assert await breaker.wait() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.trips == 2
+
+        started = time.monotonic()
+        assert await breaker.wait() is True
+        assert time.monotonic() - started >= 0.04
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_probe_hands_over_immediately():
+    breaker = tripped()
+
+    async def scenario():
+        assert await breaker.wait() is True
+        breaker.abandon_probe()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert await asyncio.wait_for(breaker.wait(), timeout=0.02) is True
+
+    asyncio.run(scenario())
+
+
+def test_lost_probe_is_replaced_after_probe_timeout():
+    breaker = tripped(cooldown=0.01, probe_timeout=0.1)
+
+    async def scenario():
+        assert await breaker.wait() is True
+        started = time.monotonic()
+        assert await breaker.wait() is True
+        assert time.monotonic() - started >= 0.1
+
+    asyncio.run(scenario())
+
+
+def test_retry_delay_is_jittered_capped_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    for attempt in range(8):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= min(4.0, 0.5 * 2 ** attempt)
+    error = ProviderRateLimitError('slow down', retry_after=7.5)
+    assert all(policy.delay(0, error) == 7.5 for _ in range(50))
+
+
+class FakeSDKError(Exception):
+    def __init__(self, status_code=None, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.mark.parametrize('error, expected', [
+    (FakeSDKError(401), ProviderAuthError),
+    (FakeSDKError(403), ProviderAuthError),
+    (FakeSDKError(429), ProviderRateLimitError),
+    (FakeSDKError(500), TransientProviderError),
+    (FakeSDKError(503), TransientProviderError),
+    (FakeSDKError(408), TransientProviderError),
+    (FakeSDKError(400), ProviderError),
+    (asyncio.TimeoutError(), TransientProviderError),
+    (ConnectionResetError(), TransientProviderError),
+    (RuntimeError('bug'), ProviderError),
+])
+def test_classification(error, expected):
+    assert type(classify_provider_error('Test', error)) is expected
+
+
+def test_rate_limit_carries_retry_after_header():
+    error = classify_provider_error('Test', FakeSDKError(429, {'retry-after': '12'}))
+    assert error.retry_after == 12.0
+
+
+def test_forge_rides_out_an_outage(tmp_path):
+    outage = [TransientProviderError('down')] * 4
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.05)
+    provider = CountingProvider(seed=1, errors=outage)
+    forge = HeroForge(provider, rate_limit=2, max_retries=5,
+                      retry_policy=RetryPolicy(base_delay=0.001, max_delay=0.01), circuit_breaker=breaker)
+
+    store = asyncio.run(forge.process_all(raw_heroes(10), tmp_path / 'out.json'))
+
+    assert len(store) == 10
+    assert not store.needs_review[:10].any()
+    assert breaker.trips >= 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert forge.stats_total['transient_errors'] == 4
+
+
+def test_auth_errors_abort_the_run(tmp_path):
+    forge = HeroForge(CountingProvider(errors=[FakeSDKError(401)]), rate_limit=1)
+    with pytest.raises(ProviderAuthError):
+        asyncio.run(forge.process_all(raw_heroes(3), tmp_path / 'out.json'))
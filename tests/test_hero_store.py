@@ -0,0 +1,66 @@
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from hero_forge import FACTIONS, RARITIES, HeroStore, load_processed_heroes
+
+from conftest import random_heroes
+
+
+def test_records_match_models():
+    heroes = random_heroes(50, seed=7)
+    heroes[3].bio = "Bio mit Umlauten – äöü, long enough to pass validation. ⚡"
+    store = HeroStore(capacity=1)
+    for hero in heroes:
+        store.append(hero)
+
+    assert len(store) == 50
+    for i, hero in enumerate(heroes):
+        assert store.record(i) == hero.model_dump(mode='json')
+        assert store[i] == hero
+    assert store[-1] == heroes[-1]
+    with pytest.raises(IndexError):
+        store.record(50)
+
+
+def test_write_json_matches_json_dumps(tmp_path):
+    heroes = random_heroes(20, seed=8)
+    store = HeroStore()
+    for hero in heroes:
+        store.append(hero)
+
+    path = tmp_path / 'out.json'
+    store.write_json(path)
+    expected = json.dumps([hero.model_dump(mode='json') for hero in heroes], indent=2, ensure_ascii=False)
+    assert path.read_text(encoding='utf-8') == expected
+
+    store.write_json(path, rows=[])
+    assert json.loads(path.read_text(encoding='utf-8')) == []
+
+
+def test_load_round_trip_and_limit(tmp_path):
+    heroes = random_heroes(30, seed=9)
+    path = tmp_path / 'out.json'
+    path.write_text(json.dumps([hero.model_dump(mode='json') for hero in heroes], indent=2), encoding='utf-8')
+
+    store = load_processed_heroes(path)
+    assert [store.record(i) for i in range(len(store))] == [hero.model_dump(mode='json') for hero in heroes]
+    assert len(load_processed_heroes(path, limit=5)) == 5
+    assert len(load_processed_heroes(path, limit=0)) == 30
+
+
+def test_id_order_sort_and_counts(make_store):
+    store = make_store(40, seed=10)
+    records = [store.record(i) for i in range(len(store))]
+    by_id = sorted(records, key=lambda record: record['id'])
+
+    assert [records[i] for i in store.id_order()] == by_id
+    factions = Counter(record['faction'] for record in records)
+    rarities = Counter(record['rarity'] for record in records)
+    np.testing.assert_array_equal(store.counts('factions', len(FACTIONS)), [factions[f.value] for f in FACTIONS])
+    np.testing.assert_array_equal(store.counts('rarities', len(RARITIES)), [rarities[r.value] for r in RARITIES])
+
+    store.sort_by_id()
+    assert [store.record(i) for i in range(len(store))] == by_id
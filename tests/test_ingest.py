@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from hero_forge import RawHero, SourceIngest
+
+from conftest import ROOT
+
+CORRECTIONS = ROOT / 'scripts' / 'corrections'
+MARVEL_RAW = ROOT / 'src' / 'data' / 'marvel-raw.json'
+DC_ROSTER = ROOT / 'src' / 'data' / 'dc-roster.json'
+GENERATED = ROOT / 'src' / 'data' / 'superheroes.json'
+
+# Fields generate-heroes.cjs derives deterministically; abilities and most
+# descriptions come from Math.random templates and are not compared.
+FIELDS = ['id', 'name', 'universe', 'tier', 'power', 'stats', 'image']
+
+
+@pytest.fixture(scope='module')
+def ingest():
+    return SourceIngest.from_dir(CORRECTIONS)
+
+
+def test_matches_generate_heroes_output(ingest):
+    heroes = ingest.heroes(MARVEL_RAW, DC_ROSTER)
+    # What the forge read from superheroes.json before (e.g. default image for Nereus)
+    expected = [RawHero(**record) for record in json.loads(GENERATED.read_text(encoding='utf-8'))]
+
+    assert len(heroes) == len(expected)
+    mismatches = [
+        (hero.id, field)
+        for hero, reference in zip(heroes, expected)
+        for field in FIELDS
+        if getattr(hero, field) != getattr(reference, field)
+    ]
+    assert mismatches == []
+
+
+def test_missing_roster_fails_loudly(ingest, tmp_path):
+    with pytest.raises(FileNotFoundError, match='DC roster'):
+        ingest.heroes(MARVEL_RAW, tmp_path / 'dc-roster.json')
+
+
+def test_power_tier_and_defaults(ingest):
+    assert SourceIngest.calculate_power({'strength': 90, 'speed': 50, 'durability': 70, 'intelligence': 40, 'combat': 61}) == 66
+    assert SourceIngest.calculate_power({'strength': None}) == 0
+    assert [SourceIngest.determine_tier(p) for p in (100, 90, 89, 75, 55, 40, 39)] == ['S', 'S', 'A', 'A', 'B', 'C', 'D']
+
+    # Placeholder all-100 stats are replaced by race defaults before scoring
+    record = {'name': 'Nobody In Particular', 'image': 'x', 'race': 'Human',
+              'stats': dict.fromkeys(['strength', 'speed', 'durability', 'intelligence', 'combat'], 100)}
+    corrected = ingest.correct(record)
+    assert corrected['stats'] == SourceIngest.default_stats('Human')
+    assert corrected['power'] == SourceIngest.calculate_power(corrected['stats'])
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hero_forge import HeroForge, LoreGuardian, LoreRegistry
+
+from conftest import CountingProvider, raw_heroes
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    return tmp_path / 'lore.sqlite'
+
+
+def test_name_key_collides_spelling_variants():
+    assert LoreRegistry.name_key('Neon-Shade') == LoreRegistry.name_key(' neon  SHADE!') == 'neon shade'
+
+
+def test_claim_is_atomic_across_connections(registry_path):
+    first, second = LoreRegistry(registry_path), LoreRegistry(registry_path)
+    assert first.claim('Neon Shade', 'bio one', 1)
+    assert not second.claim('neon-shade', 'bio two', 2)
+    assert second.claim('Volt Ronin', 'bio three', 3)
+    assert [name for _, name, _ in first.entries_since(0)] == ['Neon Shade', 'Volt Ronin']
+    first.close()
+    second.close()
+
+
+def test_concurrent_claims_from_threads_have_one_winner(registry_path):
+    registries = [LoreRegistry(registry_path) for _ in range(2)]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(
+            lambda i: registries[i % 2].claim('Plasma Warden', f"bio {i}", i), range(32)
+        ))
+    assert results.count(True) == 1
+    assert len(registries[0]) == 1
+
+
+def test_import_skips_review_placeholders(registry_path):
+    registry = LoreRegistry(registry_path)
+    added = registry.import_heroes([
+        {'id': 1, 'name': 'Echo Blade', 'bio': 'a', 'needsManualReview': False},
+        {'id': 2, 'name': 'REVIEW_2', 'bio': 'b', 'needsManualReview': True},
+        {'id': 3, 'name': 'echo blade', 'bio': 'c'},
+    ], source='old.json')
+    assert added == 1
+    assert registry.import_heroes([{'id': 4, 'name': 'Hyper Core', 'bio': 'd'}], source='new.json') == 1
+
+
+def test_guardians_see_each_others_content(registry_path):
+    first = LoreGuardian(registry=LoreRegistry(registry_path))
+    second = LoreGuardian(registry=LoreRegistry(registry_path))
+    bio = "Former courier who mapped every tunnel under the drowned city."
+
+    assert first.add_content('Tunnel Wraith', bio, 1)
+    assert not second.check_name_uniqueness('Tunnel Wraith')
+    assert second.check_bio_uniqueness(bio + '!')[0] is False
+    assert not second.add_content('tunnel-wraith', 'something else entirely', 2)
+    assert second.existing_names == ['Tunnel Wraith']
+
+
+def test_forge_runs_sharing_a_registry_never_reuse_names(registry_path, tmp_path):
+    names = []
+    for run in range(2):
+        forge = HeroForge(CountingProvider(seed=run), rate_limit=4, registry=LoreRegistry(registry_path))
+        heroes = raw_heroes(15, seed=run)
+        store = asyncio.run(forge.process_all(heroes, tmp_path / f'out{run}.json'))
+        names += [store.record(i)['name'] for i in range(len(store))]
+
+    assert len({LoreRegistry.name_key(name) for name in names}) == 30
+    assert len(LoreRegistry(registry_path)) == 30
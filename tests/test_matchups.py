@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from hero_forge import Faction, HeroStats, MatchupMatrixBuilder, faction_multiplier
+
+
+def naive_advantage(store):
+    """Advantage matrix in id order from the per-pair formula, in float64."""
+    heroes = sorted((store.record(i) for i in range(len(store))), key=lambda record: record['id'])
+    scores = [HeroStats(**record['stats']).compute_combat_score() for record in heroes]
+    factions = [Faction(record['faction']) for record in heroes]
+
+    n = len(heroes)
+    advantage = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            attack = scores[i] * faction_multiplier(factions[i], factions[j])
+            defend = scores[j] * faction_multiplier(factions[j], factions[i])
+            if attack + defend > 0:
+                advantage[i, j] = (attack - defend) / (attack + defend)
+    return [record['id'] for record in heroes], advantage
+
+
+def read_column(data: bytes, column: dict) -> np.ndarray:
+    values = np.frombuffer(data, dtype=column['dtype'], count=column['length'], offset=column['offset'])
+    return values.reshape(column.get('shape', [-1]))
+
+
+@pytest.mark.parametrize('block_cells', [1, 500, 10_000])
+def test_advantage_blocks_match_naive(make_store, block_cells):
+    store = make_store(60, seed=1)
+    ids, expected = naive_advantage(store)
+    builder = MatchupMatrixBuilder(store, block_cells=block_cells)
+
+    assert builder.ids.tolist() == ids
+    blocks = [
+        builder.advantage_block(start, min(len(ids), start + builder.block_rows))
+        for start in range(0, len(ids), builder.block_rows)
+    ]
+    assert len(blocks) == -(-len(ids) // builder.block_rows)
+    np.testing.assert_allclose(np.vstack(blocks), expected, atol=1e-5)
+
+
+def test_zero_scores_give_zero_advantage(make_store):
+    store = make_store(5, seed=2)
+    store.stats[:2] = 0
+    builder = MatchupMatrixBuilder(store)
+    block = builder.advantage_block(0, len(store))
+    zero = np.flatnonzero(builder.scores == 0)
+    assert np.all(block[np.ix_(zero, zero)] == 0)
+    assert np.isfinite(block).all()
+
+
+def test_top_k_and_matrix_match_naive(make_store, tmp_path):
+    store = make_store(45, seed=3)
+    ids, expected = naive_advantage(store)
+    k = 7
+    meta = MatchupMatrixBuilder(store, block_cells=200).build(tmp_path, top_k=k, write_matrix=True, compress=False)
+
+    assert meta['ids'] == ids
+    assert meta == json.loads((tmp_path / 'matchups.json').read_text())
+    data = (tmp_path / meta['file']).read_bytes()
+    columns = {name: read_column(data, column) for name, column in meta['columns'].items()}
+
+    for i in range(len(ids)):
+        others = np.delete(expected[i], i)
+        assert i not in columns['counters'][i]
+        assert i not in columns['victims'][i]
+
+        # Ties may pick different opponents, but never different advantages
+        counters = expected[i, columns['counters'][i].astype(np.intp)]
+        victims = expected[i, columns['victims'][i].astype(np.intp)]
+        np.testing.assert_allclose(counters, np.sort(others)[:k], atol=1e-5)
+        np.testing.assert_allclose(victims, np.sort(others)[::-1][:k], atol=1e-5)
+        assert np.abs(columns['counterAdvantage'][i] - np.rint(counters * 127)).max() <= 1
+        assert np.abs(columns['victimAdvantage'][i] - np.rint(victims * 127)).max() <= 1
+
+    matrix = np.load(tmp_path / meta['matrix'])
+    np.testing.assert_allclose(matrix.astype(np.float64), expected, atol=1e-3)
+
+
+def test_top_k_is_capped_by_opponents(make_store, tmp_path):
+    meta = MatchupMatrixBuilder(make_store(4)).build(tmp_path, top_k=10, compress=False)
+    assert meta['k'] == 3
+    assert meta['columns']['counters']['shape'] == [4, 3]
@@ -0,0 +1,122 @@
+import asyncio
+import random
+
+import pytest
+
+from hero_forge import (
+    AIProvider,
+    CircuitBreaker,
+    Faction,
+    LoreGuardian,
+    NameReservoir,
+    ProviderAuthError,
+    RetryPolicy,
+    TransientProviderError,
+)
+
+from conftest import random_text
+
+
+class ScriptedProvider(AIProvider):
+    """Answers callsign batches from a script; exceptions in it are raised."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.requests = []
+
+    async def generate_callsigns(self, faction, count, avoid=()):
+        self.requests.append((faction, count, list(avoid)))
+        batch = self.batches.pop(0) if self.batches else []
+        if isinstance(batch, Exception):
+            raise batch
+        return list(batch)
+
+
+def naive_unique(guardian: LoreGuardian, candidates, reserved):
+    """One check_name_uniqueness-style scan per candidate against everything taken so far."""
+    taken = list(guardian.existing_names) + list(reserved)
+    accepted = []
+    for name in candidates:
+        if any(name.lower() == other.lower() or guardian._calculate_similarity(name.lower(), other.lower()) > 0.85
+               for other in taken):
+            continue
+        accepted.append(name)
+        taken.append(name)
+    return accepted
+
+
+def test_unique_names_matches_pairwise_check():
+    rng = random.Random(3)
+    base = [random_text(rng, 2).title() for _ in range(40)]
+    # Near-duplicates, case variants and exact repeats of the base names
+    candidates = base + [name[:-1] + 'x' for name in base[:15]] + [name.upper() for name in base[10:20]] + base[:5]
+    rng.shuffle(candidates)
+
+    guardian = LoreGuardian()
+    for name in base[30:35]:
+        guardian.add_content(name, f"Bio for {name}")
+    reserved = base[35:38]
+
+    accepted = guardian.unique_names(candidates, reserved)
+    assert accepted == naive_unique(guardian, candidates, reserved)
+    assert 0 < len(accepted) < len(base)
+
+
+def test_refill_validates_and_hands_out_in_order():
+    guardian = LoreGuardian()
+    guardian.add_content('Volt Ronin', 'An existing hero.')
+    provider = ScriptedProvider(['Neon Shade', 'Tony Blaze', 'volt ronin', 'Neon Shade', 'Hyper Core'])
+    reservoir = NameReservoir(provider, guardian, batch_size=5)
+
+    async def scenario():
+        return [await reservoir.take(Faction.TERRAGUARD) for _ in range(2)]
+
+    assert asyncio.run(scenario()) == ['Neon Shade', 'Hyper Core']
+    assert reservoir.stats['accepted'] == 2
+    assert reservoir.stats['handed_out'] == 2
+    assert len(provider.requests) == 1
+
+
+def test_failed_refill_cools_down_and_feeds_the_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=10)
+    provider = ScriptedProvider(TransientProviderError('down'), ['Echo Blade'])
+    reservoir = NameReservoir(provider, LoreGuardian(), retry_policy=RetryPolicy(base_delay=60, max_delay=60),
+                              circuit_breaker=breaker)
+    monkeypatch.setattr('hero_forge.random.uniform', lambda low, high: high)
+
+    async def takes(n):
+        return [await reservoir.take(Faction.CYBER_OPS) for _ in range(n)]
+
+    assert asyncio.run(takes(5)) == [None] * 5
+    assert len(provider.requests) == 1  # Cooling down: no request per hero
+    assert reservoir.stats['refill_failures'] == 1
+    assert breaker.failures == 1
+
+    reservoir._retry_at[Faction.CYBER_OPS] = 0.0  # Cooldown over
+    assert asyncio.run(takes(1)) == ['Echo Blade']
+    assert reservoir._failures[Faction.CYBER_OPS] == 0
+
+
+def test_auth_errors_are_raised():
+    reservoir = NameReservoir(ScriptedProvider(ProviderAuthError('bad key')), LoreGuardian())
+    with pytest.raises(ProviderAuthError):
+        asyncio.run(reservoir.take(Faction.TERRAGUARD))
+
+
+def test_exhausted_faction_borrows_from_other_pools():
+    provider = ScriptedProvider(['Plasma Warden', 'Quantum Fist'], [])
+    reservoir = NameReservoir(provider, LoreGuardian())
+
+    async def scenario():
+        first = await reservoir.take(Faction.TERRAGUARD)
+        borrowed = await reservoir.take(Faction.AERO_VANGUARD)
+        return first, borrowed, await reservoir.take(Faction.AERO_VANGUARD)
+
+    assert asyncio.run(scenario()) == ('Plasma Warden', 'Quantum Fist', None)
+    assert Faction.AERO_VANGUARD in reservoir.exhausted
+
+
+def test_provider_without_batches_disables_the_reservoir():
+    reservoir = NameReservoir(AIProvider(), LoreGuardian())
+    assert asyncio.run(reservoir.take(Faction.TERRAGUARD)) is None
+    assert reservoir.exhausted == set(Faction)
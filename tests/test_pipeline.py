@@ -0,0 +1,39 @@
+import asyncio
+import json
+
+import pytest
+
+from hero_forge import HeroForge, Rarity
+
+from conftest import CountingProvider, raw_heroes
+
+
+@pytest.mark.parametrize('rate_limit', [1, 4])
+def test_worker_pool_processes_every_hero_once(tmp_path, rate_limit):
+    heroes = raw_heroes(60, seed=rate_limit)
+    provider = CountingProvider(seed=rate_limit)
+    forge = HeroForge(provider, rate_limit=rate_limit)
+    output = tmp_path / 'out.json'
+
+    store = asyncio.run(forge.process_all(heroes, output))
+
+    assert store.ids[:len(store)].tolist() == list(range(1, 61))
+    assert [hero['id'] for hero in json.loads(output.read_text(encoding='utf-8'))] == list(range(1, 61))
+    assert provider.peak <= rate_limit
+    assert provider.calls >= 60
+    assert forge.stats_total['processed'] == 60
+
+
+def test_progressive_tiers_are_written_per_rarity(tmp_path):
+    heroes = raw_heroes(40, seed=11)
+    output = tmp_path / 'out.json'
+    store = asyncio.run(HeroForge(CountingProvider(seed=11), rate_limit=3, progressive=True).process_all(heroes, output))
+
+    records = [store.record(i) for i in range(len(store))]
+    for rarity in Rarity:
+        expected = [record for record in records if record['rarity'] == rarity.value]
+        tier = output.with_name(f"out.{rarity.value.lower()}.json")
+        if expected:
+            assert json.loads(tier.read_text(encoding='utf-8')) == expected
+        else:
+            assert not tier.exists()
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from hero_forge import HeroForge, StageProfiler
+
+from conftest import CountingProvider, raw_heroes
+
+
+def test_stage_timing_and_nesting():
+    profiler = StageProfiler()
+    with profiler.stage('outer'):
+        with profiler.stage('inner'):
+            assert profiler.current_stage == 'inner'
+            time.sleep(0.01)
+        assert profiler.current_stage == 'outer'
+        with profiler.stage('request', blocking=False):
+            assert profiler.current_stage == 'outer'
+    assert profiler.current_stage is None
+
+    assert profiler.calls == {'outer': 1, 'inner': 1, 'request': 1}
+    assert profiler.totals['outer'] >= profiler.totals['inner'] >= 0.01
+    assert 'request' not in profiler._since_tick
+
+
+def test_lag_is_attributed_to_the_blocking_stage():
+    profiler = StageProfiler(lag_threshold=0.03, interval=0.005)
+
+    async def scenario():
+        monitor = asyncio.create_task(profiler.monitor_lag())
+        await asyncio.sleep(0.02)
+        with profiler.stage('slow_check'):
+            time.sleep(0.08)  # Holds the loop
+        with profiler.stage('awaited', blocking=False):
+            await asyncio.sleep(0.08)  # Does not
+        monitor.cancel()
+
+    asyncio.run(scenario())
+    lags = {stage: lag for lag, stage in profiler.lag_events}
+    assert lags['slow_check'] >= 0.05
+    assert 'awaited' not in lags
+
+
+def test_profiled_run_writes_flamegraph_and_cprofile(tmp_path):
+    profiler = StageProfiler(
+        sample_interval=0.001, flamegraph_path=tmp_path / 'stacks.txt', cprofile_path=tmp_path / 'stages.prof'
+    )
+    forge = HeroForge(CountingProvider(), rate_limit=2, profiler=profiler)
+    asyncio.run(forge.process_all(raw_heroes(20), tmp_path / 'out.json'))
+
+    assert profiler.calls['generate'] >= 20
+    assert profiler.calls['store'] == 20
+    lines = (tmp_path / 'stacks.txt').read_text(encoding='utf-8').splitlines()
+    assert lines and all(line.startswith('stage:') and line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert (tmp_path / 'stages.prof').stat().st_size > 0
@@ -0,0 +1,131 @@
+import http.client
+import json
+import random
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode
+
+import numpy as np
+import pytest
+
+from hero_forge import STAT_NAMES
+from hero_query import (
+    CATEGORICAL_FIELDS,
+    HeroIndex,
+    HeroQuery,
+    QueryHandler,
+    SYLLABLES,
+    _linear_scan,
+    synthetic_heroes,
+)
+
+
+def random_params(rng: random.Random) -> dict:
+    params = {}
+    if rng.random() < 0.5:
+        params['faction'] = ','.join(rng.sample(['Terraguard', 'Cyber-Ops', 'Aero-Vanguard', 'Unknown'], rng.randint(1, 2)))
+    if rng.random() < 0.4:
+        params['rarity'] = rng.choice(['Common', 'Rare', 'Epic', 'Legendary'])
+    if rng.random() < 0.2:
+        params['needsManualReview'] = rng.choice(['true', 'false'])
+    for name in rng.sample(STAT_NAMES + ['combatScore', 'retryCount'], rng.randint(0, 3)):
+        low = rng.randint(0, 80)
+        params[f'min_{name}'] = low
+        if rng.random() < 0.5:
+            params[f'max_{name}'] = low + rng.randint(0, 40)
+    if rng.random() < 0.3:
+        params['name'] = rng.choice(SYLLABLES)[:rng.randint(1, 3)]
+    params['sort'] = rng.choice(['', '-']) + rng.choice(STAT_NAMES + ['id', 'combatScore'])
+    params['offset'] = rng.choice([0, 0, 5, 40])
+    params['limit'] = rng.choice([1, 10, 50])
+    return params
+
+
+@pytest.fixture(scope='module')
+def heroes():
+    heroes = synthetic_heroes(3000, seed=1)
+    for hero in heroes[::97]:
+        hero['stats'] = {}  # e.g. records without stats in superheroes.json
+    return heroes
+
+
+@pytest.fixture(scope='module')
+def index(heroes):
+    return HeroIndex(heroes, version='test')
+
+
+def test_select_matches_linear_scan(heroes, index):
+    # Missing stats count as 0, like the index columns
+    filled = [{**hero, 'stats': {name: hero['stats'].get(name) or 0 for name in STAT_NAMES}} for hero in heroes]
+    rng = random.Random(2)
+    for _ in range(300):
+        query = HeroQuery.from_params(parse_qs(urlencode(random_params(rng))), index)
+        total, page = index.select(query)
+        matches = _linear_scan(filled, HeroQuery(**{**query.__dict__, 'offset': 0, 'limit': len(heroes)}))
+        assert total == len(matches)
+        assert [heroes[i]['id'] for i in page.tolist()] == [
+            hero['id'] for hero in matches[query.offset:query.offset + query.limit]
+        ]
+
+
+def test_similar_matches_brute_force(heroes, index):
+    vectors = np.array([[hero['stats'].get(name, 0) for name in STAT_NAMES] for hero in heroes], dtype=np.float64)
+    has_stats = np.array([bool(hero['stats']) for hero in heroes])
+    rng = random.Random(3)
+    for position in rng.sample(np.flatnonzero(has_stats).tolist(), 40):
+        scope = rng.choice([{}, {'faction': heroes[position]['faction']}, {'rarity': 'Legendary'}])
+        found, distances = index.similar(position, k=10, scope=scope)
+
+        allowed = has_stats & np.array([all(hero[key] == value for key, value in scope.items()) for hero in heroes])
+        allowed[position] = False
+        brute = np.sqrt(((vectors - vectors[position]) ** 2).sum(axis=1))
+        expected = np.sort(brute[allowed])[:10]
+        assert position not in found.tolist()
+        assert allowed[found].all()
+        np.testing.assert_allclose(distances, expected, atol=1e-3)
+        np.testing.assert_allclose(brute[found], distances, atol=1e-3)
+
+
+def test_hero_without_stats_has_no_similar_heroes(heroes, index):
+    with pytest.raises(ValueError, match='no stats'):
+        index.similar(0)
+    found, _ = index.similar(1, k=50)
+    assert all(heroes[i]['stats'] for i in found.tolist())
+
+
+@pytest.fixture(scope='module')
+def server(index):
+    handler = type('TestQueryHandler', (QueryHandler,), {'index': index})
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(address, path, headers=None):
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    connection.request('GET', path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader('ETag'), body
+
+
+def test_http_endpoints(server, heroes):
+    status, etag, body = get(server, '/api/heroes?rarity=Epic&sort=-speed&limit=5')
+    assert status == 200
+    assert len(json.loads(body)['items']) == 5
+    assert get(server, '/api/heroes?limit=5&sort=-speed&rarity=Epic', {'If-None-Match': etag})[0] == 304
+
+    assert get(server, f"/api/heroes/{heroes[1]['id']}")[0] == 200
+    assert len(json.loads(get(server, f"/api/heroes/{heroes[1]['id']}/similar?k=3")[2])['items']) == 3
+    assert get(server, f"/api/heroes/{heroes[0]['id']}/similar") == (404, None, b'{"error":"Hero has no stats to compare"}')
+    assert get(server, '/api/heroes/999999/similar')[0] == 404
+    assert get(server, '/api/heroes?colour=red')[0] == 400
+    assert get(server, f"/api/heroes/{heroes[1]['id']}/similar?k=abc")[0] == 400
+
+    facets = json.loads(get(server, '/api/facets')[2])
+    assert facets['total'] == len(heroes)
+    assert set(facets['categories']) == {name for name in CATEGORICAL_FIELDS if name in heroes[0]}
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from hero_forge import RARITY_PERCENTILES, STAT_NAMES, HeroStats, Rarity, RaritySketch
+
+PERCENTILES = [0, 1, 12.5, 50, 60, 85, 95, 99.9, 100]
+
+
+def combat_scores(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    stats = rng.integers(0, 101, size=(n, len(STAT_NAMES)))
+    return [HeroStats(**dict(zip(STAT_NAMES, row.tolist()))).compute_combat_score() for row in stats]
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 1000])
+def test_quantile_matches_percentile_on_combat_scores(n):
+    scores = combat_scores(n, seed=n)
+    sketch = RaritySketch()
+    sketch.add_many(scores)
+
+    assert sketch.count == n
+    for percentile in PERCENTILES:
+        assert sketch.quantile(percentile) == pytest.approx(np.percentile(scores, percentile), abs=1e-9)
+
+
+def test_quantile_error_is_bounded_for_arbitrary_scores():
+    scores = np.random.default_rng(1).uniform(0, 100, 5000)
+    sketch = RaritySketch()
+    sketch.add_many(scores)
+    for percentile in PERCENTILES:
+        assert abs(sketch.quantile(percentile) - np.percentile(scores, percentile)) <= sketch.resolution / 2 + 1e-9
+
+
+def test_merge_equals_one_sketch_over_all_scores():
+    scores = combat_scores(900, seed=2)
+    shards = [RaritySketch() for _ in range(3)]
+    for shard, part in zip(shards, np.array_split(scores, 3)):
+        shard.add_many(part)
+    merged = RaritySketch()
+    for shard in shards:
+        merged.merge(shard)
+
+    whole = RaritySketch()
+    whole.add_many(scores)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    for percentile in PERCENTILES:
+        assert merged.quantile(percentile) == pytest.approx(np.percentile(scores, percentile), abs=1e-9)
+
+
+def test_merge_rejects_other_resolution():
+    with pytest.raises(ValueError):
+        RaritySketch().merge(RaritySketch(resolution=0.1))
+
+
+def test_empty_sketch_has_no_quantile():
+    with pytest.raises(ValueError):
+        RaritySketch().quantile(50)
+
+
+def test_rebalance_reports_exact_error_and_round_trips(tmp_path):
+    scores = combat_scores(500, seed=3)
+    sketch = RaritySketch()
+    sketch.add_many(scores)
+    report = sketch.rebalance(exact_scores=scores)
+
+    for rarity, percentile in RARITY_PERCENTILES.items():
+        entry = report[rarity.value]
+        assert entry['exact'] == pytest.approx(np.percentile(scores, percentile), abs=1e-4)
+        assert entry['error'] <= 1e-4
+    assert sketch.rarity_thresholds()[Rarity.COMMON] == 0
+
+    path = tmp_path / 'sketch.json'
+    sketch.save(path)
+    loaded = RaritySketch.load(path)
+    np.testing.assert_array_equal(loaded.counts, sketch.counts)
+    assert loaded.thresholds == sketch.thresholds
+    assert loaded.percentiles == sketch.percentiles
+
+
+def test_thresholds_stay_frozen_until_rebalance():
+    sketch = RaritySketch()
+    sketch.add_many(combat_scores(200, seed=4))
+    sketch.rebalance()
+    frozen = dict(sketch.thresholds)
+
+    sketch.add_many([100.0] * 500)
+    assert sketch.thresholds == frozen
+    sketch.rebalance()
+    assert sketch.thresholds[Rarity.LEGENDARY] == pytest.approx(100.0)
@@ -0,0 +1,53 @@
+import pytest
+
+from hero_forge import RARITIES, PriorityScheduler, StatProcessor
+
+from conftest import raw_heroes
+
+
+def test_input_order_is_a_noop():
+    heroes = raw_heroes(20)
+    scheduler = PriorityScheduler()
+    assert scheduler.is_noop
+    assert scheduler.sort(heroes, StatProcessor(heroes)) == heroes
+
+
+def test_priority_ids_come_first_in_given_order():
+    heroes = raw_heroes(30, seed=1)
+    scheduler = PriorityScheduler('input', [17, 3, 999, 25])
+    ordered = scheduler.sort(heroes, StatProcessor(heroes))
+
+    assert [hero.id for hero in ordered[:3]] == [17, 3, 25]
+    rest = [hero for hero in heroes if hero.id not in (17, 3, 25)]
+    assert ordered[3:] == rest
+
+
+@pytest.mark.parametrize('order', ['rarity', 'score'])
+def test_orders_match_a_plain_sort(order):
+    heroes = raw_heroes(80, seed=2)
+    processor = StatProcessor(heroes)
+    ordered = PriorityScheduler(order, [5]).sort(heroes, processor)
+
+    score = {hero.id: s for hero, s in zip(heroes, processor.combat_scores)}
+    rank = {hero.id: RARITIES.index(processor.assign_rarity(score[hero.id])) for hero in heroes}
+    rest = [hero for hero in heroes if hero.id != 5]
+    if order == 'rarity':
+        expected = sorted(rest, key=lambda hero: (-rank[hero.id], -score[hero.id]))
+    else:
+        expected = sorted(rest, key=lambda hero: -score[hero.id])
+
+    assert ordered[0].id == 5
+    assert [hero.id for hero in ordered[1:]] == [hero.id for hero in expected]
+
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError, match='Unknown priority order'):
+        PriorityScheduler('alphabetical')
+
+
+def test_parse_ids_from_list_or_file(tmp_path):
+    assert PriorityScheduler.parse_ids(None) == []
+    assert PriorityScheduler.parse_ids('4, 8,15') == [4, 8, 15]
+    path = tmp_path / 'ids.txt'
+    path.write_text('16\n23\n\n42\n', encoding='utf-8')
+    assert PriorityScheduler.parse_ids(str(path)) == [16, 23, 42]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from hero_forge import STAT_NAMES, Rarity, RawHero
+from hero_sim import ATTACK, DEFENSE, TACTICS, ULTIMATE, HeroTable, compute_damage, run_simulation
+
+
+# Straight ports of calculateHP / calculateDamage in src/pages/ArenaPage.tsx
+
+def js_round(value: float) -> float:
+    return float(np.floor(value + 0.5))
+
+
+def calculate_hp(hero: dict) -> float:
+    effective_durability = hero['stats']['durability'] or 10
+    return min(250, max(100, 100 + js_round(effective_durability * 1.2 + hero['power'] * 0.5)))
+
+
+def calculate_damage(attacker: dict, defender: dict, action: int, defending: bool) -> float:
+    if action == DEFENSE:
+        return 0
+    attack = (attacker['stats']['strength'] or 50) * 0.4 + attacker['power'] * 0.15
+    base = {
+        ATTACK: attack,
+        TACTICS: (attacker['stats']['intelligence'] or 50) * 0.3 + attacker['power'] * 0.12,
+        ULTIMATE: attack * 3,
+    }[action]
+    damage = max(10, base - (defender['stats']['durability'] or 50) * 0.15)
+    if defending:
+        damage *= 0.5
+    return js_round(max(calculate_hp(defender) * 0.1, damage))
+
+
+def random_roster(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    stats = rng.integers(0, 101, size=(n, 6))
+    stats[rng.random(size=stats.shape) < 0.2] = 0  # missing stats
+    power = rng.integers(0, 101, size=n)
+    heroes = [
+        {'stats': dict(zip(STAT_NAMES, row.tolist())),
+         'power': int(p)}
+        for row, p in zip(stats, power)
+    ]
+    table = HeroTable(stats, power, np.zeros(n, dtype=np.intp), np.zeros(n, dtype=np.intp))
+    return heroes, table
+
+
+def test_hp_and_damage_match_arena_page():
+    heroes, table = random_roster(40, seed=4)
+    np.testing.assert_array_equal(table.max_hp, [calculate_hp(hero) for hero in heroes])
+
+    n = len(heroes)
+    attacker, defender = np.divmod(np.arange(n * n), n)
+    no_faction = np.ones((3, 3))
+    for action in (ATTACK, TACTICS, DEFENSE, ULTIMATE):
+        for defending in (False, True):
+            actions = np.full(n * n, action)
+            damage = compute_damage(table, no_faction, attacker, defender, actions, np.full(n * n, defending))
+            expected = [
+                calculate_damage(heroes[i], heroes[j], action, defending)
+                for i, j in zip(attacker.tolist(), defender.tolist())
+            ]
+            np.testing.assert_allclose(damage, expected)
+
+
+def test_from_raw_uses_top_level_power():
+    rng = np.random.default_rng(6)
+    raw = [
+        RawHero(id=i, name=f"Hero {i}", universe='Marvel', tier='B', power=int(rng.integers(1, 101)),
+                stats=dict(zip(STAT_NAMES, rng.integers(1, 101, size=6).tolist())))
+        for i in range(30)
+    ]
+    # Unit multipliers keep the stats as they are, so the port can read them directly
+    table = HeroTable.from_raw(raw, rarity_multipliers=dict.fromkeys(Rarity, 1.0))
+    heroes = [{'stats': hero.to_stats().model_dump(), 'power': hero.power} for hero in raw]
+
+    np.testing.assert_array_equal(table.max_hp, [calculate_hp(hero) for hero in heroes])
+    np.testing.assert_allclose(
+        table.attack, [(h['stats']['strength'] or 50) * 0.4 + h['power'] * 0.15 for h in heroes], rtol=1e-6
+    )
+
+
+@pytest.mark.parametrize('n', [0, 1])
+def test_simulation_needs_two_heroes(n):
+    _, table = random_roster(n)
+    with pytest.raises(ValueError, match='at least 2 heroes'):
+        run_simulation(table, battles=10, seed=0)
+
+
+def test_simulation_counts_are_consistent():
+    _, table = random_roster(12, seed=5)
+    result = run_simulation(table, battles=2_000, seed=1)
+    assert result['games'].sum() == 2 * 2_000
+    assert result['wins'].sum() + result['draws'] == 2_000
+    assert np.all(result['wins'] <= result['games'])
+    assert result['faction_wins'].sum() == result['wins'].sum()
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pytest
+
+from hero_forge import SIMILARITY_DISTANCE_SCALE, SIMILARITY_MISSING, SimilarHeroesBuilder, SimilarityIndex
+
+
+def pairwise(vectors: np.ndarray) -> np.ndarray:
+    diff = vectors[:, None, :].astype(np.float64) - vectors[None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=2))
+
+
+def stat_vectors(n: int, seed: int = 0, duplicates: bool = True) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.integers(0, 101, size=(n, 6)).astype(np.float32)
+    if duplicates:
+        vectors[rng.integers(0, n, n // 10)] = vectors[0]  # Exact ties
+    return vectors
+
+
+def assert_neighbours(rows, distances, dist_matrix, row, k, exclude=None):
+    """Distances equal the k smallest of a brute-force scan; rows are consistent with them (ties may differ)."""
+    candidates = dist_matrix[row].copy()
+    if exclude is not None:
+        candidates[exclude] = np.inf
+    expected = np.sort(candidates)[:k]
+    expected = expected[np.isfinite(expected)]
+
+    assert len(rows) == len(expected)
+    assert len(set(rows.tolist())) == len(rows)
+    if exclude is not None:
+        assert exclude not in rows.tolist()
+    np.testing.assert_allclose(distances, expected, atol=1e-3)
+    np.testing.assert_allclose(dist_matrix[row, rows], distances, atol=1e-3)
+
+
+@pytest.mark.parametrize('n, leaf_size', [(1, 4), (7, 4), (300, 4), (300, 32), (1000, 256)])
+def test_query_matches_brute_force(n, leaf_size):
+    vectors = stat_vectors(n, seed=n)
+    dist = pairwise(vectors)
+    index = SimilarityIndex(vectors, leaf_size)
+    for row in range(0, n, max(1, n // 25)):
+        for k in (1, 5, 12):
+            assert_neighbours(*index.query(vectors[row], k), dist, row, k)
+            assert_neighbours(*index.query(vectors[row], k, exclude=row), dist, row, k, exclude=row)
+
+
+def test_query_for_points_outside_the_data():
+    vectors = stat_vectors(500, seed=1)
+    index = SimilarityIndex(vectors, 16)
+    for point in np.random.default_rng(2).uniform(-50, 160, size=(20, 6)):
+        rows, distances = index.query(point, 8)
+        brute = np.sqrt(((vectors.astype(np.float64) - point) ** 2).sum(axis=1))
+        np.testing.assert_allclose(distances, np.sort(brute)[:8], atol=1e-3)
+        np.testing.assert_allclose(brute[rows], distances, atol=1e-3)
+
+
+@pytest.mark.parametrize('n, leaf_size, k', [(2, 32, 5), (40, 4, 3), (600, 8, 10), (600, 32, 1), (2000, 32, 10)])
+def test_all_neighbours_matches_argsort(n, leaf_size, k):
+    vectors = stat_vectors(n, seed=n + k)
+    dist = pairwise(vectors)
+    np.fill_diagonal(dist, np.inf)
+    rows, distances = SimilarityIndex(vectors, leaf_size).all_neighbours(k)
+
+    k = min(k, n - 1)
+    assert rows.shape == distances.shape == (n, k)
+    expected = np.take_along_axis(dist, np.argsort(dist, axis=1, kind='stable')[:, :k], axis=1)
+    np.testing.assert_allclose(distances, expected, atol=1e-3)
+    np.testing.assert_allclose(np.take_along_axis(dist, rows, axis=1), distances, atol=1e-3)
+    assert not (rows == np.arange(n)[:, None]).any()
+
+
+def test_all_neighbours_of_a_single_point_is_empty():
+    rows, distances = SimilarityIndex(stat_vectors(1)).all_neighbours(5)
+    assert rows.shape == distances.shape == (1, 0)
+
+
+@pytest.mark.parametrize('within', ['all', 'faction', 'rarity'])
+def test_builder_neighbours_stay_within_groups(make_store, within):
+    store = make_store(300, seed=4)
+    builder = SimilarHeroesBuilder(store, within)
+    rows, distances = builder.neighbours(6)
+
+    order = store.id_order()
+    vectors = store.stats[order].astype(np.float32)
+    codes = {'faction': store.factions, 'rarity': store.rarities}.get(within, np.zeros(len(store)))[order]
+    dist = pairwise(vectors)
+    dist[codes[:, None] != codes[None, :]] = np.inf
+    np.fill_diagonal(dist, np.inf)
+
+    for row in range(len(store)):
+        expected = np.sort(dist[row])[:6]
+        found = rows[row][rows[row] != SIMILARITY_MISSING].astype(np.intp)
+        assert len(found) == np.isfinite(expected).sum()
+        np.testing.assert_allclose(distances[row][:len(found)], expected[:len(found)], atol=1e-3)
+        assert (codes[found] == codes[row]).all()
+        assert np.isinf(distances[row][len(found):]).all()
+
+
+def test_small_groups_are_padded_with_missing(make_store):
+    store = make_store(12, seed=5)
+    store.rarities[:12] = 0
+    store.rarities[0] = 3  # A group of one
+    rows, distances = SimilarHeroesBuilder(store, 'rarity').neighbours(3)
+    lonely = int(np.flatnonzero(store.ids[store.id_order()] == store.ids[0])[0])
+    assert (rows[lonely] == SIMILARITY_MISSING).all()
+    assert np.isinf(distances[lonely]).all()
+
+
+def test_build_writes_scaled_distances(make_store, tmp_path):
+    store = make_store(80, seed=6)
+    meta = SimilarHeroesBuilder(store).build(tmp_path, top_k=4, compress=False)
+    assert meta == json.loads((tmp_path / 'similar.json').read_text())
+    assert meta['ids'] == sorted(store.ids[:len(store)].tolist())
+
+    data = (tmp_path / meta['file']).read_bytes()
+    column = meta['columns']['distance']
+    stored = np.frombuffer(data, dtype=column['dtype'], count=column['length'], offset=column['offset']).reshape(80, 4)
+    _, distances = SimilarHeroesBuilder(store).neighbours(4)
+    np.testing.assert_array_equal(stored, np.rint(distances * SIMILARITY_DISTANCE_SCALE))
+
+
+def test_unknown_scope_is_rejected(make_store):
+    with pytest.raises(ValueError):
+        SimilarHeroesBuilder(make_store(3), 'tier')
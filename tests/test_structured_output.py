@@ -0,0 +1,170 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from hero_forge import (
+    AIGeneratedContent,
+    ContentSchemaError,
+    ContentValidationError,
+    Faction,
+    HeroForge,
+    HeroStats,
+    NameRejectedError,
+    OpenAIProvider,
+    ProviderError,
+    Rarity,
+    StreamingNameWatcher,
+    classify_provider_error,
+    parse_ai_json,
+    parse_callsigns,
+    structured_output_rejected,
+)
+
+from conftest import CountingProvider, raw_heroes
+
+CONTENT = {
+    'name': 'Neon Shade',
+    'bio': 'Former courier who mapped every tunnel under the drowned city.',
+    'quote': 'The dark is just a map.',
+}
+
+
+@pytest.mark.parametrize('text', [
+    json.dumps(CONTENT),
+    '```json\n' + json.dumps(CONTENT, indent=2) + '\n```',
+    'Sure! Here is your hero:\n' + json.dumps(CONTENT) + '\nHope you like it.',
+    json.dumps({'hero': CONTENT}),
+    '{"note": "draft"} ' + json.dumps(CONTENT),
+    json.dumps(CONTENT).replace('"', '“', 1),
+    json.dumps(CONTENT)[:-1] + ',\n}',
+])
+def test_parser_recovers_the_object(text):
+    assert parse_ai_json(text) == AIGeneratedContent(**CONTENT)
+
+
+def test_parser_matches_json_loads_on_random_wrappings():
+    rng = random.Random(5)
+    for _ in range(200):
+        content = {key: value + ' ' * rng.randint(0, 3) for key, value in CONTENT.items()}
+        body = json.dumps(content, indent=rng.choice([None, 2]), ensure_ascii=rng.random() < 0.5)
+        text = rng.choice(['', 'Here you go: ', '```json\n']) + body + rng.choice(['', '\n```', ' Thanks!'])
+        assert parse_ai_json(text) == AIGeneratedContent(**json.loads(body))
+
+
+def test_unusable_responses_are_classified_apart():
+    with pytest.raises(ContentValidationError) as no_json:
+        parse_ai_json('I cannot help with that.')
+    assert not isinstance(no_json.value, ContentSchemaError)
+
+    with pytest.raises(ValidationError) as invalid:
+        parse_ai_json(json.dumps({**CONTENT, 'bio': 'Too short.'}))
+    assert type(classify_provider_error('Test', invalid.value)) is ContentSchemaError
+    assert type(classify_provider_error('Test', json.JSONDecodeError('x', '', 0))) is ContentValidationError
+
+
+def test_name_is_checked_as_soon_as_it_is_complete():
+    text = json.dumps(CONTENT)
+    end = text.index('Neon Shade') + len('Neon Shade"')
+    watcher = StreamingNameWatcher(lambda name: 'duplicate' if name == 'Neon Shade' else None)
+    for i, char in enumerate(text):
+        if i == end - 1:
+            with pytest.raises(NameRejectedError):
+                watcher.feed(char)
+            break
+        watcher.feed(char)
+    assert watcher.name == 'Neon Shade'
+
+
+def test_callsign_batches_parse_from_arrays_truncated_arrays_and_lines():
+    assert parse_callsigns('["Neon Shade", "Volt Ronin"]') == ['Neon Shade', 'Volt Ronin']
+    assert parse_callsigns('```json\n["Neon Shade", "Volt Ronin", "Hyp') == ['Neon Shade', 'Volt Ronin']
+    assert parse_callsigns('1. Neon Shade\n2. Volt Ronin\n') == ['Neon Shade', 'Volt Ronin']
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+@pytest.mark.parametrize('error, rejected', [
+    (BadRequestError("Invalid parameter: 'response_format' of type 'json_schema' is not supported"), True),
+    (BadRequestError("response_schema is not supported for this model"), True),
+    (BadRequestError("max_tokens is too large"), False),
+    (RuntimeError("response_format"), False),
+])
+def test_structured_output_rejection_detection(error, rejected):
+    assert structured_output_rejected(error) is rejected
+
+
+class FakeStream:
+    def __init__(self, text: str):
+        self.chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+    async def close(self):
+        pass
+
+
+class FakeCompletions:
+    """Chat completions endpoint that fails with `error`; schema errors only hit response_format requests."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        if 'response_format' in request or not structured_output_rejected(self.error):
+            raise self.error
+        return FakeStream(json.dumps(CONTENT))
+
+
+def openai_provider(error: Exception) -> OpenAIProvider:
+    pytest.importorskip('openai')  # Optional dependency; the client is replaced below
+    provider = OpenAIProvider('sk-test')
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(error)))
+    return provider
+
+
+def generate(provider: OpenAIProvider) -> AIGeneratedContent:
+    stats = HeroStats(strength=50, speed=50, power=50, durability=50, combat=50, intelligence=50)
+    return asyncio.run(provider.generate_hero_content(stats, Faction.CYBER_OPS, Rarity.RARE))
+
+
+def test_openai_falls_back_to_prompt_json_once():
+    provider = openai_provider(BadRequestError("'response_format' json_schema is not supported by this model"))
+    assert generate(provider) == AIGeneratedContent(**CONTENT)
+    assert generate(provider) == AIGeneratedContent(**CONTENT)
+
+    requests = provider.client.chat.completions.requests
+    assert ['response_format' in request for request in requests] == [True, False, False]
+    assert provider.structured_output is False
+    assert 'response_format' in provider.structured_output_fallback
+
+
+def test_other_bad_requests_are_not_retried_prompt_only():
+    provider = openai_provider(BadRequestError("max_tokens is too large"))
+    with pytest.raises(ProviderError):
+        generate(provider)
+    assert len(provider.client.chat.completions.requests) == 1
+    assert provider.structured_output is True
+
+
+def test_forge_counts_parse_and_validation_failures_separately(tmp_path):
+    errors = [ContentValidationError('no json'), ContentSchemaError('bio too short'), ContentSchemaError('name missing')]
+    provider = CountingProvider(errors=errors)
+    forge = HeroForge(provider, rate_limit=1, max_retries=5)
+    asyncio.run(forge.process_all(raw_heroes(2), tmp_path / 'out.json'))
+
+    assert forge.stats_total['parse_failures'] == 1
+    assert forge.stats_total['validation_failures'] == 2
+    assert forge.parse_stats['CountingProvider'] == {'responses': 5, 'parse_failures': 1, 'validation_failures': 2}
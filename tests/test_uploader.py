@@ -0,0 +1,100 @@
+import json
+import random
+
+import pytest
+
+from hero_forge import BulkUploader, RetryPolicy, StandInAdminServer, UploadError
+
+FAST_RETRY = RetryPolicy(base_delay=0.001, max_delay=0.005)
+
+
+def records(store):
+    return [store.record(i) for i in range(len(store))]
+
+
+def stale(store):
+    """Server-side copies of the heroes before the forge run."""
+    return [{**record, 'name': f"Old {record['id']}"} for record in records(store)]
+
+
+def progress_entries(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()[1:]]
+
+
+def test_interrupted_bulk_upload_resumes_with_unfinished_chunks(make_store, tmp_path):
+    store = make_store(45, seed=1)
+    progress = tmp_path / 'upload.progress.jsonl'
+    random.seed(3)  # The stand-in draws its failures from the global generator
+
+    with StandInAdminServer(stale(store), fail_rate=0.3) as server:
+        first = BulkUploader(server.url, chunk_size=5, concurrency=1, progress_path=progress,
+                             retry=FAST_RETRY, max_attempts=1)
+        with pytest.raises(UploadError):
+            first.upload(store)
+        done = progress_entries(progress)
+        assert 0 < len(done) < 9
+        assert first.stats['chunks'] == len(done)
+
+        second = BulkUploader(server.url, chunk_size=5, concurrency=3, progress_path=progress,
+                              retry=FAST_RETRY, max_attempts=20)
+        stats = second.upload(store)
+
+        assert stats['skipped'] == len(done)
+        assert stats['chunks'] == 9 - len(done)
+        assert stats['heroes'] == 45 - 5 * len(done)
+        assert sorted(entry['chunk'] for entry in progress_entries(progress)) == list(range(9))
+        assert server.heroes == {record['id']: record for record in records(store)}
+
+
+def test_changed_chunks_are_sent_again(make_store, tmp_path):
+    store = make_store(30, seed=2)
+    progress = tmp_path / 'upload.progress.jsonl'
+    with StandInAdminServer(stale(store)) as server:
+        uploader = BulkUploader(server.url, chunk_size=10, progress_path=progress)
+        assert uploader.upload(store)['chunks'] == 3
+
+        store.stats[12, 0] = (int(store.stats[12, 0]) + 1) % 101  # Second chunk changes
+        stats = uploader.upload(store)
+        # Counters are per call, not cumulative
+        assert (stats['chunks'], stats['skipped'], stats['heroes']) == (1, 2, 10)
+        assert server.heroes[int(store.ids[12])]['stats'] == store.record(12)['stats']
+
+
+def test_progress_for_another_chunk_size_starts_over(make_store, tmp_path):
+    store = make_store(20, seed=3)
+    progress = tmp_path / 'upload.progress.jsonl'
+    with StandInAdminServer(stale(store)) as server:
+        BulkUploader(server.url, chunk_size=10, progress_path=progress).upload(store)
+        stats = BulkUploader(server.url, chunk_size=4, progress_path=progress).upload(store)
+    assert (stats['chunks'], stats['skipped']) == (5, 0)
+    assert json.loads(progress.read_text(encoding='utf-8').splitlines()[0])['chunkSize'] == 4
+
+
+def test_import_replaces_the_roster_in_one_streamed_body(make_store, tmp_path, monkeypatch):
+    monkeypatch.setattr('hero_forge.UPLOAD_STREAM_BLOCK', 512)  # Many pieces
+    store = make_store(60, seed=4)
+    progress = tmp_path / 'import.progress.jsonl'
+    random.seed(5)
+    with StandInAdminServer([{'id': 999, 'name': 'Gone'}], fail_rate=0.5) as server:
+        uploader = BulkUploader(server.url, mode='import', progress_path=progress, retry=FAST_RETRY, max_attempts=30)
+        stats = uploader.upload(store)
+        assert stats['chunks'] == 1
+        assert stats['retries'] == server.failed
+        assert server.heroes == {record['id']: record for record in records(store)}
+
+        again = uploader.upload(store)
+        assert (again['chunks'], again['skipped'], again['retries']) == (0, 1, 0)
+
+
+def test_non_retryable_status_fails_at_once(make_store):
+    with StandInAdminServer() as server:
+        uploader = BulkUploader(server.url + '/nothing-here', retry=FAST_RETRY)
+        with pytest.raises(UploadError, match='HTTP 404'):
+            uploader.upload(make_store(3))
+        assert uploader.stats['retries'] == 0
+
+
+@pytest.mark.parametrize('kwargs', [{'base_url': 'ftp://example.com'}, {'base_url': 'http://x', 'mode': 'merge'}])
+def test_invalid_configuration(kwargs):
+    with pytest.raises(ValueError):
+        BulkUploader(**kwargs)
@@ -22,6 +22,13 @@ TIER_COLORS = {
     'D': '#DCEDC1'
 }
 
+# HTTP connection pool settings for the AI client
+AI_BASE_URL = "https://api.aimlapi.com/v1"
+AI_MAX_CONNECTIONS = 10
+AI_MAX_KEEPALIVE = 10
+AI_KEEPALIVE_EXPIRY = 30.0
+AI_TIMEOUT = 60.0
+
 # Blacklist
 BLACKLIST = [
     'stark', 'tony', 'rogers', 'steve', 'banner', 'bruce',
@@ -38,11 +45,34 @@ def check_similarity(text1: str, text2: str) -> float:
     """Calculate similarity between two texts"""
     return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
-async def generate_with_ai(hero_id: int, universe: str, tier: str, stats: Dict, api_key: str = None):
+def create_ai_client(api_key: str, base_url: str = AI_BASE_URL, http2: bool = False):
+    """Create one pooled AsyncOpenAI client to be reused for the whole run"""
+    import httpx
+    from openai import AsyncOpenAI
+
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError("Install HTTP/2 support: pip install 'httpx[http2]'")
+
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(AI_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=AI_MAX_CONNECTIONS,
+            max_keepalive_connections=AI_MAX_KEEPALIVE,
+            keepalive_expiry=AI_KEEPALIVE_EXPIRY
+        )
+    )
+
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+
+async def generate_with_ai(hero_id: int, universe: str, tier: str, stats: Dict, api_key: str = None, client=None):
     """Generate hero content with AI (OpenAI/AIMLAPI)"""
 
     # For now, use Mock (you can add OpenAI/AIMLAPI here)
-    if not api_key:
+    if not api_key and client is None:
         # MOCK MODE
         prefixes = ['Void', 'Storm', 'Crimson', 'Shadow', 'Nova', 'Quantum', 'Eclipse', 'Titan', 'Nebula', 'Vortex']
         suffixes = ['Walker', 'Bringer', 'Guard', 'Sentinel', 'Prime', 'Vanguard', 'Striker', 'Reaper', 'Blade']
@@ -74,13 +104,10 @@ async def generate_with_ai(hero_id: int, universe: str, tier: str, stats: Dict,
         }
 
     else:
-        # AI MODE - Add your OpenAI/AIMLAPI code here
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(
-            base_url="https://api.aimlapi.com/v1",
-            api_key=api_key
-        )
+        # AI MODE - reuse the pooled client; only build one for standalone calls
+        owns_client = client is None
+        if owns_client:
+            client = create_ai_client(api_key)
 
         prompt = f"""Create an original sci-fi hero (NO Marvel/DC references!):
 
@@ -96,15 +123,19 @@ Generate JSON:
   "reason": "Why they are {tier}-tier (15-30 words)"
 }}"""
 
-        response = await client.chat.completions.create(
-            model="google/gemini-3-flash-preview",
-            messages=[
-                {"role": "system", "content": "You are a creative hero designer. Respond with JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.9,
-            max_tokens=300
-        )
+        try:
+            response = await client.chat.completions.create(
+                model="google/gemini-3-flash-preview",
+                messages=[
+                    {"role": "system", "content": "You are a creative hero designer. Respond with JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.9,
+                max_tokens=300
+            )
+        finally:
+            if owns_client:
+                await client.close()
 
         content = response.choices[0].message.content.strip()
 
@@ -116,7 +147,7 @@ Generate JSON:
 
         return json.loads(content)
 
-async def transform_hero(hero: Dict, used_names: Set, used_descriptions: Set, api_key: str = None) -> Dict:
+async def transform_hero(hero: Dict, used_names: Set, used_descriptions: Set, api_key: str = None, client=None) -> Dict:
     """Transform a single hero"""
 
     max_attempts = 5
@@ -128,7 +159,8 @@ async def transform_hero(hero: Dict, used_names: Set, used_descriptions: Set, ap
                 hero.get('universe', 'Marvel'),
                 hero.get('tier', 'B'),
                 hero.get('stats', {}),
-                api_key
+                api_key,
+                client
             )
 
             # Validate
@@ -213,6 +245,8 @@ async def main():
     parser.add_argument('--output', default='heroes_transformed.json')
     parser.add_argument('--api-key', help='AIMLAPI/OpenAI API key (optional, uses mock if not provided)')
     parser.add_argument('--limit', type=int, help='Limit number of heroes')
+    parser.add_argument('--base-url', default=AI_BASE_URL, help='OpenAI-compatible API base URL')
+    parser.add_argument('--http2', action='store_true', help='Use HTTP/2 for the AI client (needs httpx[http2])')
     args = parser.parse_args()
 
     # Load
@@ -231,14 +265,21 @@ async def main():
     used_descriptions = set()
     transformed = []
 
-    print(f"[*] Transforming...")
-    for i, hero in enumerate(heroes):
-        if i % 100 == 0:
-            print(f"[i] Progress: {i}/{len(heroes)}")
+    # One pooled client for the whole run (keep-alive, no per-request TLS handshake)
+    client = create_ai_client(args.api_key, args.base_url, args.http2) if args.api_key else None
 
-        new_hero = await transform_hero(hero, used_names, used_descriptions, args.api_key)
-        if new_hero:  # Only add if not None
-            transformed.append(new_hero)
+    print(f"[*] Transforming...")
+    try:
+        for i, hero in enumerate(heroes):
+            if i % 100 == 0:
+                print(f"[i] Progress: {i}/{len(heroes)}")
+
+            new_hero = await transform_hero(hero, used_names, used_descriptions, args.api_key, client)
+            if new_hero:  # Only add if not None
+                transformed.append(new_hero)
+    finally:
+        if client is not None:
+            await client.close()
 
     # Save
     output_path = Path(args.output)